@@ -1,26 +1,150 @@
-from bplustree import BPlusTree 
+import argparse
+import gc
+import inspect
+import io
+import re
+import sys
+import time
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from fnmatch import fnmatchcase
+from itertools import islice
+
+from bplustree import ArvoreBPlus
+from diario import Diario, reproduzir
+from filtro import ArvoreBPlusFiltrada, ArvoreBPlusPrefixadaFiltrada
+from percurso import caminhar, encontrar, encontrar_paralelo, resumir, resumir_paralelo
+from prefixos import ArvoreBPlusPrefixada
 
 class No:
     """
     Representa um nó no sistema de arquivos. Pode ser um diretório ou um arquivo.
     Se for um diretório, ele contém uma B+ Tree para gerenciar seus próprios filhos (arquivos/subdiretórios).
     """
-    def __init__(self, e_diretorio):
+    __slots__ = ("e_diretorio", "_arvore", "geracao")
+
+    # O grau da B+ Tree (4, salvo --grau) define a capacidade dos nós internos.
+    GRAU = 4
+    # Classe da B+ Tree dos diretórios (ArvoreBPlusPrefixada com --comprimir, ArvoreBPlusFiltrada com --filtro)
+    CLASSE_ARVORE = ArvoreBPlus
+
+    def __init__(self, e_diretorio, geracao=None):
         # Indica se o nó representa um diretório (True) ou um arquivo (False)
         self.e_diretorio = e_diretorio
-        # Se for um diretório, ele tem uma B+ Tree para armazenar seus conteúdos.
-        # Caso contrário (se for um arquivo), não precisa de uma árvore interna.
-        # O grau da B+ Tree (4, neste caso) define a capacidade dos nós internos.
-        self.arvore = BPlusTree(4) if e_diretorio else None
+        # A B+ Tree do diretório só é criada quando for usada pela primeira vez,
+        # para que diretórios vazios (e arquivos) não ocupem uma árvore inteira.
+        self._arvore = None
+        # Geração do shell em que o nó foi criado (ver Shell.geracao)
+        self.geracao = geracao
+
+    def copiar(self, geracao):
+        """
+        Copia o nó para outra geração em O(1): a árvore da cópia é um instantâneo (copy-on-write)
+        da original e compartilha todos os nós com ela.
+        """
+        copia = No(self.e_diretorio, geracao)
+        if self._arvore is not None:
+            copia._arvore = self._arvore.instantaneo()
+        return copia
+
+    @property
+    def arvore(self):
+        """
+        B+ Tree com o conteúdo do diretório, criada sob demanda. Arquivos não têm árvore (None).
+        """
+        if self._arvore is None and self.e_diretorio:
+            self._arvore = self.CLASSE_ARVORE(self.GRAU)
+        return self._arvore
+
+    def vazio(self):
+        """
+        Indica se o diretório não tem nenhum item, sem precisar criar a árvore.
+        Com a árvore balanceada, ela só está vazia quando a raiz é uma folha sem chaves.
+        """
+        return self._arvore is None or not self._arvore.raiz.chaves
+
+# Tamanho (em caracteres) a partir do qual a saída acumulada no modo em lote é despejada
+LIMITE_SAIDA = 1 << 16
+
+class CacheCaminhos:
+    """
+    Cache LRU limitado que associa caminhos absolutos (tuplas de nomes a partir da raiz)
+    aos nós do sistema de arquivos, evitando refazer a busca em cada nível do caminho.
+    """
+    def __init__(self, capacidade=1024):
+        self.capacidade = capacidade
+        # Caminhos em cache, do menos para o mais recentemente usado
+        self.entradas = OrderedDict()
+        # Quantos caminhos em cache há abaixo de cada prefixo, para que a invalidação de um arquivo
+        # (ou de um diretório sem nada em cache abaixo dele) não percorra o cache inteiro
+        self.abaixo = {}
+
+    def _contar(self, caminho, delta):
+        """
+        Soma 'delta' ao contador de cada prefixo próprio do caminho.
+        """
+        abaixo = self.abaixo
+        for tamanho in range(len(caminho)):
+            prefixo = caminho[:tamanho]
+            restante = abaixo.get(prefixo, 0) + delta
+            if restante:
+                abaixo[prefixo] = restante
+            else:
+                del abaixo[prefixo]
+
+    def obter(self, caminho):
+        """
+        Retorna o nó em cache para o caminho, ou None se ele não estiver no cache.
+        """
+        no = self.entradas.get(caminho)
+        if no is not None:
+            self.entradas.move_to_end(caminho)
+        return no
+
+    def guardar(self, caminho, no):
+        """
+        Guarda o nó do caminho, descartando o menos usado se o cache estiver cheio.
+        """
+        if caminho not in self.entradas:
+            self._contar(caminho, 1)
+        self.entradas[caminho] = no
+        self.entradas.move_to_end(caminho)
+        if len(self.entradas) > self.capacidade:
+            descartado, _ = self.entradas.popitem(last=False)
+            self._contar(descartado, -1)
+
+    def invalidar(self, caminho):
+        """
+        Remove do cache o caminho e todos os caminhos abaixo dele. O cache só é percorrido
+        se houver algum caminho em cache abaixo deste.
+        """
+        if self.entradas.pop(caminho, None) is not None:
+            self._contar(caminho, -1)
+        if not self.abaixo.get(caminho):
+            return
+        if not caminho:
+            self.entradas.clear()
+            self.abaixo.clear()
+            return
+        tamanho = len(caminho)
+        for chave in [chave for chave in self.entradas if chave[:tamanho] == caminho]:
+            del self.entradas[chave]
+            self._contar(chave, -1)
 
 class Shell:
     """
     Implementa uma interface de linha de comando simples para interagir com o sistema de arquivos.
     Simula comandos básicos como 'ls', 'mkdir', 'touch', 'cd' e 'rm'.
+    Com 'caminho_diario', as alterações são gravadas em um write-ahead log (ver diario.Diario),
+    sincronizado a cada 'intervalo_sincronizacao' segundos e compactado em um checkpoint a cada
+    'checkpoint_a_cada' registros, e o estado é recuperado dele ao iniciar.
     """
-    def __init__(self):
+    def __init__(self, caminho_diario=None, intervalo_sincronizacao=0.05, checkpoint_a_cada=50000):
+        # Geração atual do sistema de arquivos: só os nós criados nela podem ser alterados no lugar;
+        # os demais também pertencem a algum snapshot e são copiados antes (ver '_proprio').
+        self.geracao = object()
         # O nó raiz do sistema de arquivos, sempre um diretório.
-        self.raiz = No(e_diretorio=True)
+        self.raiz = No(True, self.geracao)
         # O diretório de trabalho atual (Current Working Directory - CWD).
         # Começa na raiz.
         self.cwd = self.raiz
@@ -29,6 +153,24 @@ class Shell:
         self.caminho = ["~"]
         # Pilha para rastrear os diretórios pai, usada para o comando 'cd ..'.
         self.pais = []
+        # Cache de resolução de caminhos (caminho absoluto -> nó).
+        self.cache = CacheCaminhos()
+        # Snapshots do sistema de arquivos (nome -> raiz na época do snapshot).
+        self.snapshots = {}
+        # Write-ahead log opcional das alterações.
+        self.diario = None
+        self.checkpoint_a_cada = checkpoint_a_cada
+        if caminho_diario is not None:
+            # A recuperação só cria objetos que continuam vivos; o coletor de ciclos é pausado
+            # para não varrer de novo, a cada poucos milhares de alocações, um heap que só cresce
+            coletor = gc.isenabled()
+            gc.disable()
+            try:
+                self.diario = Diario(caminho_diario, intervalo_sincronizacao)
+                self.raiz = self.cwd = self._montar(reproduzir(self.diario.recuperar()))
+            finally:
+                if coletor:
+                    gc.enable()
 
     def prompt(self):
         """
@@ -41,6 +183,7 @@ class Shell:
         """
         Loop principal do shell que lê e executa comandos do usuário.
         """
+        despacho = {}
         while True:
             try:
                 # Lê a entrada do usuário, remove espaços extras e divide em comando e argumentos.
@@ -52,13 +195,279 @@ class Shell:
                 comando, *argumentos = comando_completo
                 
                 # Tenta chamar o método correspondente ao comando (ex: do_ls, do_mkdir).
-                # Se o método não existir, chama 'unknown'.
-                getattr(self, f"do_{comando}", self.desconhecido)(*argumentos)
+                # Se o método não existir, chama 'desconhecido'.
+                if not self._despachar(comando, argumentos, despacho):
+                    print(f"Argumentos inválidos para '{comando}'.")
             except (KeyboardInterrupt, EOFError):
                 # Captura Ctrl+C ou Ctrl+D para sair do shell de forma elegante.
                 print("\nSaindo do fakerational.")
                 break
 
+    def _normalizar(self, caminho):
+        """
+        Converte um caminho absoluto ('/a/b', '~/a/b') ou relativo ('a/b', '../c', './d')
+        em uma tupla de nomes a partir da raiz.
+        """
+        if caminho.startswith("/") or caminho == "~" or caminho.startswith("~/"):
+            componentes = []
+            caminho = caminho[1:]
+        else:
+            componentes = self.caminho[1:]
+        for parte in caminho.split("/"):
+            if parte in ("", "."):
+                continue
+            if parte == "..":
+                # Na raiz, '..' continua na raiz
+                if componentes:
+                    componentes.pop()
+            else:
+                componentes.append(parte)
+        return tuple(componentes)
+
+    def _resolver(self, componentes):
+        """
+        Retorna o nó do caminho (tupla de nomes a partir da raiz) ou None se ele não existir.
+        Parte do maior prefixo já presente no cache e guarda cada nível percorrido.
+        """
+        if not componentes:
+            return self.raiz
+        no = self.cache.obter(componentes)
+        if no is not None:
+            return no
+        # Procura o maior prefixo do caminho que já está em cache
+        nivel = len(componentes) - 1
+        no = self.cache.obter(componentes[:nivel]) if nivel else None
+        while nivel and no is None:
+            nivel -= 1
+            no = self.cache.obter(componentes[:nivel]) if nivel else None
+        if no is None:
+            no = self.raiz
+        # Desce pelos níveis restantes, um 'buscar' por componente
+        for i in range(nivel, len(componentes)):
+            if not no.e_diretorio or no.vazio():
+                return None
+            no = no.arvore.buscar(componentes[i])
+            if no is None:
+                return None
+            self.cache.guardar(componentes[:i + 1], no)
+        return no
+
+    def _entrar(self, componentes):
+        """
+        Torna o caminho (tupla de nomes a partir da raiz) o diretório atual, reconstruindo a pilha
+        de pais. Se ele não existir ou não for um diretório, vai para a raiz e retorna False.
+        """
+        no = self._resolver(componentes)
+        encontrado = no is not None and no.e_diretorio
+        if not encontrado:
+            componentes = ()
+            no = self.raiz
+        # Cada prefixo já está no cache após a resolução
+        self.pais = [self._resolver(componentes[:i]) for i in range(len(componentes))]
+        self.cwd = no
+        self.caminho = ["~", *componentes]
+        return encontrado
+
+    def _separar(self, caminho):
+        """
+        Divide um caminho no diretório pai e no nome final.
+        Retorna (componentes do pai, nó do pai, nome); o nó do pai é None se ele não existir
+        ou não for um diretório, e o nome é None se o caminho não terminar em um nome válido.
+        """
+        pai, separador, nome = caminho.rstrip("/").rpartition("/")
+        if not separador:
+            pai = "."
+        elif not pai:
+            pai = "/"
+        componentes = self._normalizar(pai)
+        no = self._resolver(componentes)
+        if no is not None and not no.e_diretorio:
+            no = None
+        # O caractere nulo separa os nomes nos registros do diário (ver diario.codificar)
+        if nome in ("", ".", "..", "~") or "\0" in nome:
+            nome = None
+        return componentes, no, nome
+
+    def _proprio(self, componentes, no):
+        """
+        Retorna o diretório 'no' (já resolvido a partir dos componentes) pronto para ser alterado.
+        Se ele ainda é compartilhado com um snapshot, copia os diretórios compartilhados do caminho,
+        da raiz para baixo (cada cópia custa O(1), ver No.copiar), e coloca as cópias no lugar dos
+        originais no diretório pai, no cache e no diretório atual e seus pais.
+        """
+        # Um nó da geração atual só é alcançável por pais também da geração atual
+        if no.geracao is self.geracao:
+            return no
+        atual = tuple(self.caminho[1:])
+        pai = None
+        for profundidade in range(len(componentes) + 1):
+            no = self.raiz if pai is None else pai.arvore.buscar(componentes[profundidade - 1])
+            if no.geracao is not self.geracao:
+                no = no.copiar(self.geracao)
+                if pai is None:
+                    self.raiz = no
+                else:
+                    pai.arvore.upsert(componentes[profundidade - 1], no)
+                    self.cache.guardar(componentes[:profundidade], no)
+                # O diretório atual e a pilha de pais também passam a apontar para a cópia
+                if atual[:profundidade] == componentes[:profundidade]:
+                    if profundidade == len(atual):
+                        self.cwd = no
+                    else:
+                        self.pais[profundidade] = no
+            pai = no
+        return no
+
+    def _montar(self, conteudo):
+        """
+        Constrói o sistema de arquivos a partir de dicionários aninhados (ver diario.reproduzir).
+        Cada diretório recebe todos os seus itens de uma vez, por carga em lote (carregar_ordenado),
+        em vez de uma inserção por item.
+        """
+        raiz = No(True, self.geracao)
+        pendentes = [(conteudo, raiz)]
+        while pendentes:
+            itens, diretorio = pendentes.pop()
+            if not itens:
+                continue
+            filhos = []
+            for nome in sorted(itens):
+                subitens = itens[nome]
+                filho = No(subitens is not None, self.geracao)
+                filhos.append((nome, filho))
+                if subitens:
+                    pendentes.append((subitens, filho))
+            diretorio._arvore = No.CLASSE_ARVORE.carregar_ordenado(filhos, No.GRAU)
+        return raiz
+
+    def _registros_estado(self):
+        """
+        Gera um registro de criação ('mkdir' ou 'touch') por item do sistema de arquivos, em pré-ordem.
+        """
+        for caminho, no in caminhar(self.raiz):
+            yield ("mkdir" if no.e_diretorio else "touch"), caminho
+
+    def _registrar(self, operacao, caminho):
+        """
+        Grava a alteração (já aplicada em memória) no diário, se houver, e faz um checkpoint
+        quando o diário acumula 'checkpoint_a_cada' registros.
+        """
+        if self.diario is None:
+            return
+        self.diario.registrar(operacao, caminho)
+        if self.diario.registros >= self.checkpoint_a_cada:
+            self.diario.checkpoint(self._registros_estado())
+
+    def fechar(self):
+        """
+        Sincroniza e fecha o diário, se houver.
+        """
+        if self.diario is not None:
+            self.diario.fechar()
+            self.diario = None
+
+    def _despachar(self, comando, argumentos, despacho):
+        """
+        Executa 'do_<comando>' (ou 'desconhecido') com os argumentos. 'despacho' guarda, para cada
+        comando já visto, o método e os números mínimo e máximo de argumentos da sua assinatura,
+        evitando um getattr e um inspect.signature por linha.
+        Se a quantidade de argumentos não servir para o método (ex: 'mkdir' sem caminho), nada é
+        executado e retorna False; a conferência é feita antes da chamada, então um TypeError de
+        dentro do comando não é confundido com argumentos errados.
+        """
+        entrada = despacho.get(comando)
+        if entrada is None:
+            metodo = getattr(self, f"do_{comando}", self.desconhecido)
+            parametros = inspect.signature(metodo).parameters.values()
+            minimo = sum(1 for parametro in parametros if parametro.default is parametro.empty
+                         and parametro.kind is not parametro.VAR_POSITIONAL)
+            maximo = None if any(parametro.kind is parametro.VAR_POSITIONAL for parametro in parametros) else len(parametros)
+            entrada = despacho[comando] = (metodo, minimo, maximo)
+        metodo, minimo, maximo = entrada
+        if len(argumentos) < minimo or (maximo is not None and len(argumentos) > maximo):
+            return False
+        metodo(*argumentos)
+        return True
+
+    def executar(self, linhas):
+        """
+        Modo em lote: executa os comandos de um iterável de linhas (arquivo, sys.stdin, lista...)
+        sem exibir o prompt. A saída dos comandos é acumulada e escrita em blocos, e ao final
+        a vazão (comandos por segundo) é informada na saída de erro.
+        Linhas vazias e começadas por '#' são ignoradas. Uma linha com argumentos inválidos ou cujo
+        comando falhe é informada, com o seu número, e a execução continua.
+        Retorna o número de comandos executados.
+        """
+        destino = sys.stdout
+        saida = io.StringIO()
+        despacho = {}
+        total = 0
+        inicio = time.perf_counter()
+        try:
+            with redirect_stdout(saida):
+                for numero, linha in enumerate(linhas, 1):
+                    comando_completo = linha.split()
+                    if not comando_completo or comando_completo[0].startswith("#"):
+                        continue
+                    comando, *argumentos = comando_completo
+                    try:
+                        if self._despachar(comando, argumentos, despacho):
+                            total += 1
+                        else:
+                            print(f"Linha {numero}: argumentos inválidos para '{comando}'.")
+                    except Exception as erro:
+                        print(f"Linha {numero}: erro em '{comando}': {type(erro).__name__}: {erro}")
+                    # Despeja a saída acumulada em blocos grandes
+                    if saida.tell() > LIMITE_SAIDA:
+                        destino.write(saida.getvalue())
+                        saida.seek(0)
+                        saida.truncate()
+        finally:
+            # A saída acumulada é escrita mesmo se a execução for interrompida
+            destino.write(saida.getvalue())
+            destino.flush()
+        duracao = time.perf_counter() - inicio
+        vazao = total / duracao if duracao else 0
+        print(f"{total} comandos em {duracao:.3f} s ({vazao:,.0f} comandos/s)", file=sys.stderr)
+        return total
+
+    @staticmethod
+    def _ler_opcoes(argumentos, com_valor=(), numericas=(), sem_valor=()):
+        """
+        Separa as opções de um comando (ex: '-name x', '--limit 5', '-quit') dos argumentos posicionais.
+        Retorna (opções, posicionais), com as opções em um dicionário (os valores das 'numericas'
+        já convertidos para int e True para as 'sem_valor'), ou None, após mostrar o erro, se faltar
+        o valor de uma opção.
+        """
+        opcoes = {}
+        posicionais = []
+        argumentos = iter(argumentos)
+        for argumento in argumentos:
+            if argumento in com_valor or argumento in numericas:
+                valor = next(argumentos, None)
+                # isdecimal, e não isdigit: dígitos como '²' passam no isdigit mas não no int()
+                if valor is None or (argumento in numericas and not valor.isdecimal()):
+                    print(f"{argumento} espera {'um número' if argumento in numericas else 'um valor'}.")
+                    return None
+                opcoes[argumento] = int(valor) if argumento in numericas else valor
+            elif argumento in sem_valor:
+                opcoes[argumento] = True
+            else:
+                posicionais.append(argumento)
+        return opcoes, posicionais
+
+    def _diretorio_inicial(self, posicionais):
+        """
+        Resolve o diretório de partida dos comandos recursivos (o primeiro argumento posicional ou
+        o diretório atual). Retorna (texto do caminho, nó) ou None, após mostrar o erro.
+        """
+        inicio = posicionais[0] if posicionais else "."
+        diretorio = self._resolver(self._normalizar(inicio))
+        if diretorio is None or not diretorio.e_diretorio:
+            print("Diretório não encontrado.")
+            return None
+        return inicio, diretorio
+
     def desconhecido(self, *argumentos):
         """
         Método chamado quando um comando digitado não é reconhecido.
@@ -67,77 +476,433 @@ class Shell:
 
     def do_ls(self, *argumentos):
         """
-        Lista o conteúdo do diretório atual.
+        Lista o conteúdo do diretório atual ou do caminho informado (ex: 'ls /x/y', 'ls ../z').
+        Aceita um padrão no estilo glob no último componente (ex: 'ls foo*', 'ls a/b*'); apenas a
+        faixa de chaves com o prefixo literal do padrão é percorrida.
+        Paginação: '--offset N' pula as N primeiras entradas e '--limit N' mostra no máximo N
+        (ex: 'ls --offset 1000 --limit 50'); sem padrão, o salto até a entrada N é feito em O(log n)
+        pelas contagens da B+ Tree, sem percorrer as anteriores. '--count' mostra só o número de entradas.
         Adiciona '/' ao final dos nomes de diretórios para fácil identificação.
         """
-        # Pega todas as chaves (nomes de arquivos/diretórios) da B+ Tree do diretório atual.
-        chaves = self.cwd.arvore.listar_chaves()
-        for chave in chaves:
-            # Busca o nó correspondente à chave para verificar se é um diretório ou arquivo.
-            valor = self.cwd.arvore.buscar(chave)
+        lidas = self._ler_opcoes(argumentos, numericas=("--offset", "--limit"), sem_valor=("--count",))
+        if lidas is None:
+            return
+        opcoes, posicionais = lidas
+        deslocamento = opcoes.get("--offset", 0)
+        limite = opcoes.get("--limit")
+        contar = "--count" in opcoes
+
+        diretorio = self.cwd
+        padrao = None
+        if posicionais:
+            alvo = self._resolver(self._normalizar(posicionais[0]))
+            if alvo is not None and alvo.e_diretorio:
+                diretorio = alvo
+            else:
+                # Não é um diretório: trata o último componente como padrão dentro do pai
+                _, diretorio, padrao = self._separar(posicionais[0])
+                if diretorio is None or padrao is None:
+                    print("Diretório não encontrado.")
+                    return
+        if diretorio.vazio():
+            if contar:
+                print(0)
+            return
+        if padrao is None and contar:
+            # O tamanho do diretório está na raiz da B+ Tree
+            print(len(diretorio.arvore))
+            return
+        if padrao is not None:
+            # Parte literal do padrão, antes do primeiro curinga
+            prefixo = re.split(r"[*?\[]", padrao, maxsplit=1)[0]
+            itens = (
+                (chave, valor)
+                for chave, valor in diretorio.arvore.iterar_prefixo(prefixo)
+                if fnmatchcase(chave, padrao)
+            )
+        elif deslocamento:
+            # Desce direto até a entrada de número 'deslocamento' e segue a partir dela
+            arvore = diretorio.arvore
+            if deslocamento >= len(arvore):
+                return
+            itens = arvore.iterar_itens(arvore.k_esima(deslocamento)[0])
+            deslocamento = 0
+        else:
+            # Percorre a lista ligada de folhas uma única vez, já com os valores
+            itens = diretorio.arvore.iterar_itens()
+        if contar:
+            print(sum(1 for _ in itens))
+            return
+        if deslocamento or limite is not None:
+            itens = islice(itens, deslocamento, None if limite is None else deslocamento + limite)
+        for chave, valor in itens:
             sufixo = '/' if valor.e_diretorio else '' # Adiciona '/' se for diretório
             print(f"{chave}{sufixo}")
 
-    def do_mkdir(self, nome):
+    def do_mkdir(self, caminho):
         """
-        Cria um novo diretório no diretório atual.
+        Cria um novo diretório no caminho informado (relativo ao diretório atual ou absoluto).
         """
-        # Verifica se um item com o mesmo nome já existe.
-        if self.cwd.arvore.buscar(nome):
-            print("Diretório já existe.")
+        componentes, pai, nome = self._separar(caminho)
+        if pai is None or nome is None:
+            print("Diretório não encontrado.")
+            return
+        # Insere o novo diretório em uma única descida, que também informa se o nome já existia.
+        novo = No(True, self.geracao)
+        if self._proprio(componentes, pai).arvore.inserir_se_ausente(nome, novo):
+            self.cache.guardar(componentes + (nome,), novo)
+            self._registrar("mkdir", componentes + (nome,))
         else:
-            # Insere um novo nó de diretório na B+ Tree do diretório atual.
-            self.cwd.arvore.inserir(nome, No(e_diretorio=True))
+            print("Diretório já existe.")
 
-    def do_touch(self, nome):
+    def do_touch(self, caminho):
         """
-        Cria um novo arquivo vazio no diretório atual.
+        Cria um novo arquivo vazio no caminho informado (relativo ao diretório atual ou absoluto).
         """
-        # Verifica se um item com o mesmo nome já existe.
-        if self.cwd.arvore.buscar(nome):
+        componentes, pai, nome = self._separar(caminho)
+        if pai is None or nome is None:
+            print("Diretório não encontrado.")
+        # Insere o novo arquivo em uma única descida, que também informa se o nome já existia.
+        elif not self._proprio(componentes, pai).arvore.inserir_se_ausente(nome, No(False, self.geracao)):
             print("Arquivo já existe.")
         else:
-            # Insere um novo nó de arquivo na B+ Tree do diretório atual.
-            self.cwd.arvore.inserir(nome, No(e_diretorio=False))
+            self._registrar("touch", componentes + (nome,))
 
-    def do_cd(self, nome):
+    def do_cd(self, caminho):
         """
         Muda o diretório de trabalho atual.
-        Suporta ".." para voltar ao diretório pai.
+        Aceita caminhos relativos com vários componentes ('a/b/c', '../x'), absolutos ('/x/y', '~/x')
+        e ".." para voltar ao diretório pai.
         """
-        if nome == "..":
+        if caminho == "..":
             # Se a lista de pais não estiver vazia, volta para o diretório anterior.
             if self.pais:
                 self.cwd = self.pais.pop()    # Restaura o diretório pai
                 self.caminho.pop() # Remove o último componente do caminho
+            return
+
+        componentes = self._normalizar(caminho)
+        no = self._resolver(componentes)
+        # Verifica se o nó existe e se é de fato um diretório.
+        if not no or not no.e_diretorio:
+            print("Diretório não encontrado.")
         else:
-            # Busca o nó com o nome especificado no diretório atual.
-            no = self.cwd.arvore.buscar(nome)
-            # Verifica se o nó existe e se é de fato um diretório.
-            if not no or not no.e_diretorio:
-                print("Diretório não encontrado.")
-            else:
-                # Adiciona o diretório atual à pilha de pais e muda para o novo diretório.
-                self.pais.append(self.cwd)
-                self.cwd = no
-                self.caminho.append(nome) # Adiciona o novo nome ao caminho
+            self._entrar(componentes)
 
-    def do_rm(self, nome):
+    def do_rm(self, *argumentos):
         """
-        Remove um arquivo ou diretório vazio.
-        Diretórios não vazios não podem ser removidos.
+        Remove um arquivo ou diretório vazio: 'rm caminho'.
+        Com 'rm -r caminho', remove também diretórios não vazios com todo o seu conteúdo: o diretório
+        sai do pai em uma única remoção e as B+ Trees abaixo dele são desfeitas de uma vez
+        (ArvoreBPlus.limpar), sem remover item por item.
         """
-        no = self.cwd.arvore.buscar(nome)
-        if not no:
+        lidas = self._ler_opcoes(argumentos, sem_valor=("-r",))
+        if lidas is None:
+            return
+        opcoes, posicionais = lidas
+        if len(posicionais) != 1:
+            print("Uso: rm [-r] caminho")
+            return
+        recursivo = "-r" in opcoes
+        componentes, pai, nome = self._separar(posicionais[0])
+        # Vale também sem '-r': um diretório atual vazio ('rm ../a' dentro de 'a') deixaria o shell
+        # num diretório que não existe mais
+        if nome is not None and tuple(self.caminho[1:len(componentes) + 2]) == componentes + (nome,):
+            print("Não é possível remover o diretório atual ou um dos seus pais.")
+            return
+        if pai is not None and nome is not None and not pai.vazio():
+            pai = self._proprio(componentes, pai)
+            # Remove o item em uma única descida, já obtendo o nó removido.
+            no = pai.arvore.pop(nome)
+        else:
+            no = None
+        if no is None:
             print("Elemento não encontrado.")
-        # Se for um diretório e não estiver vazio (ou seja, tem chaves em sua árvore interna),
-        # impede a remoção.
-        elif no.e_diretorio and no.arvore.listar_chaves():
+        # Se for um diretório e não estiver vazio, desfaz a remoção (só este caso de erro paga uma
+        # segunda descida).
+        elif no.e_diretorio and not no.vazio() and not recursivo:
+            pai.arvore.inserir(nome, no)
             print("Diretório não está vazio.")
         else:
-            # Deleta o item da B+ Tree do diretório atual.
-            self.cwd.arvore.deletar(nome)
+            # Descarta o caminho (e descendentes) do cache.
+            self.cache.invalidar(componentes + (nome,))
+            self._registrar("rm", componentes + (nome,))
+            if no.e_diretorio:
+                self._desmontar(no)
+
+    def _desmontar(self, no):
+        """
+        Esvazia as B+ Trees de um diretório removido e dos seus subdiretórios. Sem isso, a lista
+        ligada das folhas (um ciclo de referências) manteria a subárvore inteira na memória até a
+        próxima passada do coletor de ciclos. Diretórios de gerações anteriores podem fazer parte de
+        um snapshot e não são tocados.
+        """
+        pendentes = [no]
+        while pendentes:
+            diretorio = pendentes.pop()
+            if diretorio.geracao is not self.geracao or diretorio.vazio():
+                continue
+            for _, filho in diretorio.arvore.iterar_itens():
+                if filho.e_diretorio:
+                    pendentes.append(filho)
+            diretorio.arvore.limpar()
+
+    def do_find(self, *argumentos):
+        """
+        Procura recursivamente abaixo de um diretório (o atual ou o informado):
+        'find [caminho] [-name padrão] [-type d|f] [-maxdepth N] [-quit] [-j N]'.
+        '-name' aplica um padrão glob ao nome de cada item e '-type' filtra diretórios ou arquivos.
+        O percurso é preguiçoso: com '-quit' ele para na primeira ocorrência. Com '-j N' as
+        subárvores são repartidas entre N processos (a ordem da saída deixa de ser a pré-ordem), desde
+        que o shell não tenha outras threads (ver percurso._paralelo); senão o percurso é sequencial.
+        Os caminhos são mostrados a partir do caminho informado (ou de '.').
+        """
+        lidas = self._ler_opcoes(
+            argumentos, com_valor=("-name", "-type"), numericas=("-maxdepth", "-j"), sem_valor=("-quit",)
+        )
+        if lidas is None:
+            return
+        opcoes, posicionais = lidas
+        tipo = opcoes.get("-type")
+        if tipo not in (None, "d", "f"):
+            print("-type espera 'd' ou 'f'.")
+            return
+        partida = self._diretorio_inicial(posicionais)
+        if partida is None:
+            return
+        inicio, diretorio = partida
+        profundidade = opcoes.get("-maxdepth")
+        if profundidade == 0:
+            return
+        padrao = opcoes.get("-name")
+        processos = opcoes.get("-j", 1)
+        if processos > 1:
+            encontrados = encontrar_paralelo(diretorio, padrao, tipo, profundidade_maxima=profundidade, processos=processos)
+        else:
+            encontrados = encontrar(diretorio, padrao, tipo, profundidade_maxima=profundidade)
+        prefixo = inicio.rstrip("/")
+        try:
+            for caminho in islice(encontrados, 1) if "-quit" in opcoes else encontrados:
+                print(f"{prefixo}/{'/'.join(caminho)}")
+        finally:
+            # Interrompe o percurso (e encerra os processos) se ele não chegou ao fim
+            encontrados.close()
+
+    def do_du(self, *argumentos):
+        """
+        Conta tudo o que existe abaixo de um diretório (o atual ou o informado), em todos os níveis:
+        'du [caminho] [-j N]'. Como os arquivos do fakerational não têm conteúdo, o tamanho é o
+        número de itens. Com '-j N' as subárvores são repartidas entre N processos, como no 'find'.
+        """
+        lidas = self._ler_opcoes(argumentos, numericas=("-j",))
+        if lidas is None:
+            return
+        opcoes, posicionais = lidas
+        partida = self._diretorio_inicial(posicionais)
+        if partida is None:
+            return
+        inicio, diretorio = partida
+        processos = opcoes.get("-j", 1)
+        diretorios, arquivos = resumir_paralelo(diretorio, processos) if processos > 1 else resumir(diretorio)
+        print(f"{diretorios + arquivos}\t{inicio} ({diretorios} diretórios, {arquivos} arquivos)")
+
+    def do_tree(self, *argumentos):
+        """
+        Mostra a hierarquia abaixo de um diretório (o atual ou o informado), um item por linha,
+        indentado pela profundidade: 'tree [caminho] [-L N]', com '-L' limitando os níveis mostrados.
+        Ao final mostra o total de diretórios e arquivos listados.
+        """
+        lidas = self._ler_opcoes(argumentos, numericas=("-L",))
+        if lidas is None:
+            return
+        opcoes, posicionais = lidas
+        partida = self._diretorio_inicial(posicionais)
+        if partida is None:
+            return
+        inicio, diretorio = partida
+        if opcoes.get("-L") == 0:
+            return
+        diretorios = arquivos = 0
+        print(inicio)
+        for caminho, no in caminhar(diretorio, profundidade_maxima=opcoes.get("-L")):
+            if no.e_diretorio:
+                diretorios += 1
+            else:
+                arquivos += 1
+            print(f"{'    ' * len(caminho)}{caminho[-1]}{'/' if no.e_diretorio else ''}")
+        print(f"{diretorios} diretórios, {arquivos} arquivos")
+
+    def do_stats(self, *argumentos):
+        """
+        Mostra a estrutura da B+ Tree de um diretório (atual ou caminho informado): altura e, por nível,
+        número de nós, de chaves e ocupação. Se a instrumentação estiver ligada, mostra também os contadores.
+        'stats on' / 'stats off' ligam e desligam a instrumentação da árvore do diretório atual.
+        """
+        if argumentos and argumentos[0] in ("on", "off"):
+            # A instrumentação pertence à árvore, então o diretório não pode ser compartilhado com um snapshot
+            arvore = self._proprio(tuple(self.caminho[1:]), self.cwd).arvore
+            if argumentos[0] == "on":
+                arvore.ativar_metricas()
+            else:
+                arvore.desativar_metricas()
+            return
+        diretorio = self._resolver(self._normalizar(argumentos[0])) if argumentos else self.cwd
+        if diretorio is None or not diretorio.e_diretorio:
+            print("Diretório não encontrado.")
+            return
+        arvore = diretorio.arvore
+        niveis = arvore.perfil()
+        print(f"grau: {arvore.grau}  altura: {len(niveis)}  entradas: {len(arvore)}")
+        for profundidade, nivel in enumerate(niveis):
+            print(f"  nível {profundidade}: {nivel['nos']} nós, {nivel['chaves']} chaves, ocupação {nivel['ocupacao']:.0%}")
+        metricas = arvore.metricas
+        if metricas is None:
+            print("instrumentação desligada ('stats on' liga)")
+        else:
+            # Só as buscas passam por _encontrar_folha; inserções e remoções descem por conta própria
+            print(f"descidas de busca: {metricas.buscas}  nós visitados por descida de busca (média): {metricas.media_nos_visitados():.2f}")
+            print(f"divisões: {metricas.divisoes}  fusões: {metricas.fusoes}  redistribuições: {metricas.redistribuicoes}")
+            print(f"divisões por inserção: {dict(sorted(metricas.divisoes_por_insercao.items()))}")
+            print(f"fusões por remoção: {dict(sorted(metricas.fusoes_por_remocao.items()))}")
+
+    def do_snapshot(self, *argumentos):
+        """
+        'snapshot nome' guarda em O(1) uma visão do sistema de arquivos inteiro neste instante;
+        sem argumentos, lista os snapshots existentes, e 'snapshot -d nome' remove um deles.
+        Nada é copiado na hora: a partir daí cada diretório alterado é copiado na primeira alteração,
+        junto com os diretórios acima dele, e a sua B+ Tree copia só os nós do caminho alterado.
+        Essas B+ Trees ficam no modo copy-on-write, sem a lista ligada das folhas, até o último
+        snapshot ser removido (ver '_encerrar_compartilhamento').
+        """
+        if not argumentos:
+            for nome in sorted(self.snapshots):
+                print(nome)
+            return
+        if argumentos[0] == "-d":
+            if len(argumentos) != 2:
+                print("Uso: snapshot -d nome")
+            elif self.snapshots.pop(argumentos[1], None) is None:
+                print("Snapshot não encontrado.")
+            elif not self.snapshots:
+                self._encerrar_compartilhamento()
+            return
+        nome = argumentos[0]
+        if nome in self.snapshots:
+            print("Snapshot já existe.")
+            return
+        self.snapshots[nome] = self.raiz
+        # Nova geração: todos os nós existentes passam a ser compartilhados com o snapshot
+        self.geracao = object()
+
+    def _encerrar_compartilhamento(self):
+        """
+        Sem snapshots, os nós de gerações anteriores só são alcançáveis pelo sistema de arquivos atual.
+        Todos passam para a geração atual, para não serem mais copiados antes de uma alteração, e as
+        B+ Trees que estavam no modo copy-on-write saem dele (ArvoreBPlus.assumir_nos). Percorre o
+        sistema de arquivos inteiro uma vez.
+        """
+        geracao = self.geracao
+        self.raiz.geracao = geracao
+        pendentes = [self.raiz]
+        while pendentes:
+            diretorio = pendentes.pop()
+            if diretorio.vazio():
+                continue
+            arvore = diretorio.arvore
+            arvore.assumir_nos()
+            for _, filho in arvore.iterar_itens():
+                filho.geracao = geracao
+                if filho.e_diretorio:
+                    pendentes.append(filho)
+
+    def do_checkout(self, nome):
+        """
+        Volta o sistema de arquivos ao estado do snapshot informado. As alterações feitas depois do
+        último snapshot são descartadas; o snapshot em si continua intacto e pode ser usado de novo.
+        Permanece no mesmo caminho se ele existir no snapshot, senão vai para a raiz.
+        """
+        raiz = self.snapshots.get(nome)
+        if raiz is None:
+            print("Snapshot não encontrado.")
+            return
+        self.raiz = raiz
+        # Nova geração: os nós do snapshot são copiados antes de qualquer alteração
+        self.geracao = object()
+        self.cache.invalidar(())
+        self._entrar(tuple(self.caminho[1:]))
+        # O estado inteiro mudou: o diário é substituído por um checkpoint do snapshot
+        if self.diario is not None:
+            self.diario.checkpoint(self._registros_estado())
+
+    def do_checkpoint(self):
+        """
+        Grava um checkpoint do sistema de arquivos e esvazia o diário.
+        """
+        if self.diario is None:
+            print("Diário desativado.")
+            return
+        self.diario.checkpoint(self._registros_estado())
+
+def adicionar_opcoes(parser):
+    """
+    Opções do sistema de arquivos, comuns ao shell e ao servidor (servidor.py).
+    """
+    parser.add_argument("--diario", help="arquivo do write-ahead log; o estado é recuperado dele ao iniciar")
+    parser.add_argument("--intervalo", type=float, default=0.05, help="segundos entre sincronizações do diário (0: a cada alteração)")
+    parser.add_argument("--checkpoint", type=int, default=50000, help="registros no diário entre checkpoints")
+    parser.add_argument("--grau", type=int, default=No.GRAU, help="grau das B+ Trees dos diretórios (padrão: %(default)s)")
+    parser.add_argument(
+        "--comprimir", action="store_true",
+        help=f"comprime os prefixos comuns dos nomes nas folhas (ArvoreBPlusPrefixada), economizando memória ao custo de "
+             f"buscas e inserções mais lentas; só é ativada com --grau {ArvoreBPlusPrefixada.GRAU_MINIMO} ou maior, pois com "
+             f"graus menores gasta mais memória",
+    )
+    parser.add_argument("--filtro", action="store_true", help="filtro de Bloom em cada diretório: buscas de nomes ausentes não descem pela árvore, mas inserções ficam de 2 a 4 vezes mais lentas e cd/rm no shell não ficam mais rápidos")
+    parser.add_argument(
+        "--taxa-filtro", type=float, default=ArvoreBPlusFiltrada.TAXA_FALSOS_POSITIVOS,
+        help="taxa de falsos positivos do --filtro (padrão: %(default)s)",
+    )
+
+def criar_shell(argumentos):
+    """
+    Cria o Shell com as opções de 'adicionar_opcoes'.
+    """
+    if argumentos.grau < 3:
+        sys.exit("O --grau deve ser pelo menos 3.")
+    No.GRAU = argumentos.grau
+    comprimir = argumentos.comprimir
+    if comprimir and argumentos.grau < ArvoreBPlusPrefixada.GRAU_MINIMO:
+        # Em graus pequenos a compressão gasta mais memória do que economiza
+        print(f"--comprimir ignorado: só compensa com --grau {ArvoreBPlusPrefixada.GRAU_MINIMO} ou maior.", file=sys.stderr)
+        comprimir = False
+    if comprimir:
+        No.CLASSE_ARVORE = ArvoreBPlusPrefixada
+    if argumentos.filtro:
+        if not 0 < argumentos.taxa_filtro < 1:
+            sys.exit("A taxa de falsos positivos do --filtro deve estar entre 0 e 1.")
+        ArvoreBPlusFiltrada.TAXA_FALSOS_POSITIVOS = argumentos.taxa_filtro
+        No.CLASSE_ARVORE = ArvoreBPlusPrefixadaFiltrada if comprimir else ArvoreBPlusFiltrada
+    return Shell(argumentos.diario, argumentos.intervalo, argumentos.checkpoint)
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Shell do fakerational.")
+    parser.add_argument("script", nargs="?", help="arquivo de comandos para o modo em lote ('-' para a entrada padrão)")
+    adicionar_opcoes(parser)
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    # Cria uma instância do shell e o executa.
-    Shell().run()
\ No newline at end of file
+    argumentos = ler_argumentos()
+    shell = criar_shell(argumentos)
+    try:
+        if argumentos.script == "-":
+            # Modo em lote: lê os comandos da entrada padrão.
+            shell.executar(sys.stdin)
+        elif argumentos.script:
+            # Modo em lote: lê os comandos de um arquivo.
+            with open(argumentos.script, encoding="utf-8") as arquivo:
+                shell.executar(arquivo)
+        else:
+            # Executa o shell de forma interativa.
+            shell.run()
+    finally:
+        shell.fechar()
@@ -1,9 +1,20 @@
+import argparse
+import asyncio
+import csv
+import json
 import time
+import tracemalloc
 import random
 import math
-import matplotlib.pyplot as plt
 import os
+import platform
+import statistics
+import subprocess
 import sys
+import tempfile
+import threading
+from collections import deque
+from contextlib import redirect_stdout
 
 # Ajusta o PATH para que possamos importar a BPlusTree do diretório pai.
 # Assumindo a estrutura:
@@ -17,6 +28,11 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bplustree')))
 
 from bplustree import ArvoreBPlus # Sua classe BPlusTree está definida como ArvoreBPlus
+from concorrente import ArvoreBPlusConcorrente
+from prefixos import ArvoreBPlusPrefixada
+from Comandos_e_Fusao import No, Shell
+from filtro import ArvoreBPlusFiltrada
+import percurso
 
 
 # Funções para realizar os testes de benchmark
@@ -25,48 +41,890 @@ def medir_tempo_insercao(n_elementos, grau_arvore):
     chaves = list(range(n_elementos))
     random.shuffle(chaves) # Insere chaves em ordem aleatória para evitar pior caso
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     for chave in chaves:
         arvore.inserir(chave, f"valor_{chave}")
-    end_time = time.time()
+    end_time = time.perf_counter()
+    return end_time - start_time
+
+def medir_tempo_carga(n_elementos, grau_arvore):
+    itens = [(chave, f"valor_{chave}") for chave in range(n_elementos)]
+    random.shuffle(itens)
+
+    start_time = time.perf_counter()
+    ArvoreBPlus.carregar(itens, grau_arvore)
+    end_time = time.perf_counter()
     return end_time - start_time
 
 def medir_tempo_busca(n_elementos, grau_arvore):
-    arvore = ArvoreBPlus(grau_arvore)
     chaves_inserir = list(range(n_elementos))
-    for chave in chaves_inserir:
-        arvore.inserir(chave, f"valor_{chave}")
+    # Carga em lote: monta a árvore de baixo para cima sem passar por 'inserir'
+    arvore = ArvoreBPlus.carregar_ordenado(((chave, f"valor_{chave}") for chave in chaves_inserir), grau_arvore)
 
     chaves_buscar = random.sample(chaves_inserir, min(n_elementos, 1000)) # Busca um subconjunto para agilizar
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     for chave in chaves_buscar:
         arvore.buscar(chave)
-    end_time = time.time()
+    end_time = time.perf_counter()
     
     # Retorna o tempo médio por busca
     return (end_time - start_time) / len(chaves_buscar) if chaves_buscar else 0
 
 def medir_tempo_remocao(n_elementos, grau_arvore):
-    arvore = ArvoreBPlus(grau_arvore)
     chaves_inserir = list(range(n_elementos))
-    for chave in chaves_inserir:
-        arvore.inserir(chave, f"valor_{chave}")
+    # Carga em lote: monta a árvore de baixo para cima sem passar por 'inserir'
+    arvore = ArvoreBPlus.carregar_ordenado(((chave, f"valor_{chave}") for chave in chaves_inserir), grau_arvore)
     
     chaves_remover = random.sample(chaves_inserir, min(n_elementos, 1000)) # Remove um subconjunto
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     for chave in chaves_remover:
         arvore.deletar(chave)
-    end_time = time.time()
+    end_time = time.perf_counter()
 
     # Retorna o tempo médio por remoção
     return (end_time - start_time) / len(chaves_remover) if chaves_remover else 0
 
-def main():
+def comparar_graus(n_elementos, graus):
+    """
+    Mede o tempo médio de busca para cada grau informado, mostrando o ganho
+    da busca binária dentro dos nós quando o grau cresce.
+    """
+    chaves = list(range(n_elementos))
+    random.shuffle(chaves)
+    chaves_buscar = random.sample(chaves, min(n_elementos, 1000))
+    resultados = {}
+    for grau in graus:
+        arvore = ArvoreBPlus(grau)
+        for chave in chaves:
+            arvore.inserir(chave, f"valor_{chave}")
+
+        start_time = time.perf_counter()
+        for chave in chaves_buscar:
+            arvore.buscar(chave)
+        end_time = time.perf_counter()
+        resultados[grau] = (end_time - start_time) / len(chaves_buscar) if chaves_buscar else 0
+    return resultados
+
+def medir_lote_vs_individual(n_elementos, grau_arvore):
+    """
+    Compara a vazão (operações por segundo) das operações individuais com as versões em lote
+    (inserir_muitos, buscar_muitos, deletar_muitos) sobre as mesmas chaves embaralhadas.
+    """
+    chaves = list(range(n_elementos))
+    random.shuffle(chaves)
+    itens = [(chave, f"valor_{chave}") for chave in chaves]
+    resultados = {}
+
+    # Operações uma chave por vez
+    arvore = ArvoreBPlus(grau_arvore)
+    start_time = time.perf_counter()
+    for chave, valor in itens:
+        arvore.inserir(chave, valor)
+    tempo_ins = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for chave in chaves:
+        arvore.buscar(chave)
+    tempo_bus = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for chave in chaves:
+        arvore.deletar(chave)
+    tempo_rem = time.perf_counter() - start_time
+    resultados["individual"] = (n_elementos / tempo_ins, n_elementos / tempo_bus, n_elementos / tempo_rem)
+
+    # Operações em lote
+    arvore = ArvoreBPlus(grau_arvore)
+    start_time = time.perf_counter()
+    arvore.inserir_muitos(itens)
+    tempo_ins = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    arvore.buscar_muitos(chaves)
+    tempo_bus = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    arvore.deletar_muitos(chaves)
+    tempo_rem = time.perf_counter() - start_time
+    resultados["lote"] = (n_elementos / tempo_ins, n_elementos / tempo_bus, n_elementos / tempo_rem)
+    return resultados
+
+def medir_memoria_por_chave(n_elementos, grau_arvore, tipo_chave=None, tipo_valor=None):
+    """
+    Mede, com tracemalloc, quantos bytes a árvore ocupa por chave armazenada.
+    Com 'tipo_chave'/'tipo_valor' (ex: 'q') usa o modo compacto de arrays tipados.
+    """
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    # Os inteiros são criados dentro da medição: nas listas eles continuam vivos como objetos,
+    # nos arrays tipados são copiados como valores brutos e liberados junto com 'itens'
+    itens = [(chave, chave * 2) for chave in range(n_elementos)]
+    arvore = ArvoreBPlus.carregar_ordenado(itens, grau_arvore, tipo_chave=tipo_chave, tipo_valor=tipo_valor)
+    del itens
+    usado = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del arvore
+    return usado / n_elementos
+
+# ---------------------------------------------------------------------------
+# Suíte de benchmark reprodutível: matriz N x grau x distribuição, com aquecimento,
+# repetições, percentis e saída em JSON/CSV para comparação entre commits.
+# ---------------------------------------------------------------------------
+
+DISTRIBUICOES = ["sequencial", "aleatoria", "zipf", "nomes"]
+CAMPOS_RESULTADO = [
+    "operacao", "distribuicao", "n", "grau", "repeticoes", "amostras",
+    "mediana_ns", "p95_ns", "p99_ns", "media_ns", "ops_por_s", "pico_memoria_bytes",
+]
+
+def gerar_chaves(distribuicao, n_elementos, semente=42):
+    """
+    Gera a sequência de chaves de uma distribuição:
+    - sequencial: 0, 1, 2, ... (pior caso para divisões sempre no mesmo lado)
+    - aleatoria: permutação aleatória de 0..N-1
+    - zipf: N sorteios com repetição entre N chaves, com peso 1/k^1.1 (poucas chaves muito quentes)
+    - nomes: nomes de arquivo com prefixo comum, em ordem aleatória
+    """
+    gerador = random.Random(semente)
+    if distribuicao == "sequencial":
+        return list(range(n_elementos))
+    if distribuicao == "aleatoria":
+        chaves = list(range(n_elementos))
+        gerador.shuffle(chaves)
+        return chaves
+    if distribuicao == "zipf":
+        populacao = list(range(n_elementos))
+        gerador.shuffle(populacao)
+        pesos = [1 / (posicao ** 1.1) for posicao in range(1, n_elementos + 1)]
+        return gerador.choices(populacao, weights=pesos, k=n_elementos)
+    if distribuicao == "nomes":
+        chaves = [f"arquivo_{indice:08d}.txt" for indice in range(n_elementos)]
+        gerador.shuffle(chaves)
+        return chaves
+    raise ValueError(f"Distribuição desconhecida: {distribuicao}")
+
+def percentil(amostras_ordenadas, p):
+    """
+    Percentil pelo método do posto mais próximo sobre amostras já ordenadas.
+    """
+    indice = max(0, math.ceil(p / 100 * len(amostras_ordenadas)) - 1)
+    return amostras_ordenadas[indice]
+
+def resumir(operacao, distribuicao, n_elementos, grau, repeticoes, amostras, operacoes_por_amostra=1):
+    """
+    Monta o registro de resultado a partir das latências (em ns) coletadas.
+    """
+    ordenadas = sorted(amostras)
+    total_ns = sum(ordenadas)
+    return {
+        "operacao": operacao,
+        "distribuicao": distribuicao,
+        "n": n_elementos,
+        "grau": grau,
+        "repeticoes": repeticoes,
+        "amostras": len(ordenadas),
+        "mediana_ns": statistics.median(ordenadas),
+        "p95_ns": percentil(ordenadas, 95),
+        "p99_ns": percentil(ordenadas, 99),
+        "media_ns": total_ns / len(ordenadas),
+        "ops_por_s": len(ordenadas) * operacoes_por_amostra / (total_ns / 1e9) if total_ns else 0,
+        "pico_memoria_bytes": None,
+    }
+
+def executar_configuracao(distribuicao, n_elementos, grau, repeticoes, aquecimento, n_consultas):
+    """
+    Mede inserção, busca, remoção (latência por operação) e carga em lote (tempo total)
+    para uma combinação de distribuição, N e grau. As primeiras 'aquecimento' rodadas são descartadas.
+    """
+    relogio = time.perf_counter_ns
+    chaves = gerar_chaves(distribuicao, n_elementos)
+    itens = [(chave, chave) for chave in chaves]
+    # As consultas seguem a mesma distribuição das chaves (no zipf, concentram-se nas chaves quentes)
+    consultas = random.Random(7).choices(chaves, k=min(n_consultas, n_elementos))
+    amostras = {"insercao": [], "busca": [], "remocao": [], "carga": []}
+
+    for rodada in range(aquecimento + repeticoes):
+        valida = rodada >= aquecimento
+
+        arvore = ArvoreBPlus(grau)
+        latencias = []
+        for chave in chaves:
+            inicio = relogio()
+            arvore.inserir(chave, chave)
+            latencias.append(relogio() - inicio)
+        if valida:
+            amostras["insercao"] += latencias
+
+        latencias = []
+        for chave in consultas:
+            inicio = relogio()
+            arvore.buscar(chave)
+            latencias.append(relogio() - inicio)
+        if valida:
+            amostras["busca"] += latencias
+
+        latencias = []
+        for chave in consultas:
+            inicio = relogio()
+            arvore.deletar(chave)
+            latencias.append(relogio() - inicio)
+        if valida:
+            amostras["remocao"] += latencias
+
+        inicio = relogio()
+        ArvoreBPlus.carregar(itens, grau)
+        if valida:
+            amostras["carga"].append(relogio() - inicio)
+
+    resultados = [
+        resumir(operacao, distribuicao, n_elementos, grau, repeticoes, amostras[operacao])
+        for operacao in ("insercao", "busca", "remocao")
+    ]
+    resultados.append(resumir("carga", distribuicao, n_elementos, grau, repeticoes, amostras["carga"], n_elementos))
+
+    # Pico de memória da construção por inserções, medido à parte para não distorcer os tempos
+    tracemalloc.start()
+    arvore = ArvoreBPlus(grau)
+    for chave in chaves:
+        arvore.inserir(chave, chave)
+    resultados[0]["pico_memoria_bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultados
+
+def executar_suite(tamanhos, graus, distribuicoes, repeticoes=5, aquecimento=1, n_consultas=1000):
+    """
+    Percorre a matriz completa de configurações e retorna a lista de registros de resultado.
+    """
+    resultados = []
+    for distribuicao in distribuicoes:
+        for n_elementos in tamanhos:
+            for grau in graus:
+                print(f"  {distribuicao:>10} N={n_elementos:<8} grau={grau:<4}", file=sys.stderr)
+                resultados += executar_configuracao(
+                    distribuicao, n_elementos, grau, repeticoes, aquecimento, n_consultas
+                )
+    return resultados
+
+def salvar_json(resultados, caminho):
+    """
+    Grava os resultados com metadados do ambiente, para comparação entre execuções.
+    """
+    documento = {
+        "metadados": {
+            "python": platform.python_version(),
+            "implementacao": platform.python_implementation(),
+            "plataforma": platform.platform(),
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "resultados": resultados,
+    }
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(documento, arquivo, indent=2, ensure_ascii=False)
+
+def salvar_csv(resultados, caminho):
+    """
+    Grava os resultados em CSV, uma linha por (operação, distribuição, N, grau).
+    """
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS_RESULTADO)
+        escritor.writeheader()
+        escritor.writerows(resultados)
+
+def comparar(caminho_base, resultados, tolerancia=0.10):
+    """
+    Compara as medianas com as de um JSON anterior e lista as configurações que ficaram mais
+    lentas que a tolerância (10% por padrão). Retorna a lista de regressões encontradas.
+    """
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)["resultados"]
+    indice = {
+        (registro["operacao"], registro["distribuicao"], registro["n"], registro["grau"]): registro
+        for registro in base
+    }
+    regressoes = []
+    for registro in resultados:
+        anterior = indice.get((registro["operacao"], registro["distribuicao"], registro["n"], registro["grau"]))
+        if not anterior or not anterior["mediana_ns"]:
+            continue
+        razao = registro["mediana_ns"] / anterior["mediana_ns"]
+        marcador = "REGRESSÃO" if razao > 1 + tolerancia else ""
+        print(
+            f"  {registro['operacao']:>8} {registro['distribuicao']:>10} N={registro['n']:<8} "
+            f"grau={registro['grau']:<4} {anterior['mediana_ns']:>10.0f} -> {registro['mediana_ns']:>10.0f} ns "
+            f"({razao:.2f}x) {marcador}"
+        )
+        if marcador:
+            regressoes.append(registro)
+    return regressoes
+
+def main_suite(argumentos):
+    """
+    Ponto de entrada da suíte (python benchmark.py --suite ...).
+    """
+    print("Executando suíte de benchmark...", file=sys.stderr)
+    resultados = executar_suite(
+        argumentos.n, argumentos.graus, argumentos.distribuicoes,
+        argumentos.repeticoes, argumentos.aquecimento, argumentos.consultas,
+    )
+    for registro in resultados:
+        print(
+            f"{registro['operacao']:>8} {registro['distribuicao']:>10} N={registro['n']:<8} grau={registro['grau']:<4} "
+            f"mediana={registro['mediana_ns']:>9.0f} ns  p95={registro['p95_ns']:>9.0f} ns  "
+            f"p99={registro['p99_ns']:>9.0f} ns  {registro['ops_por_s']:>12,.0f} ops/s"
+        )
+    if argumentos.json:
+        salvar_json(resultados, argumentos.json)
+        print(f"\nResultados salvos em: {argumentos.json}")
+    if argumentos.csv:
+        salvar_csv(resultados, argumentos.csv)
+        print(f"Resultados salvos em: {argumentos.csv}")
+    if argumentos.comparar:
+        print(f"\nComparação com {argumentos.comparar}:")
+        regressoes = comparar(argumentos.comparar, resultados, argumentos.tolerancia)
+        # Código de saída diferente de zero permite usar a comparação para barrar regressões
+        return 1 if regressoes else 0
+    return 0
+
+def medir_concorrencia(n_threads, grau, operacoes_por_thread=20000, chaves_por_thread=5000, semente=42):
+    """
+    Carga mista (buscas, varreduras curtas, inserções e remoções) de várias threads sobre a
+    mesma ArvoreBPlusConcorrente. Cada thread opera num conjunto de chaves só seu, o que permite
+    conferir no final o conteúdo exato da árvore, além das invariantes estruturais.
+    Retorna (operações por segundo, número de chaves na árvore ao final).
+    """
+    arvore = ArvoreBPlusConcorrente(grau)
+    esperados = [{} for _ in range(n_threads)]
+    falhas = []
+    largada = threading.Barrier(n_threads + 1)
+
+    def trabalhador(indice):
+        gerador = random.Random(semente + indice)
+        meus = esperados[indice]
+        largada.wait()
+        try:
+            for _ in range(operacoes_por_thread):
+                # Chaves intercaladas entre as threads: todas disputam as mesmas folhas
+                chave = gerador.randrange(chaves_por_thread) * n_threads + indice
+                sorteio = gerador.random()
+                if sorteio < 0.50:
+                    assert arvore.buscar(chave) == meus.get(chave), chave
+                elif sorteio < 0.55:
+                    for _, _ in zip(arvore.iterar_itens(chave), range(50)):
+                        pass
+                elif sorteio < 0.80:
+                    arvore.inserir(chave, chave)
+                    meus[chave] = chave
+                else:
+                    assert arvore.pop(chave) == meus.pop(chave, None), chave
+        except Exception as erro:
+            falhas.append(erro)
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    largada.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    if falhas:
+        raise falhas[0]
+    # Invariantes estruturais e conteúdo final igual à união do que cada thread espera
+    arvore.verificar()
+    conteudo = {}
+    for meus in esperados:
+        conteudo.update(meus)
+    if list(arvore.iterar_itens()) != sorted(conteudo.items()):
+        raise AssertionError("conteúdo da árvore difere do esperado após a carga concorrente")
+    return n_threads * operacoes_por_thread / duracao, len(conteudo)
+
+def main_concorrencia(argumentos):
+    """
+    Ponto de entrada da carga concorrente (python benchmark.py --concorrencia ...).
+    """
+    for grau in argumentos.graus:
+        for n_threads in argumentos.threads:
+            vazao, total = medir_concorrencia(n_threads, grau, argumentos.operacoes)
+            print(f"grau={grau:<4} threads={n_threads:<3} {vazao:>12,.0f} ops/s  chaves={total:<7} invariantes ok")
+    return 0
+
+def comandos_diario(n_comandos, semente=42):
+    """
+    Gera 'n_comandos' alterações do shell (mkdir/touch em até 100 diretórios, alguns rm).
+    """
+    gerador = random.Random(semente)
+    comandos = [("mkdir", f"d{i}") for i in range(100)]
+    while len(comandos) < n_comandos:
+        caminho = f"d{gerador.randrange(100)}/f{gerador.randrange(n_comandos)}"
+        comandos.append(("rm" if gerador.random() < 0.1 else "touch", caminho))
+    return comandos
+
+def medir_diario(comandos, intervalo, diretorio):
+    """
+    Aplica os comandos num Shell com write-ahead log (intervalo None: sem diário).
+    Retorna (comandos por segundo, número de fsyncs). O tempo inclui a sincronização final.
+    """
+    caminho = os.path.join(diretorio, f"diario-{intervalo}.log") if intervalo is not None else None
+    shell = Shell(caminho, intervalo or 0, checkpoint_a_cada=len(comandos) + 1)
+    inicio = time.perf_counter()
+    for comando, caminho_item in comandos:
+        getattr(shell, f"do_{comando}")(caminho_item)
+    sincronizacoes = 0
+    if shell.diario is not None:
+        shell.diario.sincronizar()
+        sincronizacoes = shell.diario.sincronizacoes
+    duracao = time.perf_counter() - inicio
+    shell.fechar()
+    return len(comandos) / duracao, sincronizacoes
+
+def medir_recuperacao(comandos, diretorio):
+    """
+    Grava os comandos num diário e mede a recuperação: carga em lote a partir do diário (como
+    o Shell faz ao iniciar) contra a reaplicação comando a comando (uma inserção por item).
+    Retorna (segundos em lote, segundos comando a comando).
+    """
+    caminho = os.path.join(diretorio, "recuperacao.log")
+    shell = Shell(caminho, 0.05, checkpoint_a_cada=len(comandos) + 1)
+    for comando, caminho_item in comandos:
+        getattr(shell, f"do_{comando}")(caminho_item)
+    shell.fechar()
+
+    inicio = time.perf_counter()
+    Shell(caminho, 0.05).fechar()
+    em_lote = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    shell = Shell()
+    for comando, caminho_item in comandos:
+        getattr(shell, f"do_{comando}")(caminho_item)
+    individual = time.perf_counter() - inicio
+    return em_lote, individual
+
+def main_diario(argumentos):
+    """
+    Ponto de entrada do benchmark do write-ahead log (python benchmark.py --diario ...).
+    """
+    # Alguns rm imprimem "Elemento não encontrado."; a saída dos comandos é descartada
+    with tempfile.TemporaryDirectory() as diretorio, open(os.devnull, "w") as nulo:
+        for n_comandos in argumentos.n:
+            comandos = comandos_diario(n_comandos)
+            print(f"N = {n_comandos} comandos")
+            for intervalo in [None] + argumentos.intervalos:
+                with redirect_stdout(nulo):
+                    vazao, sincronizacoes = medir_diario(comandos, intervalo, diretorio)
+                rotulo = "sem diário" if intervalo is None else f"intervalo {intervalo} s"
+                print(f"  {rotulo:>16}: {vazao:>12,.0f} comandos/s  fsyncs={sincronizacoes}")
+            with redirect_stdout(nulo):
+                em_lote, individual = medir_recuperacao(comandos, diretorio)
+            print(f"  recuperação: em lote {em_lote:.3f} s | comando a comando {individual:.3f} s")
+    return 0
+
+def nomes_de_arquivo(n_elementos, semente=42):
+    """
+    Nomes de arquivo com prefixos longos em comum, como num diretório de logs:
+    'log_2026_10_17_0001.txt', 'log_2026_10_17_0002.txt', ..., em ordem aleatória.
+    """
+    gerador = random.Random(semente)
+    por_dia = max(1, n_elementos // 30)
+    nomes = [f"log_2026_10_{1 + i // por_dia:02d}_{i % por_dia:06d}.txt" for i in range(n_elementos)]
+    gerador.shuffle(nomes)
+    return nomes
+
+def medir_nomes(n_elementos, grau, classe):
+    """
+    Carga de nomes de arquivo numa árvore da classe informada (ArvoreBPlus ou ArvoreBPlusPrefixada).
+    Retorna (bytes por entrada, inserções/s, buscas/s, itens varridos/s). Os nomes são criados
+    dentro da medição de memória e só a árvore os mantém vivos, como no shell.
+    """
+    tracemalloc.start()
+    inicio_memoria = tracemalloc.get_traced_memory()[0]
+    nomes = nomes_de_arquivo(n_elementos)
+    arvore = classe(grau)
+    inicio = time.perf_counter()
+    for nome in nomes:
+        arvore.inserir(nome, None)
+    tempo_insercao = time.perf_counter() - inicio
+    del nomes
+    usado = tracemalloc.get_traced_memory()[0] - inicio_memoria
+    tracemalloc.stop()
+
+    consultas = nomes_de_arquivo(n_elementos, semente=7)
+    inicio = time.perf_counter()
+    for nome in consultas:
+        arvore.buscar(nome)
+    tempo_busca = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for _ in arvore.iterar_itens():
+        pass
+    tempo_varredura = time.perf_counter() - inicio
+    return (
+        usado / n_elementos,
+        n_elementos / tempo_insercao,
+        n_elementos / tempo_busca,
+        n_elementos / tempo_varredura,
+    )
+
+def main_nomes(argumentos):
+    """
+    Ponto de entrada da comparação com nomes de arquivo (python benchmark.py --nomes ...).
+    """
+    for n_elementos in argumentos.n:
+        print(f"N = {n_elementos} nomes de arquivo")
+        for grau in argumentos.graus:
+            for classe in (ArvoreBPlus, ArvoreBPlusPrefixada):
+                memoria, insercoes, buscas, varredura = medir_nomes(n_elementos, grau, classe)
+                print(
+                    f"  grau={grau:<4} {classe.__name__:>20}: {memoria:6.1f} bytes/entrada | "
+                    f"inserção {insercoes:>10,.0f}/s | busca {buscas:>10,.0f}/s | varredura {varredura:>12,.0f}/s"
+                )
+    return 0
+
+def hierarquia(n_itens):
+    """
+    Sistema de arquivos sintético com cerca de 'n_itens' itens em três níveis: L diretórios com
+    L subdiretórios cada, e L arquivos em cada subdiretório (L = raiz cúbica de n_itens).
+    Retorna o diretório raiz, montado por carga em lote como na recuperação do diário.
+    """
+    largura = max(2, round(n_itens ** (1 / 3)))
+    arquivos = {f"arquivo_{k:05d}.log": None for k in range(largura)}
+    conteudo = {
+        f"dir{i:04d}": {f"sub{j:04d}": dict(arquivos) for j in range(largura)}
+        for i in range(largura)
+    }
+    return Shell()._montar(conteudo)
+
+def cronometrar(funcao):
+    """
+    Retorna (resultado, segundos) de uma chamada.
+    """
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+def main_percurso(argumentos):
+    """
+    Ponto de entrada do benchmark dos percursos recursivos (python benchmark.py --percurso ...):
+    caminhada completa, find -name sequencial e com processos, parada na primeira ocorrência e du.
+    """
+    padrao = "*7*.log"
+    for n_itens in argumentos.n:
+        raiz, montagem = cronometrar(lambda: hierarquia(n_itens))
+        total, tempo = cronometrar(lambda: sum(1 for _ in percurso.caminhar(raiz)))
+        print(f"N = {total} itens (montagem {montagem:.2f} s, {os.cpu_count()} CPUs)")
+        print(f"  caminhar:              {tempo:7.3f} s  ({total / tempo:>12,.0f} itens/s)")
+        sequencial, tempo_sequencial = cronometrar(lambda: sum(1 for _ in percurso.encontrar(raiz, padrao)))
+        print(f"  find -name {padrao}:    {tempo_sequencial:7.3f} s  ({sequencial} ocorrências)")
+        for processos in argumentos.processos:
+            encontrados, tempo = cronometrar(
+                lambda: sum(1 for _ in percurso.encontrar_paralelo(raiz, padrao, processos=processos))
+            )
+            if encontrados != sequencial:
+                raise AssertionError("O find paralelo divergiu do sequencial")
+            print(f"    -j {processos:<3}               {tempo:7.3f} s  (x{tempo_sequencial / tempo:.2f})")
+        _, tempo = cronometrar(lambda: next(percurso.encontrar(raiz, padrao)))
+        print(f"  find -quit:            {tempo * 1000:7.3f} ms até a primeira ocorrência")
+        resumo, tempo_sequencial = cronometrar(lambda: percurso.resumir(raiz))
+        print(f"  du:                    {tempo_sequencial:7.3f} s  {resumo}")
+        for processos in argumentos.processos:
+            paralelo, tempo = cronometrar(lambda: percurso.resumir_paralelo(raiz, processos))
+            if paralelo != resumo:
+                raise AssertionError("O du paralelo divergiu do sequencial")
+            print(f"    -j {processos:<3}               {tempo:7.3f} s  (x{tempo_sequencial / tempo:.2f})")
+    return 0
+
+def medir_remocao_intervalo(n_elementos, grau):
+    """
+    Remove os 90% centrais das chaves de uma árvore com 'n_elementos' chaves de três formas:
+    uma chamada de 'deletar' por chave, 'deletar_muitos' e 'deletar_intervalo'.
+    Retorna os segundos de cada uma, nessa ordem.
+    """
+    inicio, fim = n_elementos // 20, n_elementos - n_elementos // 20
+    tempos = []
+    for remover in (
+        lambda arvore: [arvore.deletar(chave) for chave in range(inicio, fim)],
+        lambda arvore: arvore.deletar_muitos(range(inicio, fim)),
+        lambda arvore: arvore.deletar_intervalo(inicio, fim),
+    ):
+        arvore = ArvoreBPlus.carregar_ordenado(((chave, None) for chave in range(n_elementos)), grau)
+        _, tempo = cronometrar(lambda: remover(arvore))
+        if len(arvore) != n_elementos - (fim - inicio):
+            raise AssertionError("Remoção incompleta")
+        tempos.append(tempo)
+    return tempos
+
+def medir_rm_recursivo(n_itens):
+    """
+    Remove um diretório com 'n_itens' arquivos pelo shell: 'rm' de cada arquivo seguido de 'rm' do
+    diretório vazio, contra um único 'rm -r'. Retorna os segundos de cada forma.
+    """
+    tempos = []
+    for comandos in (
+        [f"d/arquivo_{i}" for i in range(n_itens)] + ["d"],
+        ["-r d"],
+    ):
+        shell = Shell()
+        shell.raiz = shell.cwd = shell._montar({"d": {f"arquivo_{i}": None for i in range(n_itens)}})
+        _, tempo = cronometrar(lambda: [shell.do_rm(*comando.split()) for comando in comandos])
+        if not shell.raiz.vazio():
+            raise AssertionError("O diretório não foi removido")
+        tempos.append(tempo)
+    return tempos
+
+def main_remocao(argumentos):
+    """
+    Ponto de entrada do benchmark de remoções em massa (python benchmark.py --remocao ...).
+    """
+    for n_elementos in argumentos.n:
+        print(f"N = {n_elementos}")
+        for grau in argumentos.graus:
+            uma_a_uma, em_lote, intervalo = medir_remocao_intervalo(n_elementos, grau)
+            print(
+                f"  grau={grau:<4} 90% das chaves: deletar {uma_a_uma:7.3f} s | deletar_muitos {em_lote:7.3f} s"
+                f" | deletar_intervalo {intervalo:7.3f} s (x{uma_a_uma / intervalo:.0f})"
+            )
+        item_a_item, recursivo = medir_rm_recursivo(n_elementos)
+        print(f"  shell: rm de cada arquivo {item_a_item:7.3f} s | rm -r {recursivo:7.3f} s (x{item_a_item / recursivo:.0f})")
+    return 0
+
+def consultas_com_ausentes(nomes, n_consultas, fracao_ausentes, semente=7):
+    """
+    Lista de 'n_consultas' nomes embaralhada em que 'fracao_ausentes' deles não estão em 'nomes'
+    (nomes parecidos com um sufixo a mais, como um erro de digitação).
+    """
+    aleatorio = random.Random(semente)
+    ausentes = round(n_consultas * fracao_ausentes)
+    consultas = [aleatorio.choice(nomes) + "~" for _ in range(ausentes)]
+    consultas += [aleatorio.choice(nomes) for _ in range(n_consultas - ausentes)]
+    aleatorio.shuffle(consultas)
+    return consultas
+
+def medir_filtro(n_elementos, grau, taxa, fracoes_ausentes):
+    """
+    Carga com muitas buscas de nomes ausentes numa árvore de 'n_elementos' nomes de arquivo, sem
+    filtro (taxa None) ou com uma ArvoreBPlusFiltrada com a taxa de falsos positivos dada.
+    Retorna um dicionário com inserções/s, buscas/s para cada fração de ausentes, remoções de
+    nomes ausentes/s (o 'rm' com erro de digitação), bytes do filtro por entrada e a taxa de
+    falsos positivos observada.
+    """
+    nomes = nomes_de_arquivo(n_elementos)
+    arvore = ArvoreBPlus(grau) if taxa is None else ArvoreBPlusFiltrada(grau, taxa=taxa)
+    _, tempo = cronometrar(lambda: [arvore.inserir(nome, None) for nome in nomes])
+    resultado = {"insercao": n_elementos / tempo}
+    for fracao in fracoes_ausentes:
+        consultas = consultas_com_ausentes(nomes, n_elementos, fracao)
+        _, tempo = cronometrar(lambda: [arvore.buscar(nome) for nome in consultas])
+        resultado[f"busca_{fracao:g}"] = n_elementos / tempo
+    ausentes = consultas_com_ausentes(nomes, n_elementos, 1.0)
+    _, tempo = cronometrar(lambda: [arvore.pop(nome) for nome in ausentes])
+    resultado["remocao_ausente"] = n_elementos / tempo
+    if taxa is not None:
+        resultado["bytes_filtro"] = len(arvore.filtro.contadores) / n_elementos
+        resultado["falsos_positivos"] = sum(map(arvore.filtro.contem, ausentes)) / n_elementos
+    return resultado
+
+def medir_cd_inexistente(n_itens, classe):
+    """
+    Tempo de 'n_itens' comandos 'cd' para subdiretórios inexistentes de um diretório com 'n_itens'
+    itens, com a classe de árvore dos diretórios informada.
+    """
+    original = No.CLASSE_ARVORE
+    No.CLASSE_ARVORE = classe
+    try:
+        shell = Shell()
+        shell.raiz = shell.cwd = shell._montar({"d": {f"dir_{i:06d}": {} for i in range(n_itens)}})
+        comandos = [f"d/dir_{i:06d}x" for i in range(n_itens)]
+        # Cada 'cd' imprime "Diretório não encontrado."; a saída é descartada
+        with open(os.devnull, "w") as nulo, redirect_stdout(nulo):
+            _, tempo = cronometrar(lambda: [shell.do_cd(comando) for comando in comandos])
+    finally:
+        No.CLASSE_ARVORE = original
+    return tempo
+
+def main_filtro(argumentos):
+    """
+    Ponto de entrada do benchmark do filtro de nomes ausentes (python benchmark.py --filtro ...).
+    """
+    for n_elementos in argumentos.n:
+        print(f"N = {n_elementos} nomes de arquivo")
+        for grau in argumentos.graus:
+            for taxa in [None] + argumentos.taxas:
+                medidas = medir_filtro(n_elementos, grau, taxa, argumentos.ausentes)
+                rotulo = "sem filtro" if taxa is None else f"filtro {taxa:g}"
+                buscas = " | ".join(
+                    f"busca {fracao:.0%} ausentes {medidas[f'busca_{fracao:g}']:>9,.0f}/s" for fracao in argumentos.ausentes
+                )
+                linha = (
+                    f"  grau={grau:<4} {rotulo:>13}: inserção {medidas['insercao']:>9,.0f}/s | {buscas}"
+                    f" | rm ausente {medidas['remocao_ausente']:>9,.0f}/s"
+                )
+                if taxa is not None:
+                    linha += f" | {medidas['bytes_filtro']:.1f} bytes/entrada, {medidas['falsos_positivos']:.2%} falsos positivos"
+                print(linha)
+        sem_filtro = medir_cd_inexistente(n_elementos, ArvoreBPlus)
+        com_filtro = medir_cd_inexistente(n_elementos, ArvoreBPlusFiltrada)
+        print(f"  shell: cd inexistente sem filtro {sem_filtro:7.3f} s | com filtro {com_filtro:7.3f} s (x{sem_filtro / com_filtro:.1f})")
+    return 0
+
+def comandos_sessao(n_comandos, cliente, semente=42):
+    """
+    Gera os comandos de uma sessão do servidor: cria e entra num diretório próprio e depois mistura
+    touch, rm, mkdir, ls --count e cd para diretórios inexistentes.
+    """
+    gerador = random.Random(semente + cliente)
+    comandos = [f"mkdir /c{cliente}", f"cd /c{cliente}"]
+    while len(comandos) < n_comandos:
+        sorteio = gerador.random()
+        nome = gerador.randrange(n_comandos)
+        if sorteio < 0.4:
+            comandos.append(f"touch f{nome}")
+        elif sorteio < 0.6:
+            comandos.append(f"rm f{nome}")
+        elif sorteio < 0.7:
+            comandos.append(f"mkdir d{nome}")
+        elif sorteio < 0.85:
+            comandos.append("ls --count")
+        else:
+            comandos.append(f"cd d{nome}x")
+    return comandos
+
+async def conectar(endereco):
+    """
+    Abre uma conexão com o servidor (servidor.py) em 'host:porta' ou no socket Unix 'endereco'.
+    """
+    if ":" in endereco:
+        host, porta = endereco.rsplit(":", 1)
+        return await asyncio.open_connection(host, int(porta))
+    return await asyncio.open_unix_connection(endereco)
+
+async def cliente_carga(endereco, comandos, profundidade, latencias):
+    """
+    Envia os comandos numa sessão, com até 'profundidade' comandos sem resposta de cada vez
+    (pipelining), e acrescenta a 'latencias' os segundos entre o envio e o fim de cada resposta.
+    """
+    leitor, escritor = await conectar(endereco)
+    await leitor.readline()  # Prompt inicial
+    janela = asyncio.Semaphore(profundidade)
+    envios = deque()
+
+    async def enviar():
+        for comando in comandos:
+            await janela.acquire()
+            envios.append(time.perf_counter())
+            escritor.write(f"{comando}\n".encode())
+            await escritor.drain()
+
+    async def receber():
+        for _ in comandos:
+            # A resposta termina na linha do prompt
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    raise ConnectionError("O servidor fechou a conexão")
+                if linha.endswith(b"$ \n"):
+                    break
+            latencias.append(time.perf_counter() - envios.popleft())
+            janela.release()
+
+    await asyncio.gather(enviar(), receber())
+    escritor.write(b"exit\n")
+    escritor.close()
+    await escritor.wait_closed()
+
+async def carga_servidor(endereco, n_clientes, profundidade, n_comandos):
+    """
+    Roda 'n_clientes' sessões simultâneas com 'n_comandos' comandos no total.
+    Retorna (comandos por segundo, latências em segundos).
+    """
+    latencias = []
+    por_cliente = max(2, n_comandos // n_clientes)
+    sessoes = [comandos_sessao(por_cliente, cliente) for cliente in range(n_clientes)]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente_carga(endereco, comandos, profundidade, latencias) for comandos in sessoes))
+    duracao = time.perf_counter() - inicio
+    return len(latencias) / duracao, latencias
+
+def iniciar_servidor(diretorio):
+    """
+    Inicia o servidor em outro processo, num socket Unix em 'diretorio' (TCP numa porta livre se
+    a plataforma não tiver sockets Unix). Retorna (processo, endereço).
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "servidor.py")
+    if os.name == "posix":
+        opcoes = ["--unix", os.path.join(diretorio, "servidor.sock")]
+    else:
+        opcoes = ["--porta", "0"]
+    processo = subprocess.Popen([sys.executable, script, *opcoes], stderr=subprocess.PIPE, text=True)
+    # O servidor avisa na saída de erro quando começa a aceitar conexões
+    linha = processo.stderr.readline()
+    if not linha.startswith("Servindo em "):
+        processo.kill()
+        raise RuntimeError(f"O servidor não iniciou: {linha}{processo.stderr.read()}")
+    return processo, linha[len("Servindo em "):].strip()
+
+def main_servidor(argumentos):
+    """
+    Ponto de entrada do gerador de carga do servidor (python benchmark.py --servidor ...).
+    Sem --endereco, cada configuração usa um servidor novo, iniciado num processo separado.
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        for n_clientes in argumentos.clientes:
+            for profundidade in argumentos.profundidades:
+                processo = None
+                endereco = argumentos.endereco
+                if endereco is None:
+                    processo, endereco = iniciar_servidor(diretorio)
+                try:
+                    vazao, latencias = asyncio.run(carga_servidor(endereco, n_clientes, profundidade, argumentos.comandos))
+                finally:
+                    if processo is not None:
+                        processo.terminate()
+                        processo.wait()
+                ordenadas = sorted(latencias)
+                print(
+                    f"clientes={n_clientes:<4} pipeline={profundidade:<3} {vazao:>10,.0f} comandos/s | latência (ms) "
+                    f"p50 {percentil(ordenadas, 50) * 1e3:7.3f}  p95 {percentil(ordenadas, 95) * 1e3:7.3f}  "
+                    f"p99 {percentil(ordenadas, 99) * 1e3:7.3f}  máx {ordenadas[-1] * 1e3:7.3f}"
+                )
+    return 0
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark da B+ Tree do fakerational.")
+    parser.add_argument("--suite", action="store_true", help="executa a suíte reprodutível em vez do gráfico")
+    parser.add_argument("--concorrencia", action="store_true", help="executa a carga mista multi-thread")
+    parser.add_argument("--nomes", action="store_true", help="compara a árvore com e sem compressão de nomes de arquivo")
+    parser.add_argument("--diario", action="store_true", help="mede o write-ahead log do shell e a recuperação")
+    parser.add_argument("--remocao", action="store_true", help="compara remoções uma a uma, em lote, por intervalo e rm -r")
+    parser.add_argument("--percurso", action="store_true", help="mede find/du recursivos, sequenciais e com processos")
+    parser.add_argument("--filtro", action="store_true", help="mede buscas e remoções de nomes ausentes com e sem o filtro de Bloom")
+    parser.add_argument("--taxas", type=float, nargs="+", default=[0.01, 0.001], help="taxas de falsos positivos do filtro")
+    parser.add_argument("--ausentes", type=float, nargs="+", default=[0.5, 0.9, 0.99], help="frações de buscas por nomes ausentes")
+    parser.add_argument("--servidor", action="store_true", help="gera carga de várias sessões no servidor asyncio (servidor.py)")
+    parser.add_argument("--endereco", help="servidor já em execução (host:porta ou socket Unix); sem ele, um é iniciado por configuração")
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 8, 64], help="sessões simultâneas no servidor")
+    parser.add_argument("--profundidades", type=int, nargs="+", default=[1, 16], help="comandos em trânsito por sessão (pipelining)")
+    parser.add_argument("--comandos", type=int, default=20000, help="comandos no total, repartidos entre as sessões")
+    parser.add_argument("--processos", type=int, nargs="+", default=[2, 4], help="processos dos percursos paralelos")
+    parser.add_argument("--intervalos", type=float, nargs="+", default=[0, 0.01, 0.1], help="intervalos de sincronização do diário (s)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="threads da carga concorrente")
+    parser.add_argument("--operacoes", type=int, default=20000, help="operações por thread na carga concorrente")
+    parser.add_argument("--n", type=int, nargs="+", default=[10**3, 10**4], help="tamanhos de entrada")
+    parser.add_argument("--graus", type=int, nargs="+", default=[4, 16, 64, 256], help="graus da árvore")
+    parser.add_argument("--distribuicoes", nargs="+", choices=DISTRIBUICOES, default=DISTRIBUICOES)
+    parser.add_argument("--repeticoes", type=int, default=5, help="rodadas medidas por configuração")
+    parser.add_argument("--aquecimento", type=int, default=1, help="rodadas descartadas antes da medição")
+    parser.add_argument("--consultas", type=int, default=1000, help="buscas/remoções por rodada")
+    parser.add_argument("--json", help="arquivo JSON de saída")
+    parser.add_argument("--csv", help="arquivo CSV de saída")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="piora relativa aceita na comparação")
+    parser.add_argument("--grau", type=int, default=4, help="grau usado no gráfico (modo padrão)")
+    return parser.parse_args()
+
+def main(grau_arvore=4):
+    # O matplotlib só é necessário para o gráfico; a suíte roda sem ele
+    import matplotlib.pyplot as plt
+
     tamanhos_n = [10**3, 10**4, 10**5]  # Reduzindo para evitar execuções muito longas em testes iniciais.
                                        # Você pode voltar para [10**4, 10**5, 10**6] depois.
-    grau_arvore = 4 # Grau da B+ Tree (o mesmo usado no Shell)
 
     tempos_insercao = []
     tempos_busca = []
@@ -83,6 +941,10 @@ def main():
         tempos_insercao.append(tempo_ins)
         print(f"  Tempo de Inserção de {n} elementos: {tempo_ins:.6f} segundos")
         
+        # Carga em lote (mesmas chaves embaralhadas da inserção)
+        tempo_carga = medir_tempo_carga(n, grau_arvore)
+        print(f"  Tempo de Carga em Lote de {n} elementos: {tempo_carga:.6f} segundos")
+
         # Busca (tempo médio por operação)
         tempo_bus = medir_tempo_busca(n, grau_arvore)
         tempos_busca.append(tempo_bus)
@@ -96,6 +958,27 @@ def main():
         # Valores de referência para O(log N)
         log_n_valores.append(math.log10(n) if n > 0 else 0) # Usando log base 10 para visualização
 
+    # Comparação entre graus: com busca binária nos nós, graus maiores reduzem a altura
+    # da árvore sem tornar cada visita a um nó linear no número de chaves
+    n_graus = tamanhos_n[-1]
+    print(f"\nComparando graus com N = {n_graus} elementos...")
+    for grau, tempo in comparar_graus(n_graus, [4, 16, 64, 128, 256, 512]).items():
+        print(f"  Grau {grau:>3}: Tempo Médio de Busca (por operação): {tempo:.8f} segundos")
+
+    # Vazão das operações em lote comparada com as operações individuais
+    for n in [10**5, 10**6]:
+        print(f"\nLote vs. individual com N = {n} elementos (Grau = {grau_arvore})...")
+        for modo, (ins, bus, rem) in medir_lote_vs_individual(n, grau_arvore).items():
+            print(f"  {modo:>10}: Inserção {ins:,.0f} ops/s | Busca {bus:,.0f} ops/s | Remoção {rem:,.0f} ops/s")
+
+    # Memória por chave: listas de objetos Python vs. arrays tipados de inteiros
+    n_memoria = tamanhos_n[-1]
+    print(f"\nMemória por chave com N = {n_memoria} elementos inteiros...")
+    for grau in [grau_arvore, 64]:
+        listas = medir_memoria_por_chave(n_memoria, grau)
+        tipado = medir_memoria_por_chave(n_memoria, grau, tipo_chave='q', tipo_valor='q')
+        print(f"  Grau {grau:>3}: listas {listas:.1f} bytes/chave | arrays tipados {tipado:.1f} bytes/chave")
+
     print("\nBenchmark concluído.")
 
     # Normalizar os valores de log_n para comparar na mesma escala
@@ -133,4 +1016,21 @@ def main():
     print(f"\nGráfico salvo em: {grafico_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    argumentos = ler_argumentos()
+    if argumentos.suite:
+        sys.exit(main_suite(argumentos))
+    if argumentos.concorrencia:
+        sys.exit(main_concorrencia(argumentos))
+    if argumentos.diario:
+        sys.exit(main_diario(argumentos))
+    if argumentos.nomes:
+        sys.exit(main_nomes(argumentos))
+    if argumentos.percurso:
+        sys.exit(main_percurso(argumentos))
+    if argumentos.remocao:
+        sys.exit(main_remocao(argumentos))
+    if argumentos.filtro:
+        sys.exit(main_filtro(argumentos))
+    if argumentos.servidor:
+        sys.exit(main_servidor(argumentos))
+    main(argumentos.grau)
\ No newline at end of file
@@ -1,9 +1,21 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from math import ceil
+from operator import itemgetter
+
+# Marcador de "chave ausente", distinto de qualquer valor armazenado (inclusive None, 0 ou "")
+_AUSENTE = object()
+
 class NoArvoreBPlus:
     """
     Representa um nó na B+ Tree.
     Pode ser um nó folha (que armazena os dados reais) ou um nó interno (que aponta para outros nós).
+    Usa __slots__ para não carregar um dicionário de atributos por nó.
     """
-    def __init__(self, e_folha=False):
+    __slots__ = ("e_folha", "chaves", "filhos", "proximo", "anterior", "dono", "total")
+
+    def __init__(self, e_folha=False, dono=None):
         # Indica se este nó é uma folha ou um nó interno
         self.e_folha = e_folha
         # Lista para armazenar as chaves (valores para comparação)
@@ -14,6 +26,35 @@ class NoArvoreBPlus:
         self.proximo = None
         # Ponteiro para o nó folha anterior na sequência (apenas para nós folha)
         self.anterior = None
+        # Marca da árvore que pode alterar este nó no lugar (ver ArvoreBPlus.instantaneo)
+        self.dono = dono
+        # Número de chaves na subárvore (apenas nos nós internos; numa folha é len(chaves))
+        self.total = 0
+
+class MetricasArvore:
+    """
+    Contadores e histogramas de uma ArvoreBPlus instrumentada (ver ArvoreBPlus.ativar_metricas).
+    Os histogramas são Counters que mapeiam o valor observado para o número de ocorrências.
+    """
+    def __init__(self):
+        # Descidas da raiz até uma folha feitas pelas buscas (_encontrar_folha) e histograma de nós
+        # visitados por descida; inserções e remoções não passam por elas
+        self.buscas = 0
+        self.nos_visitados = Counter()
+        # Totais de divisões, fusões e redistribuições de nós
+        self.divisoes = 0
+        self.fusoes = 0
+        self.redistribuicoes = 0
+        # Histogramas por operação individual
+        self.divisoes_por_insercao = Counter()
+        self.fusoes_por_remocao = Counter()
+        self.redistribuicoes_por_remocao = Counter()
+
+    def media_nos_visitados(self):
+        """
+        Média de nós visitados por descida.
+        """
+        return sum(nos * vezes for nos, vezes in self.nos_visitados.items()) / self.buscas if self.buscas else 0
 
 class ArvoreBPlus:
     """
@@ -21,11 +62,205 @@ class ArvoreBPlus:
     Ideal para sistemas de banco de dados e sistemas de arquivos devido à sua eficiência em operações
     de busca, inserção e remoção, especialmente quando os dados são armazenados em disco.
     """
-    def __init__(self, grau):
-        # O nó raiz da árvore, inicialmente uma folha
-        self.raiz = NoArvoreBPlus(e_folha=True)
+    # Classe usada para criar os nós (subclasses podem usar nós com campos extras)
+    CLASSE_NO = NoArvoreBPlus
+    # Indica se os nós internos mantêm o número de chaves das suas subárvores ('total'), usado por
+    # len(), 'posicao', 'k_esima' e 'contar_intervalo'
+    CONTAGENS = True
+
+    def __init__(self, grau, tipo_chave=None, tipo_valor=None):
         # O grau (ou ordem) da árvore, que determina o número máximo de chaves e filhos em um nó
         self.grau = grau
+        # Modo compacto opcional: códigos do módulo 'array' (ex: 'q' para inteiros de 64 bits)
+        # para guardar as chaves de todos os nós e os valores das folhas em arrays tipados
+        # em vez de listas de objetos Python. None mantém as listas comuns.
+        self.tipo_chave = tipo_chave
+        self.tipo_valor = tipo_valor
+        # Marca dos nós que esta árvore pode alterar no lugar. None até o primeiro instantâneo;
+        # depois disso a árvore fica no modo copy-on-write e os nós com outra marca são copiados
+        # antes de serem alterados (ver 'instantaneo')
+        self.dono = None
+        # O nó raiz da árvore, inicialmente uma folha
+        self.raiz = self._novo_no(e_folha=True)
+        # Métricas da instrumentação opcional (None quando desativada)
+        self.metricas = None
+
+    def _novo_no(self, e_folha=False, chaves=(), filhos=()):
+        """
+        Cria um nó com as listas de chaves e filhos no formato da árvore (listas ou arrays tipados).
+        Os filhos de nós internos são sempre uma lista, pois guardam referências para outros nós.
+        """
+        no = self.CLASSE_NO(e_folha, self.dono)
+        no.chaves = array(self.tipo_chave, chaves) if self.tipo_chave else list(chaves)
+        no.filhos = array(self.tipo_valor, filhos) if e_folha and self.tipo_valor else list(filhos)
+        return no
+
+    def instantaneo(self):
+        """
+        Retorna, em O(1), uma cópia da árvore (um instantâneo) que compartilha todos os nós com ela.
+        A partir daí as duas árvores ficam no modo copy-on-write: antes de alterar um nó compartilhado,
+        cada uma copia só os nós do caminho da raiz até ele, então as alterações de uma nunca aparecem
+        na outra e um instantâneo pode ser lido (inclusive por outra thread) enquanto a original muda.
+        No modo copy-on-write a lista ligada das folhas deixa de ser mantida: as varreduras percorrem
+        os nós internos e 'buscar_muitos' desce da raiz para cada folha. O modo dura até 'assumir_nos'
+        ser chamado em cada árvore; descartar os instantâneos não basta. Com a instrumentação ligada,
+        a cópia também fica instrumentada e soma nos mesmos contadores.
+        """
+        copia = type(self)(self.grau, self.tipo_chave, self.tipo_valor)
+        copia.raiz = self.raiz
+        if self.metricas is not None:
+            copia.ativar_metricas(self.metricas)
+        # Marcas novas nas duas árvores: nenhum dos nós existentes pode mais ser alterado no lugar
+        copia.dono = object()
+        self.dono = object()
+        return copia
+
+    def _copiar_no(self, no):
+        """
+        Cópia rasa de um nó compartilhado, com a marca desta árvore (os filhos continuam compartilhados).
+        """
+        copia = self.CLASSE_NO(no.e_folha, self.dono)
+        copia.chaves = no.chaves[:]
+        copia.filhos = no.filhos[:]
+        copia.total = no.total
+        return copia
+
+    def _filho_proprio(self, pai, i):
+        """
+        Retorna o filho 'i' de 'pai' pronto para ser alterado no lugar. No modo copy-on-write, um filho
+        compartilhado é substituído no pai (que já deve ser desta árvore) por uma cópia.
+        """
+        no = pai.filhos[i]
+        if no.dono is not self.dono:
+            no = pai.filhos[i] = self._copiar_no(no)
+        return no
+
+    def _raiz_propria(self):
+        """
+        Como '_filho_proprio', para a raiz.
+        """
+        if self.raiz.dono is not self.dono:
+            self.raiz = self._copiar_no(self.raiz)
+        return self.raiz
+
+    def assumir_nos(self):
+        """
+        Tira a árvore do modo copy-on-write, em O(n): copia os nós que ela ainda compartilha com
+        outras árvores (instantâneos dela ou a árvore de que ela é instantâneo), que continuam
+        intactas, refaz a lista ligada das folhas e volta a alterar os nós no lugar. Serve para
+        quando os instantâneos não são mais usados; se nenhum estiver vivo, as cópias só substituem
+        nós que seriam descartados.
+        """
+        if self.dono is None:
+            return
+        folhas = []
+        # Percurso em pré-ordem, da esquerda para a direita, que copia cada nó compartilhado
+        pendentes = [self._raiz_propria()]
+        while pendentes:
+            no = pendentes.pop()
+            if no.e_folha:
+                folhas.append(no)
+            else:
+                for i in range(len(no.filhos) - 1, -1, -1):
+                    pendentes.append(self._filho_proprio(no, i))
+            # Todos os nós passam a ter a marca None, a dos nós de uma árvore sem instantâneos
+            no.dono = None
+        anterior = None
+        for folha in folhas:
+            folha.anterior = anterior
+            if anterior is not None:
+                anterior.proximo = folha
+            anterior = folha
+        anterior.proximo = None
+        self.dono = None
+
+    @classmethod
+    def carregar_ordenado(cls, itens, grau, fator_preenchimento=1.0, tipo_chave=None, tipo_valor=None):
+        """
+        Constrói uma árvore de baixo para cima a partir de pares (chave, valor) já ordenados.
+        As folhas são preenchidas até 'fator_preenchimento' da capacidade e encadeadas,
+        e os níveis internos são empilhados em uma única passada por nível.
+        Chaves repetidas mantêm apenas a primeira ocorrência, como em 'inserir'.
+        """
+        arvore = cls(grau, tipo_chave, tipo_valor)
+        minimo = (grau - 1) // 2
+
+        # Separa chaves e valores, descartando duplicatas e validando a ordenação
+        chaves = []
+        valores = []
+        for chave, valor in itens:
+            if chaves and chave <= chaves[-1]:
+                if chave == chaves[-1]:
+                    continue
+                raise ValueError("Os itens precisam estar ordenados pela chave.")
+            chaves.append(chave)
+            valores.append(valor)
+        if not chaves:
+            return arvore
+
+        # Monta o nível das folhas, já ligando 'proximo' e 'anterior'
+        capacidade = max(1, minimo, min(grau - 1, ceil((grau - 1) * fator_preenchimento)))
+        nivel = []
+        menores = []
+        inicio = 0
+        for tamanho in cls._tamanhos_blocos(len(chaves), capacidade, minimo):
+            folha = arvore._novo_no(True, chaves[inicio:inicio + tamanho], valores[inicio:inicio + tamanho])
+            if nivel:
+                folha.anterior = nivel[-1]
+                nivel[-1].proximo = folha
+            nivel.append(folha)
+            menores.append(folha.chaves[0])
+            inicio += tamanho
+
+        # Empilha os níveis internos até sobrar apenas a raiz
+        capacidade = max(2, minimo + 1, min(grau, ceil(grau * fator_preenchimento)))
+        while len(nivel) > 1:
+            proximo_nivel = []
+            proximos_menores = []
+            inicio = 0
+            for tamanho in cls._tamanhos_blocos(len(nivel), capacidade, minimo + 1):
+                # A menor chave de cada subárvore (exceto a primeira) vira separador
+                no = arvore._novo_no(False, menores[inicio + 1:inicio + tamanho], nivel[inicio:inicio + tamanho])
+                no.total = cls._contar(no.filhos)
+                proximo_nivel.append(no)
+                proximos_menores.append(menores[inicio])
+                inicio += tamanho
+            nivel = proximo_nivel
+            menores = proximos_menores
+
+        arvore.raiz = nivel[0]
+        return arvore
+
+    @classmethod
+    def carregar(cls, itens, grau, fator_preenchimento=1.0, tipo_chave=None, tipo_valor=None):
+        """
+        Variante de 'carregar_ordenado' para entradas fora de ordem: ordena os pares pela chave antes.
+        A ordenação é estável, então entre chaves repetidas vale a primeira ocorrência.
+        """
+        return cls.carregar_ordenado(
+            sorted(itens, key=itemgetter(0)), grau, fator_preenchimento, tipo_chave, tipo_valor
+        )
+
+    @staticmethod
+    def _tamanhos_blocos(total, capacidade, minimo):
+        """
+        Divide 'total' elementos em blocos de no máximo 'capacidade' e, havendo mais de um bloco,
+        de no mínimo 'minimo' elementos, distribuindo o resto de forma uniforme.
+        """
+        blocos = ceil(total / capacidade)
+        if blocos > 1 and minimo and total // blocos < minimo:
+            blocos = max(1, total // minimo)
+        base, resto = divmod(total, blocos)
+        return [base + 1 if i < resto else base for i in range(blocos)]
+
+    @staticmethod
+    def _contar(filhos):
+        """
+        Número de chaves nas subárvores de uma lista (não vazia) de filhos de um nó interno.
+        """
+        if filhos[0].e_folha:
+            return sum(len(filho.chaves) for filho in filhos)
+        return sum(filho.total for filho in filhos)
 
     def _encontrar_folha(self, chave, no=None):
         """
@@ -35,11 +270,8 @@ class ArvoreBPlus:
             no = self.raiz
         # Percorre a árvore até encontrar um nó folha
         while not no.e_folha:
-            i = 0
-            # Encontra o índice do filho apropriado para seguir
-            while i < len(no.chaves) and chave >= no.chaves[i]:
-                i += 1
-            no = no.filhos[i]
+            # Busca binária: o filho i guarda as chaves em [chaves[i-1], chaves[i])
+            no = no.filhos[bisect_right(no.chaves, chave)]
         return no
 
     def buscar(self, chave):
@@ -48,57 +280,84 @@ class ArvoreBPlus:
         Retorna o valor se encontrado, caso contrário, retorna None.
         """
         no = self._encontrar_folha(chave)
-        # Itera sobre as chaves do nó folha para encontrar a chave desejada
-        for i, item in enumerate(no.chaves):
-            if item == chave:
-                # Os valores são armazenados na lista 'filhos' dos nós folha, na mesma posição que a chave
-                return no.filhos[i]
+        # Busca binária pela posição da chave dentro do nó folha
+        i = bisect_left(no.chaves, chave)
+        if i < len(no.chaves) and no.chaves[i] == chave:
+            # Os valores são armazenados na lista 'filhos' dos nós folha, na mesma posição que a chave
+            return no.filhos[i]
         return None
 
     def inserir(self, chave, valor):
         """
         Insere uma nova chave-valor na árvore.
+        Chaves já existentes são ignoradas, para manter a unicidade.
         """
-        # Evita a inserção de chaves duplicadas para manter a unicidade
-        if self.buscar(chave):
-            return
+        self._inserir(chave, valor, substituir=False)
 
-        raiz_atual = self.raiz
+    def inserir_se_ausente(self, chave, valor):
+        """
+        Insere a chave-valor apenas se a chave ainda não existir, em uma única descida.
+        Retorna True se inseriu e False se a chave já existia.
+        """
+        return not self._inserir(chave, valor, substituir=False)
+
+    def upsert(self, chave, valor):
+        """
+        Insere a chave-valor ou, se a chave já existir, substitui o seu valor, em uma única descida.
+        Retorna True se a chave já existia.
+        """
+        return self._inserir(chave, valor, substituir=True)
+
+    def _inserir(self, chave, valor, substituir):
+        """
+        Núcleo das inserções: desce uma única vez da raiz até a folha, dividindo preventivamente
+        os nós cheios, e decide na própria folha se insere ou (opcionalmente) substitui.
+        Retorna True se a chave já existia.
+        """
+        raiz_atual = self._raiz_propria()
         # Verifica se a raiz está cheia e precisa ser dividida antes da inserção
         if len(raiz_atual.chaves) == (self.grau - 1):
-            nova_raiz = NoArvoreBPlus()
+            nova_raiz = self._novo_no()
             nova_raiz.filhos.append(self.raiz)
+            nova_raiz.total = self._contar(nova_raiz.filhos)
             # Divide a raiz antiga e promove uma chave para a nova raiz
             self._dividir_filho(nova_raiz, 0)
             self.raiz = nova_raiz
         # Chama o método auxiliar para inserir no nó que não está cheio
-        self._inserir_nao_cheio(self.raiz, chave, valor)
+        return self._inserir_nao_cheio(self.raiz, chave, valor, substituir)
 
-    def _inserir_nao_cheio(self, no, chave, valor):
+    def _inserir_nao_cheio(self, no, chave, valor, substituir=False):
         """
         Método auxiliar para inserir uma chave-valor em um nó que não está cheio.
         Garante que a propriedade de não estar cheio seja mantida.
+        Retorna True se a chave já existia na folha.
         """
         if no.e_folha:
-            i = 0
             # Encontra a posição correta para inserir a nova chave-valor, mantendo a ordem
-            while i < len(no.chaves) and chave > no.chaves[i]:
-                i += 1
+            i = bisect_left(no.chaves, chave)
+            if i < len(no.chaves) and no.chaves[i] == chave:
+                # A chave já existe: substitui o valor apenas se pedido
+                if substituir:
+                    no.filhos[i] = valor
+                return True
             no.chaves.insert(i, chave)
             no.filhos.insert(i, valor)
+            return False
         else:
-            i = 0
-            # Encontra o filho apropriado para descer
-            while i < len(no.chaves) and chave >= no.chaves[i]:
-                i += 1
+            # Encontra o filho apropriado para descer (copiando-o se for compartilhado com um instantâneo)
+            i = bisect_right(no.chaves, chave)
+            filho = self._filho_proprio(no, i)
             # Se o filho estiver cheio, divide-o
-            if len(no.filhos[i].chaves) == (self.grau - 1):
+            if len(filho.chaves) == (self.grau - 1):
                 self._dividir_filho(no, i)
                 # Decide qual dos dois novos filhos seguir após a divisão
-                if chave > no.chaves[i]:
+                if chave >= no.chaves[i]:
                     i += 1
-            # Recursivamente insere no filho apropriado
-            self._inserir_nao_cheio(no.filhos[i], chave, valor)
+            # Recursivamente insere no filho apropriado; se a chave era nova, a subárvore cresceu
+            existia = self._inserir_nao_cheio(no.filhos[i], chave, valor, substituir)
+            if not existia:
+                no.total += 1
+            return existia
 
     def _dividir_filho(self, pai, indice):
         """
@@ -106,7 +365,7 @@ class ArvoreBPlus:
         Essencial para manter as propriedades da B+ Tree durante a inserção.
         """
         no = pai.filhos[indice]
-        novo_no = NoArvoreBPlus(e_folha=no.e_folha)
+        novo_no = self.CLASSE_NO(no.e_folha, self.dono)
         # Ponto médio para a divisão das chaves
         meio = len(no.chaves) // 2
 
@@ -119,11 +378,13 @@ class ArvoreBPlus:
             no.filhos = no.filhos[:meio]
 
             # Ajusta os ponteiros de 'proximo' e 'anterior' para manter a lista ligada das folhas
-            novo_no.proximo = no.proximo
-            novo_no.anterior = no
-            if no.proximo:
-                no.proximo.anterior = novo_no
-            no.proximo = novo_no
+            # (no modo copy-on-write a lista não é mantida, pois a vizinha pode ser compartilhada)
+            if self.dono is None:
+                novo_no.proximo = no.proximo
+                novo_no.anterior = no
+                if no.proximo:
+                    no.proximo.anterior = novo_no
+                no.proximo = novo_no
 
             # A primeira chave do novo nó é promovida para o pai
             pai.chaves.insert(indice, novo_no.chaves[0])
@@ -136,90 +397,802 @@ class ArvoreBPlus:
             # O nó original fica com a parte esquerda (sem a chave promovida)
             no.chaves = no.chaves[:meio]
             no.filhos = no.filhos[:meio+1]
+            # As chaves das subárvores que mudaram de nó saem da contagem do original
+            novo_no.total = self._contar(novo_no.filhos)
+            no.total -= novo_no.total
 
         # Insere o novo nó como filho do pai
         pai.filhos.insert(indice + 1, novo_no)
 
-    def listar_chaves(self):
+    def buscar_muitos(self, chaves):
         """
-        Percorre todas as chaves da árvore em ordem, começando pela folha mais à esquerda.
-        Útil para depuração ou para listar todos os dados.
+        Busca várias chaves de uma vez, retornando os valores na mesma ordem da entrada
+        (None para as chaves ausentes).
+        As chaves são ordenadas e a folha atual é reaproveitada enquanto as próximas chaves
+        caírem nela ou na folha seguinte; só então a árvore é descida de novo a partir da raiz.
+        """
+        resultado = [None] * len(chaves)
+        no = None
+        for posicao in sorted(range(len(chaves)), key=chaves.__getitem__):
+            chave = chaves[posicao]
+            if no is None:
+                no = self._encontrar_folha(chave)
+            elif self.dono is not None:
+                # Sem a lista ligada (modo copy-on-write), desce de novo quando a chave passa da folha
+                if not no.chaves or chave > no.chaves[-1]:
+                    no = self._encontrar_folha(chave)
+            elif no.proximo and (not no.proximo.chaves or chave >= no.proximo.chaves[0]):
+                # Avança para a folha vizinha se a chave estiver nela, senão desce da raiz. Uma folha
+                # vizinha vazia (possível com grau 3) não diz onde a chave está: desce da raiz
+                if no.proximo.chaves and chave <= no.proximo.chaves[-1]:
+                    no = no.proximo
+                else:
+                    no = self._encontrar_folha(chave)
+            i = bisect_left(no.chaves, chave)
+            if i < len(no.chaves) and no.chaves[i] == chave:
+                resultado[posicao] = no.filhos[i]
+        return resultado
+
+    def inserir_muitos(self, itens):
+        """
+        Insere vários pares (chave, valor) em uma única descida pela árvore.
+        O lote é ordenado e repartido entre os filhos de cada nó; cada nó afetado recebe todas as
+        suas chaves de uma vez e é dividido no máximo uma vez (em quantas partes forem necessárias).
+        Chaves já existentes são ignoradas e, entre repetidas no lote, vale a primeira, como em 'inserir'.
+        """
+        chaves = []
+        valores = []
+        for chave, valor in sorted(itens, key=itemgetter(0)):
+            if chaves and chave == chaves[-1]:
+                continue
+            chaves.append(chave)
+            valores.append(valor)
+        if not chaves:
+            return
+
+        self._raiz_propria()
+        extras = self._inserir_lote(self.raiz, chaves, valores, 0, len(chaves))
+        # Se a raiz foi dividida, cria novos níveis acima dela até sobrar uma única raiz
+        while extras:
+            nova_raiz = self._novo_no(
+                False, [separador for separador, _ in extras], [self.raiz] + [no for _, no in extras]
+            )
+            nova_raiz.total = self._contar(nova_raiz.filhos)
+            self.raiz = nova_raiz
+            extras = self._repartir(nova_raiz)
+
+    def _inserir_lote(self, no, chaves, valores, inicio, fim):
+        """
+        Método auxiliar recursivo de 'inserir_muitos' para as chaves[inicio:fim] que caem em 'no'.
+        Retorna a lista de pares (separador, novo_no) criados ao dividir 'no'.
+        """
+        if no.e_folha:
+            # Intercala as chaves existentes com as do lote, mantendo o valor já existente
+            existentes = no.chaves
+            antigos = no.filhos
+            # Fatias vazias preservam o tipo das listas (lista ou array tipado)
+            novas_chaves = existentes[:0]
+            novos_valores = antigos[:0]
+            i = 0
+            j = inicio
+            while i < len(existentes) and j < fim:
+                if chaves[j] < existentes[i]:
+                    novas_chaves.append(chaves[j])
+                    novos_valores.append(valores[j])
+                    j += 1
+                else:
+                    if chaves[j] == existentes[i]:
+                        j += 1
+                    novas_chaves.append(existentes[i])
+                    novos_valores.append(antigos[i])
+                    i += 1
+            novas_chaves.extend(existentes[i:])
+            novos_valores.extend(antigos[i:])
+            novas_chaves.extend(chaves[j:fim])
+            novos_valores.extend(valores[j:fim])
+            no.chaves = novas_chaves
+            no.filhos = novos_valores
+            return self._repartir(no)
+
+        novas_chaves = no.chaves[:0]
+        novos_filhos = []
+        for i, filho in enumerate(no.filhos):
+            # O filho i recebe as chaves do lote menores que o separador chaves[i]
+            limite = bisect_left(chaves, no.chaves[i], inicio, fim) if i < len(no.chaves) else fim
+            if limite > inicio and filho.dono is not self.dono:
+                # O filho vai ser alterado: se for compartilhado com um instantâneo, usa uma cópia
+                filho = self._copiar_no(filho)
+            novos_filhos.append(filho)
+            if limite > inicio:
+                for separador, novo_no in self._inserir_lote(filho, chaves, valores, inicio, limite):
+                    novas_chaves.append(separador)
+                    novos_filhos.append(novo_no)
+            if i < len(no.chaves):
+                novas_chaves.append(no.chaves[i])
+            inicio = limite
+        no.chaves = novas_chaves
+        no.filhos = novos_filhos
+        no.total = self._contar(novos_filhos)
+        return self._repartir(no)
+
+    def _repartir(self, no):
+        """
+        Divide um nó que passou da capacidade em quantas partes forem necessárias, de uma só vez.
+        O primeiro pedaço permanece em 'no'; retorna os pares (separador, novo_no) dos demais,
+        na ordem, para serem acomodados no pai. Nas folhas a lista ligada é ajustada.
+        """
+        if len(no.chaves) <= self.grau - 1:
+            return []
+        minimo = (self.grau - 1) // 2
+        chaves = no.chaves
+        filhos = no.filhos
+        extras = []
+        if no.e_folha:
+            tamanhos = self._tamanhos_blocos(len(chaves), self.grau - 1, minimo)
+            inicio = tamanhos[0]
+            no.chaves = chaves[:inicio]
+            no.filhos = filhos[:inicio]
+            ultimo = no
+            for tamanho in tamanhos[1:]:
+                novo_no = self.CLASSE_NO(True, self.dono)
+                novo_no.chaves = chaves[inicio:inicio + tamanho]
+                novo_no.filhos = filhos[inicio:inicio + tamanho]
+                # Encaixa o novo nó na lista ligada das folhas logo após o último pedaço
+                if self.dono is None:
+                    novo_no.proximo = ultimo.proximo
+                    novo_no.anterior = ultimo
+                    if ultimo.proximo:
+                        ultimo.proximo.anterior = novo_no
+                    ultimo.proximo = novo_no
+                ultimo = novo_no
+                extras.append((novo_no.chaves[0], novo_no))
+                inicio += tamanho
+        else:
+            # Os pedaços são definidos pelo número de filhos; a chave entre dois pedaços sobe para o pai
+            tamanhos = self._tamanhos_blocos(len(filhos), self.grau, minimo + 1)
+            inicio = tamanhos[0]
+            no.chaves = chaves[:inicio - 1]
+            no.filhos = filhos[:inicio]
+            for tamanho in tamanhos[1:]:
+                novo_no = self.CLASSE_NO(False, self.dono)
+                novo_no.chaves = chaves[inicio:inicio + tamanho - 1]
+                novo_no.filhos = filhos[inicio:inicio + tamanho]
+                novo_no.total = self._contar(novo_no.filhos)
+                no.total -= novo_no.total
+                extras.append((chaves[inicio - 1], novo_no))
+                inicio += tamanho
+        return extras
+
+    def _primeira_folha(self):
+        """
+        Desce sempre pelo primeiro filho até a folha mais à esquerda.
         """
         no = self.raiz
-        # Desce até a folha mais à esquerda
         while not no.e_folha:
             no = no.filhos[0]
+        return no
+
+    def _ultima_folha(self):
+        """
+        Desce sempre pelo último filho até a folha mais à direita.
+        """
+        no = self.raiz
+        while not no.e_folha:
+            no = no.filhos[-1]
+        return no
+
+    def _folhas(self, chave=None, reverso=False):
+        """
+        Gera as folhas da esquerda para a direita (ou o contrário, com reverso=True), a partir da folha
+        onde 'chave' deveria estar ou, com chave None, da primeira (última) folha.
+        Segue a lista ligada das folhas; no modo copy-on-write, em que ela não é mantida, sobe e desce
+        pelos nós internos guardando numa pilha o caminho da raiz até a folha atual.
+        """
+        if self.dono is None:
+            if chave is not None:
+                no = self._encontrar_folha(chave)
+            else:
+                no = self._ultima_folha() if reverso else self._primeira_folha()
+            while no:
+                yield no
+                no = no.anterior if reverso else no.proximo
+            return
+
+        passo = -1 if reverso else 1
+        pilha = []
+        no = self.raiz
+        while True:
+            # Desce até uma folha, empilhando o nó e a posição do filho escolhido em cada nível
+            while not no.e_folha:
+                if chave is not None:
+                    i = bisect_right(no.chaves, chave)
+                else:
+                    i = len(no.filhos) - 1 if reverso else 0
+                pilha.append((no, i))
+                no = no.filhos[i]
+            yield no
+            # Sobe até o primeiro ancestral que ainda tem um filho seguinte nessa direção
+            chave = None
+            while pilha:
+                no, i = pilha.pop()
+                i += passo
+                if 0 <= i < len(no.filhos):
+                    pilha.append((no, i))
+                    no = no.filhos[i]
+                    break
+            else:
+                return
+
+    def listar_chaves(self):
+        """
+        Percorre todas as chaves da árvore em ordem, começando pela folha mais à esquerda.
+        Útil para depuração ou para listar todos os dados.
+        """
         resultado = []
-        # Percorre a lista ligada de folhas para coletar todas as chaves
-        while no:
+        # Percorre as folhas em ordem para coletar todas as chaves
+        for no in self._folhas():
             resultado.extend(no.chaves)
-            no = no.proximo
         return resultado
 
+    def iterar_itens(self, inicio=None, fim=None, reverso=False):
+        """
+        Gera os pares (chave, valor) com inicio <= chave < fim, de forma preguiçosa.
+        Desce uma única vez até a folha inicial e segue pelas folhas vizinhas (ver '_folhas'),
+        da esquerda para a direita ou, com reverso=True, no sentido contrário. Limites None deixam
+        o intervalo aberto.
+        A árvore não deve ser modificada enquanto o gerador estiver em uso.
+        """
+        if reverso:
+            # Começa pela última chave menor que 'fim' e caminha para a esquerda
+            folhas = self._folhas(fim, reverso=True)
+            no = next(folhas)
+            i = len(no.chaves) - 1 if fim is None else bisect_left(no.chaves, fim) - 1
+            while no:
+                while i >= 0:
+                    chave = no.chaves[i]
+                    if inicio is not None and chave < inicio:
+                        return
+                    yield chave, no.filhos[i]
+                    i -= 1
+                no = next(folhas, None)
+                if no:
+                    i = len(no.chaves) - 1
+        else:
+            # Começa pela primeira chave maior ou igual a 'inicio' e caminha para a direita
+            folhas = self._folhas(inicio)
+            no = next(folhas)
+            i = 0 if inicio is None else bisect_left(no.chaves, inicio)
+            while no:
+                while i < len(no.chaves):
+                    chave = no.chaves[i]
+                    if fim is not None and chave >= fim:
+                        return
+                    yield chave, no.filhos[i]
+                    i += 1
+                no = next(folhas, None)
+                i = 0
+
+    def iterar_prefixo(self, prefixo):
+        """
+        Gera os pares (chave, valor) cujas chaves (strings) começam com 'prefixo'.
+        Como as chaves com o mesmo prefixo são contíguas, a varredura para na primeira que não casa.
+        """
+        for chave, valor in self.iterar_itens(prefixo):
+            if not chave.startswith(prefixo):
+                return
+            yield chave, valor
+
+    @staticmethod
+    def _tamanho(no):
+        """
+        Número de chaves na subárvore de um nó.
+        """
+        return len(no.chaves) if no.e_folha else no.total
+
+    def __len__(self):
+        """
+        Número de chaves na árvore, em O(1) (a raiz guarda a contagem da árvore inteira).
+        """
+        return self._tamanho(self.raiz)
+
+    def _descer_contando(self, chave):
+        """
+        Desce até a folha da chave somando as chaves das subárvores que ficam à esquerda do caminho.
+        Retorna (folha, chaves anteriores à folha).
+        """
+        anteriores = 0
+        no = self.raiz
+        while not no.e_folha:
+            i = bisect_right(no.chaves, chave)
+            if i:
+                anteriores += self._contar(no.filhos[:i])
+            no = no.filhos[i]
+        return no, anteriores
+
+    def posicao(self, chave):
+        """
+        Número de chaves menores que 'chave' (a posição que ela tem ou teria na ordem), em O(log n).
+        """
+        folha, anteriores = self._descer_contando(chave)
+        return anteriores + bisect_left(folha.chaves, chave)
+
+    def _folha_da_posicao(self, k):
+        """
+        Desce até a folha que contém a k-ésima chave (a partir de 0) e retorna (folha, índice nela).
+        """
+        no = self.raiz
+        while not no.e_folha:
+            # Pula os filhos cujas subárvores ficam inteiras antes da posição procurada
+            for filho in no.filhos:
+                tamanho = self._tamanho(filho)
+                if k < tamanho:
+                    break
+                k -= tamanho
+            no = filho
+        return no, k
+
+    def k_esima(self, k):
+        """
+        Retorna o par (chave, valor) da k-ésima chave em ordem (a partir de 0; negativos contam do
+        fim, como em listas), em O(log n). Lança IndexError se a posição não existir.
+        """
+        total = len(self)
+        if k < 0:
+            k += total
+        if not 0 <= k < total:
+            raise IndexError("Posição fora da árvore.")
+        folha, i = self._folha_da_posicao(k)
+        return self._chaves_completas(folha)[i], folha.filhos[i]
+
+    def contar_intervalo(self, inicio=None, fim=None):
+        """
+        Número de chaves com inicio <= chave < fim (limites None deixam o intervalo aberto),
+        em O(log n), sem percorrer as chaves.
+        """
+        antes_do_fim = len(self) if fim is None else self.posicao(fim)
+        antes_do_inicio = 0 if inicio is None else self.posicao(inicio)
+        return max(0, antes_do_fim - antes_do_inicio)
+
     def deletar(self, chave):
         """
         Deleta uma chave e seu valor associado da árvore.
         """
-        self._deletar(self.raiz, chave)
+        self._remover(chave)
+
+    def pop(self, chave, padrao=None):
+        """
+        Remove a chave em uma única descida e retorna o valor que estava associado a ela,
+        ou 'padrao' se a chave não existir.
+        """
+        valor = self._remover(chave)
+        return padrao if valor is _AUSENTE else valor
+
+    def _remover(self, chave):
+        """
+        Núcleo das remoções: retorna o valor removido ou _AUSENTE.
+        """
+        self._raiz_propria()
+        valor = self._deletar(self.raiz, chave)
         # Se a raiz não for mais uma folha e tiver apenas um filho, esse filho se torna a nova raiz
         if not self.raiz.e_folha and len(self.raiz.filhos) == 1:
             self.raiz = self.raiz.filhos[0]
+        return valor
+
+    def deletar_muitos(self, chaves):
+        """
+        Deleta várias chaves em uma única descida pela árvore.
+        O lote é ordenado e repartido entre os filhos; depois que todos os filhos de um nó foram
+        processados, os que ficaram abaixo do mínimo são fundidos com um vizinho (e redivididos se
+        a fusão passar da capacidade), rebalanceando cada nó afetado uma única vez.
+        """
+        chaves = sorted(set(chaves))
+        if not chaves:
+            return
+        self._raiz_propria()
+        self._deletar_lote(self.raiz, chaves, 0, len(chaves))
+        # Enquanto a raiz interna tiver um único filho, esse filho se torna a nova raiz
+        while not self.raiz.e_folha and len(self.raiz.filhos) == 1:
+            self.raiz = self.raiz.filhos[0]
+
+    def _deletar_lote(self, no, chaves, inicio, fim):
+        """
+        Método auxiliar recursivo de 'deletar_muitos' para as chaves[inicio:fim] que caem em 'no'.
+        """
+        if no.e_folha:
+            # Mantém apenas os pares cujas chaves não estão no lote
+            novas_chaves = no.chaves[:0]
+            novos_valores = no.filhos[:0]
+            j = inicio
+            for chave, valor in zip(no.chaves, no.filhos):
+                while j < fim and chaves[j] < chave:
+                    j += 1
+                if j < fim and chaves[j] == chave:
+                    continue
+                novas_chaves.append(chave)
+                novos_valores.append(valor)
+            no.chaves = novas_chaves
+            no.filhos = novos_valores
+            return
+
+        for i in range(len(no.filhos)):
+            limite = bisect_left(chaves, no.chaves[i], inicio, fim) if i < len(no.chaves) else fim
+            if limite > inicio:
+                self._deletar_lote(self._filho_proprio(no, i), chaves, inicio, limite)
+            inicio = limite
+
+        self._corrigir_filhos(no)
+        no.total = self._contar(no.filhos)
+
+    def deletar_intervalo(self, inicio=None, fim=None):
+        """
+        Deleta todas as chaves com inicio <= chave < fim (limites None deixam o intervalo aberto).
+        Desce uma única vez pelos dois extremos do intervalo: as subárvores que ficam inteiras entre
+        eles são descartadas de uma vez, sem visitar as suas chaves, e só os nós dos dois caminhos
+        são cortados e rebalanceados (com a mesma correção de 'deletar_muitos').
+        """
+        if inicio is not None and fim is not None and inicio >= fim:
+            return
+        if inicio is None and fim is None:
+            self.limpar()
+            return
+        if self.dono is None:
+            # Liga desde já as folhas dos dois extremos, soltando as folhas entre elas (que serão
+            # descartadas) para que sejam liberadas sem depender do coletor de ciclos
+            esquerda = None if inicio is None else self._encontrar_folha(inicio)
+            direita = None if fim is None else self._encontrar_folha(fim)
+            if esquerda is not direita:
+                no = self._primeira_folha() if esquerda is None else esquerda.proximo
+                while no is not direita:
+                    seguinte = no.proximo
+                    no.proximo = no.anterior = None
+                    no = seguinte
+                if esquerda is not None:
+                    esquerda.proximo = direita
+                if direita is not None:
+                    direita.anterior = esquerda
+        self._raiz_propria()
+        self._deletar_faixa(self.raiz, inicio, fim)
+        while not self.raiz.e_folha and len(self.raiz.filhos) == 1:
+            self.raiz = self.raiz.filhos[0]
+
+    def _deletar_faixa(self, no, inicio, fim):
+        """
+        Método auxiliar recursivo de 'deletar_intervalo'.
+        """
+        if no.e_folha:
+            self._cortar_folha(no, inicio, fim)
+            return
+        # Filhos onde caem os dois extremos (-1 e len(filhos) quando o intervalo é aberto daquele lado)
+        i = -1 if inicio is None else bisect_right(no.chaves, inicio)
+        j = len(no.filhos) if fim is None else bisect_right(no.chaves, fim)
+        if i == j:
+            self._deletar_faixa(self._filho_proprio(no, i), inicio, fim)
+        else:
+            tem_direito = j < len(no.filhos)
+            # Os filhos entre os dois extremos estão inteiros no intervalo e são descartados com os
+            # separadores entre eles (se houver filhos dos dois lados, fica o separador do direito)
+            del no.filhos[i + 1:j]
+            if i >= 0:
+                del no.chaves[i:j - 1]
+            else:
+                del no.chaves[:j]
+            # Cada extremo fica aberto do outro lado: a subárvore toda está antes de 'fim' (ou depois de 'inicio')
+            if i >= 0:
+                self._deletar_faixa(self._filho_proprio(no, i), inicio, None)
+            if tem_direito:
+                self._deletar_faixa(self._filho_proprio(no, i + 1), None, fim)
+        self._corrigir_filhos(no)
+        no.total = self._contar(no.filhos)
+
+    def _cortar_folha(self, folha, inicio, fim):
+        """
+        Remove da folha as chaves com inicio <= chave < fim.
+        """
+        i = 0 if inicio is None else bisect_left(folha.chaves, inicio)
+        j = len(folha.chaves) if fim is None else bisect_left(folha.chaves, fim)
+        del folha.chaves[i:j]
+        del folha.filhos[i:j]
+
+    def limpar(self):
+        """
+        Remove todas as chaves: a raiz passa a ser uma folha vazia. Fora do modo copy-on-write a
+        lista ligada das folhas é desfeita, para que os nós antigos sejam liberados imediatamente
+        pela contagem de referências em vez de esperar o coletor de ciclos; no modo copy-on-write
+        os nós podem ser de um instantâneo e não são tocados.
+        """
+        if self.dono is None:
+            no = self._primeira_folha()
+            while no:
+                seguinte = no.proximo
+                no.proximo = no.anterior = None
+                no = seguinte
+        self.raiz = self._novo_no(e_folha=True)
+
+    def _corrigir_filhos(self, no):
+        """
+        Funde os filhos de um nó interno que ficaram abaixo do mínimo com um vizinho,
+        redividindo o resultado quando a fusão passa da capacidade.
+        """
+        minimo = (self.grau - 1) // 2
+        i = 0
+        while i < len(no.filhos) and len(no.filhos) > 1:
+            if len(no.filhos[i].chaves) >= minimo:
+                i += 1
+                continue
+            # Funde com o irmão esquerdo (já corrigido) ou, no primeiro filho, com o direito
+            i = max(i - 1, 0)
+            self._fundir(no, i)
+            # Um nó interno esvaziado pode trazer um único filho ainda abaixo do mínimo;
+            # agora que ele tem irmãos, corrige-o também
+            if not no.filhos[i].e_folha:
+                self._corrigir_filhos(no.filhos[i])
+            # Se a fusão passou da capacidade, redivide o nó em partes equilibradas
+            for deslocamento, (separador, novo_no) in enumerate(self._repartir(no.filhos[i]), 1):
+                no.chaves.insert(i + deslocamento - 1, separador)
+                no.filhos.insert(i + deslocamento, novo_no)
 
     def _deletar(self, no, chave):
         """
         Método auxiliar recursivo para deletar uma chave da árvore.
         Lida com a fusão e redistribuição de nós para manter as propriedades da B+ Tree.
+        Retorna o valor removido ou _AUSENTE.
         """
         if no.e_folha:
             # Se for um nó folha e a chave estiver presente, remove-a
-            if chave in no.chaves:
-                indice = no.chaves.index(chave)
+            indice = bisect_left(no.chaves, chave)
+            if indice < len(no.chaves) and no.chaves[indice] == chave:
                 no.chaves.pop(indice)
-                no.filhos.pop(indice)
-            return
+                return no.filhos.pop(indice)
+            return _AUSENTE
 
-        i = 0
-        # Encontra o índice do filho apropriado para descer ou o índice da chave no nó atual
-        while i < len(no.chaves) and chave >= no.chaves[i]:
-            i += 1
+        # Encontra o índice do filho apropriado para descer
+        i = bisect_right(no.chaves, chave)
 
-        filho = no.filhos[i]
-        self._deletar(filho, chave) # Chama recursivamente para deletar no filho
+        filho = self._filho_proprio(no, i)
+        valor = self._deletar(filho, chave) # Chama recursivamente para deletar no filho
+        if valor is not _AUSENTE:
+            no.total -= 1
 
         # Verifica se o filho está abaixo do limite mínimo de chaves após a deleção
         # O limite é (grau - 1) // 2
-        if len(filho.chaves) < (self.grau - 1) // 2:
+        minimo = (self.grau - 1) // 2
+        if len(filho.chaves) < minimo:
             # Tenta redistribuir chaves com um irmão ou fundir nós
             irmao_esq = no.filhos[i - 1] if i > 0 else None
             irmao_dir = no.filhos[i + 1] if i + 1 < len(no.filhos) else None
 
             # Caso 1: Redistribuir do irmão esquerdo (se existir e tiver chaves suficientes)
-            if irmao_esq and len(irmao_esq.chaves) > (self.grau - 1) // 2:
-                # Pega a chave do pai e move para o filho, e a maior chave do irmão esquerdo para o pai
-                filho.chaves.insert(0, no.chaves[i - 1])
-                no.chaves[i - 1] = irmao_esq.chaves.pop()
-                if not filho.e_folha:
-                    filho.filhos.insert(0, irmao_esq.filhos.pop())
+            if irmao_esq and len(irmao_esq.chaves) > minimo:
+                self._redistribuir(no, i, da_esquerda=True)
             # Caso 2: Redistribuir do irmão direito (se existir e tiver chaves suficientes)
-            elif irmao_dir and len(irmao_dir.chaves) > (self.grau - 1) // 2:
-                # Pega a chave do pai e move para o filho, e a menor chave do irmão direito para o pai
-                filho.chaves.append(no.chaves[i])
-                no.chaves[i] = irmao_dir.chaves.pop(0)
-                if not filho.e_folha:
-                    filho.filhos.append(irmao_dir.filhos.pop(0))
+            elif irmao_dir and len(irmao_dir.chaves) > minimo:
+                self._redistribuir(no, i, da_esquerda=False)
             # Caso 3: Fundir com um irmão (se nenhum irmão tiver chaves suficientes para redistribuir)
+            elif irmao_esq:
+                # Funde o filho com o irmão esquerdo e remove o filho fundido do pai
+                self._fundir(no, i - 1)
+            elif irmao_dir:
+                # Funde o irmão direito com o filho e remove o irmão fundido do pai
+                self._fundir(no, i)
+        return valor
+
+    def _redistribuir(self, pai, i, da_esquerda):
+        """
+        Passa uma entrada do irmão esquerdo (ou direito) para o filho 'i' do pai, ajustando o separador.
+        """
+        filho = self._filho_proprio(pai, i)
+        if da_esquerda:
+            irmao_esq = self._filho_proprio(pai, i - 1)
+            if filho.e_folha:
+                # Em folhas, o par chave-valor passa direto e o separador do pai vira a nova menor chave
+                filho.chaves.insert(0, irmao_esq.chaves.pop())
+                filho.filhos.insert(0, irmao_esq.filhos.pop())
+                pai.chaves[i - 1] = filho.chaves[0]
+            else:
+                # Pega a chave do pai e move para o filho, e a maior chave do irmão esquerdo para o pai
+                filho.chaves.insert(0, pai.chaves[i - 1])
+                pai.chaves[i - 1] = irmao_esq.chaves.pop()
+                filho.filhos.insert(0, irmao_esq.filhos.pop())
+                # A subárvore movida leva as suas chaves para a contagem do filho
+                movidas = self._tamanho(filho.filhos[0])
+                filho.total += movidas
+                irmao_esq.total -= movidas
+        else:
+            irmao_dir = self._filho_proprio(pai, i + 1)
+            if filho.e_folha:
+                # Em folhas, o par chave-valor passa direto e o separador passa a ser a nova menor chave do irmão
+                filho.chaves.append(irmao_dir.chaves.pop(0))
+                filho.filhos.append(irmao_dir.filhos.pop(0))
+                pai.chaves[i] = irmao_dir.chaves[0]
             else:
-                if irmao_esq:
-                    # Funde o filho com o irmão esquerdo
-                    # A chave do pai que separava os dois é movida para o irmão esquerdo
-                    irmao_esq.chaves += [no.chaves.pop(i - 1)] + filho.chaves
-                    if not irmao_esq.e_folha:
-                        irmao_esq.filhos += filho.filhos
-                    no.filhos.pop(i) # Remove o filho fundido do pai
-                elif irmao_dir:
-                    # Funde o filho com o irmão direito
-                    # A chave do pai que separava os dois é movida para o filho
-                    filho.chaves += [no.chaves.pop(i)] + irmao_dir.chaves
-                    if not filho.e_folha:
-                        filho.filhos += irmao_dir.filhos
-                    no.filhos.pop(i + 1) # Remove o irmão direito fundido do pai
\ No newline at end of file
+                # Pega a chave do pai e move para o filho, e a menor chave do irmão direito para o pai
+                filho.chaves.append(pai.chaves[i])
+                pai.chaves[i] = irmao_dir.chaves.pop(0)
+                filho.filhos.append(irmao_dir.filhos.pop(0))
+                movidas = self._tamanho(filho.filhos[-1])
+                filho.total += movidas
+                irmao_dir.total -= movidas
+
+    def _fundir(self, pai, indice):
+        """
+        Funde o filho 'indice + 1' do pai dentro do filho 'indice'.
+        Nas folhas os pares chave-valor são concatenados e a lista ligada é ajustada;
+        nos nós internos a chave separadora do pai desce para o nó fundido.
+        """
+        esquerdo = self._filho_proprio(pai, indice)
+        direito = pai.filhos.pop(indice + 1)
+        separador = pai.chaves.pop(indice)
+        if esquerdo.e_folha:
+            esquerdo.chaves.extend(direito.chaves)
+            esquerdo.filhos.extend(direito.filhos)
+            # Remove o nó fundido da lista ligada das folhas
+            if self.dono is None:
+                esquerdo.proximo = direito.proximo
+                if direito.proximo:
+                    direito.proximo.anterior = esquerdo
+        else:
+            esquerdo.chaves.append(separador)
+            esquerdo.chaves.extend(direito.chaves)
+            esquerdo.filhos.extend(direito.filhos)
+            esquerdo.total += direito.total
+
+    def _chaves_completas(self, no):
+        """
+        Chaves do nó como elas são (subclasses que guardam as chaves comprimidas as reconstroem aqui).
+        """
+        return no.chaves
+
+    def altura(self):
+        """
+        Número de níveis da árvore (1 quando a raiz é uma folha).
+        """
+        niveis = 1
+        no = self.raiz
+        while not no.e_folha:
+            no = no.filhos[0]
+            niveis += 1
+        return niveis
+
+    def perfil(self):
+        """
+        Percorre a árvore nível a nível e retorna, da raiz às folhas, um dicionário por nível com
+        o número de nós, o número de chaves e a ocupação média (chaves / capacidade).
+        Custa O(número de nós); serve para diagnosticar árvores degeneradas e escolher o grau.
+        """
+        niveis = []
+        nivel = [self.raiz]
+        while nivel:
+            chaves = sum(len(no.chaves) for no in nivel)
+            niveis.append({
+                "nos": len(nivel),
+                "chaves": chaves,
+                "ocupacao": chaves / (len(nivel) * (self.grau - 1)),
+            })
+            nivel = [] if nivel[0].e_folha else [filho for no in nivel for filho in no.filhos]
+        return niveis
+
+    def verificar(self):
+        """
+        Confere as invariantes estruturais da árvore e lança AssertionError na primeira violação:
+        chaves ordenadas e dentro do intervalo dado pelos separadores, limite de chaves por nó,
+        número de filhos coerente, contagens das subárvores corretas, todas as folhas na mesma
+        profundidade e lista ligada das folhas consistente (fora do modo copy-on-write, em que ela
+        não é mantida). A ocupação mínima não é exigida, pois a divisão preventiva com grau ímpar
+        pode deixar nós internos abaixo dela. Retorna True se tudo estiver correto.
+        """
+        folhas = []
+
+        def conferir(no, menor, maior, profundidade):
+            chaves = list(self._chaves_completas(no))
+            if any(anterior >= seguinte for anterior, seguinte in zip(chaves, chaves[1:])):
+                raise AssertionError(f"Chaves fora de ordem: {chaves}")
+            if len(chaves) > self.grau - 1:
+                raise AssertionError(f"Nó com {len(chaves)} chaves excede o grau {self.grau}")
+            if chaves and ((menor is not None and chaves[0] < menor) or (maior is not None and chaves[-1] >= maior)):
+                raise AssertionError(f"Chaves {chaves} fora do intervalo [{menor}, {maior})")
+            if no.e_folha:
+                if len(no.filhos) != len(chaves):
+                    raise AssertionError("Folha com número de valores diferente do de chaves")
+                folhas.append((no, profundidade))
+                return len(chaves)
+            if len(no.filhos) != len(chaves) + 1:
+                raise AssertionError("Nó interno com número de filhos incoerente")
+            total = 0
+            for i, filho in enumerate(no.filhos):
+                total += conferir(
+                    filho,
+                    chaves[i - 1] if i > 0 else menor,
+                    chaves[i] if i < len(chaves) else maior,
+                    profundidade + 1,
+                )
+            if self.CONTAGENS and no.total != total:
+                raise AssertionError(f"Nó interno conta {no.total} chaves, mas a subárvore tem {total}")
+            return total
+
+        conferir(self.raiz, None, None, 0)
+        if len({profundidade for _, profundidade in folhas}) != 1:
+            raise AssertionError("Folhas em profundidades diferentes")
+        if self.dono is not None:
+            return True
+        if folhas[0][0].anterior is not None or folhas[-1][0].proximo is not None:
+            raise AssertionError("Extremos da lista ligada das folhas apontam para fora da árvore")
+        for (esquerda, _), (direita, _) in zip(folhas, folhas[1:]):
+            if esquerda.proximo is not direita or direita.anterior is not esquerda:
+                raise AssertionError("Lista ligada das folhas inconsistente")
+        return True
+
+    def ativar_metricas(self, metricas=None):
+        """
+        Liga a instrumentação desta árvore e retorna o objeto MetricasArvore com os contadores
+        (um novo ou, se informado, 'metricas', que continua somando de onde parou).
+        Os métodos internos são substituídos, apenas nesta instância, por versões que contam
+        descidas, nós visitados, divisões, fusões e redistribuições; com as métricas desligadas
+        a árvore usa os métodos originais da classe, sem nenhum custo extra.
+        As descidas contadas são as de '_encontrar_folha' (buscar, buscar_muitos, varreduras);
+        inserções e remoções descem por conta própria e aparecem só nas divisões e fusões.
+        """
+        if self.metricas is not None:
+            return self.metricas
+        if metricas is None:
+            metricas = MetricasArvore()
+        classe = type(self)
+
+        def encontrar_folha(chave, no=None):
+            if no is None:
+                no = self.raiz
+            visitados = 1
+            while not no.e_folha:
+                no = no.filhos[bisect_right(no.chaves, chave)]
+                visitados += 1
+            metricas.buscas += 1
+            metricas.nos_visitados[visitados] += 1
+            return no
+
+        def dividir_filho(pai, indice):
+            metricas.divisoes += 1
+            classe._dividir_filho(self, pai, indice)
+
+        def repartir(no):
+            extras = classe._repartir(self, no)
+            metricas.divisoes += len(extras)
+            return extras
+
+        def redistribuir(pai, i, da_esquerda):
+            metricas.redistribuicoes += 1
+            classe._redistribuir(self, pai, i, da_esquerda)
+
+        def fundir(pai, indice):
+            metricas.fusoes += 1
+            classe._fundir(self, pai, indice)
+
+        def inserir(chave, valor, substituir):
+            antes = metricas.divisoes
+            existia = classe._inserir(self, chave, valor, substituir)
+            metricas.divisoes_por_insercao[metricas.divisoes - antes] += 1
+            return existia
+
+        def remover(chave):
+            fusoes = metricas.fusoes
+            redistribuicoes = metricas.redistribuicoes
+            valor = classe._remover(self, chave)
+            metricas.fusoes_por_remocao[metricas.fusoes - fusoes] += 1
+            metricas.redistribuicoes_por_remocao[metricas.redistribuicoes - redistribuicoes] += 1
+            return valor
+
+        self._encontrar_folha = encontrar_folha
+        self._dividir_filho = dividir_filho
+        self._repartir = repartir
+        self._redistribuir = redistribuir
+        self._fundir = fundir
+        self._inserir = inserir
+        self._remover = remover
+        self.metricas = metricas
+        return metricas
+
+    def desativar_metricas(self):
+        """
+        Desliga a instrumentação, voltando aos métodos originais da classe.
+        """
+        for nome in ("_encontrar_folha", "_dividir_filho", "_repartir", "_redistribuir", "_fundir", "_inserir", "_remover"):
+            self.__dict__.pop(nome, None)
+        self.metricas = None
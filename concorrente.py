@@ -0,0 +1,474 @@
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+
+from bplustree import _AUSENTE, ArvoreBPlus, NoArvoreBPlus
+
+# Quantidade de itens que uma varredura coleta seguindo a lista ligada antes de soltar as travas
+TAMANHO_BLOCO_VARREDURA = 256
+
+
+class TravaLeituraEscrita:
+    """
+    Trava de leitura/escrita (latch): vários leitores ao mesmo tempo ou um único escritor.
+    A thread que detém a escrita pode adquiri-la de novo e também adquirir a leitura.
+    """
+    __slots__ = ("_condicao", "_leitores", "_dono", "_profundidade")
+
+    def __init__(self):
+        self._condicao = threading.Condition(threading.Lock())
+        # Número de leitores ativos
+        self._leitores = 0
+        # Thread que detém a escrita (None se ninguém) e quantas vezes ela a adquiriu
+        self._dono = None
+        self._profundidade = 0
+
+    def adquirir_leitura(self, bloquear=True):
+        """
+        Adquire a trava para leitura. Com bloquear=False, desiste e retorna False
+        se houver um escritor, em vez de esperar.
+        """
+        eu = threading.get_ident()
+        with self._condicao:
+            while self._dono is not None and self._dono != eu:
+                if not bloquear:
+                    return False
+                self._condicao.wait()
+            self._leitores += 1
+            return True
+
+    def liberar_leitura(self):
+        with self._condicao:
+            self._leitores -= 1
+            if not self._leitores:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        """
+        Adquire a trava para escrita, esperando que leitores e outros escritores saiam.
+        """
+        eu = threading.get_ident()
+        with self._condicao:
+            if self._dono == eu:
+                self._profundidade += 1
+                return
+            while self._dono is not None or self._leitores:
+                self._condicao.wait()
+            self._dono = eu
+            self._profundidade = 1
+
+    def liberar_escrita(self):
+        with self._condicao:
+            self._profundidade -= 1
+            if not self._profundidade:
+                self._dono = None
+                self._condicao.notify_all()
+
+    @contextmanager
+    def leitura(self):
+        self.adquirir_leitura()
+        try:
+            yield
+        finally:
+            self.liberar_leitura()
+
+    @contextmanager
+    def escrita(self):
+        self.adquirir_escrita()
+        try:
+            yield
+        finally:
+            self.liberar_escrita()
+
+
+class NoConcorrente(NoArvoreBPlus):
+    """
+    Nó da B+ Tree com a sua própria trava de leitura/escrita.
+    """
+    __slots__ = ("trava",)
+
+    def __init__(self, e_folha=False, dono=None):
+        super().__init__(e_folha, dono)
+        self.trava = TravaLeituraEscrita()
+
+
+class ArvoreBPlusConcorrente(ArvoreBPlus):
+    """
+    B+ Tree segura para várias threads, com uma trava por nó e acoplamento de travas (crabbing).
+
+    - Leitores descem segurando no máximo duas travas de leitura (pai e filho) e as varreduras
+      seguem a lista ligada das folhas tentando travar o vizinho sem esperar, redescendo pela
+      chave se ele estiver ocupado, o que evita impasses com escritores.
+    - Escritores primeiro tentam o caminho otimista: descem com travas de leitura e travam
+      para escrita apenas a folha, que resolve a operação se não precisar dividir nem fundir.
+    - Quando a folha pode dividir ou ficar abaixo do mínimo, a operação é refeita de forma
+      pessimista: trava para escrita o caminho, soltando os ancestrais assim que encontra um nó
+      seguro, e os irmãos envolvidos em redistribuições e fusões. Essas reestruturações são
+      serializadas entre si por 'trava_estrutura'.
+    - Operações em lote, 'altura', 'perfil' e 'verificar' tomam a árvore inteira com 'trava_global'.
+    """
+    CLASSE_NO = NoConcorrente
+    # As escritas otimistas alteram só a folha, então as contagens dos nós internos não são mantidas
+    CONTAGENS = False
+
+    def __init__(self, grau, tipo_chave=None, tipo_valor=None):
+        # Compartilhada pelas operações de uma chave; exclusiva nas operações em lote
+        self.trava_global = TravaLeituraEscrita()
+        # Protege o ponteiro 'raiz' (trocado quando a raiz divide ou encolhe)
+        self.trava_raiz = TravaLeituraEscrita()
+        # Serializa os escritores pessimistas (divisões, fusões e redistribuições)
+        self.trava_estrutura = threading.Lock()
+        # Número de chaves para 'len', já que as contagens das subárvores não são mantidas;
+        # as escritas de uma chave o atualizam sob 'trava_entradas', as em lote o recontam
+        self._entradas = 0
+        self.trava_entradas = threading.Lock()
+        super().__init__(grau, tipo_chave, tipo_valor)
+
+    @classmethod
+    def carregar_ordenado(cls, itens, grau, fator_preenchimento=1.0, tipo_chave=None, tipo_valor=None):
+        arvore = super().carregar_ordenado(itens, grau, fator_preenchimento, tipo_chave, tipo_valor)
+        arvore._recontar()
+        return arvore
+
+    def _recontar(self):
+        """
+        Reconta as chaves pelas folhas; só é chamado com a árvore inteira travada (ou ainda não publicada).
+        """
+        self._entradas = sum(len(folha.chaves) for folha in self._folhas())
+
+    def _somar_entradas(self, quantidade):
+        with self.trava_entradas:
+            self._entradas += quantidade
+
+    def __len__(self):
+        return self._entradas
+
+    def _descer_leitura(self, chave, escrita_na_folha=False, extremo_direito=False):
+        """
+        Desce da raiz até a folha da chave com acoplamento de travas de leitura e retorna a folha
+        travada (para escrita se 'escrita_na_folha'). Com chave None desce até a folha mais à
+        esquerda (ou à direita, com 'extremo_direito').
+        """
+        self.trava_raiz.adquirir_leitura()
+        no = self.raiz
+        self._travar(no, escrita_na_folha)
+        self.trava_raiz.liberar_leitura()
+        while not no.e_folha:
+            if chave is None:
+                filho = no.filhos[-1] if extremo_direito else no.filhos[0]
+            else:
+                filho = no.filhos[bisect_right(no.chaves, chave)]
+            self._travar(filho, escrita_na_folha)
+            no.trava.liberar_leitura()
+            no = filho
+        return no
+
+    @staticmethod
+    def _travar(no, escrita_na_folha):
+        if escrita_na_folha and no.e_folha:
+            no.trava.adquirir_escrita()
+        else:
+            no.trava.adquirir_leitura()
+
+    def buscar(self, chave):
+        """
+        Busca um valor associado a uma chave na árvore.
+        Retorna o valor se encontrado, caso contrário, retorna None.
+        """
+        with self.trava_global.leitura():
+            folha = self._descer_leitura(chave)
+            try:
+                i = bisect_left(folha.chaves, chave)
+                if i < len(folha.chaves) and folha.chaves[i] == chave:
+                    return folha.filhos[i]
+                return None
+            finally:
+                folha.trava.liberar_leitura()
+
+    def iterar_itens(self, inicio=None, fim=None, reverso=False):
+        """
+        Gera os pares (chave, valor) com inicio <= chave < fim, como na ArvoreBPlus.
+        A cada rodada desce até a folha de partida, coleta até TAMANHO_BLOCO_VARREDURA itens
+        seguindo a lista ligada com acoplamento de travas e solta tudo antes de entregá-los;
+        a rodada seguinte continua a partir da última chave entregue. Nenhuma trava fica presa
+        enquanto o consumidor processa os itens.
+        """
+        ultima = _AUSENTE
+        while True:
+            bloco = []
+            terminou = False
+            with self.trava_global.leitura():
+                if ultima is _AUSENTE:
+                    alvo = fim if reverso else inicio
+                else:
+                    alvo = ultima
+                folha = self._descer_leitura(alvo, extremo_direito=reverso)
+                while True:
+                    terminou = self._coletar(folha, inicio, fim, ultima, reverso, bloco)
+                    if terminou or len(bloco) >= TAMANHO_BLOCO_VARREDURA:
+                        break
+                    vizinho = folha.anterior if reverso else folha.proximo
+                    if vizinho is None:
+                        terminou = True
+                        break
+                    # Nunca espera pelo vizinho: se ele estiver travado, entrega o que tem e redesce
+                    if not vizinho.trava.adquirir_leitura(bloquear=False):
+                        break
+                    folha.trava.liberar_leitura()
+                    folha = vizinho
+                folha.trava.liberar_leitura()
+            yield from bloco
+            if terminou:
+                return
+            if bloco:
+                ultima = bloco[-1][0]
+
+    @staticmethod
+    def _coletar(folha, inicio, fim, ultima, reverso, bloco):
+        """
+        Acrescenta ao bloco os itens da folha que vêm depois de 'ultima' no sentido da varredura.
+        Retorna True se a varredura chegou ao limite do intervalo.
+        """
+        chaves = folha.chaves
+        if reverso:
+            if ultima is not _AUSENTE:
+                i = bisect_left(chaves, ultima) - 1
+            else:
+                i = (bisect_left(chaves, fim) if fim is not None else len(chaves)) - 1
+            while i >= 0:
+                if inicio is not None and chaves[i] < inicio:
+                    return True
+                bloco.append((chaves[i], folha.filhos[i]))
+                i -= 1
+        else:
+            if ultima is not _AUSENTE:
+                i = bisect_right(chaves, ultima)
+            else:
+                i = bisect_left(chaves, inicio) if inicio is not None else 0
+            while i < len(chaves):
+                if fim is not None and chaves[i] >= fim:
+                    return True
+                bloco.append((chaves[i], folha.filhos[i]))
+                i += 1
+        return False
+
+    def listar_chaves(self):
+        """
+        Lista todas as chaves em ordem, seguindo a varredura concorrente.
+        """
+        return [chave for chave, _ in self.iterar_itens()]
+
+    def _inserir(self, chave, valor, substituir):
+        existia = self._inserir_travando(chave, valor, substituir)
+        if not existia:
+            self._somar_entradas(1)
+        return existia
+
+    def _inserir_travando(self, chave, valor, substituir):
+        """
+        Tenta inserir apenas com a folha travada; se ela estiver cheia, refaz a inserção
+        pelo caminho pessimista, que divide os nós necessários.
+        """
+        with self.trava_global.leitura():
+            folha = self._descer_leitura(chave, escrita_na_folha=True)
+            try:
+                i = bisect_left(folha.chaves, chave)
+                if i < len(folha.chaves) and folha.chaves[i] == chave:
+                    if substituir:
+                        folha.filhos[i] = valor
+                    return True
+                if len(folha.chaves) < self.grau - 1:
+                    folha.chaves.insert(i, chave)
+                    folha.filhos.insert(i, valor)
+                    return False
+            finally:
+                folha.trava.liberar_escrita()
+
+            with self.trava_estrutura:
+                # Trava a raiz para escrita; se ela estiver cheia, divide-a antes de descer
+                self.trava_raiz.adquirir_escrita()
+                raiz = self.raiz
+                raiz.trava.adquirir_escrita()
+                if len(raiz.chaves) == self.grau - 1:
+                    nova_raiz = self._novo_no()
+                    nova_raiz.trava.adquirir_escrita()
+                    nova_raiz.filhos.append(raiz)
+                    self._dividir_filho(nova_raiz, 0)
+                    self.raiz = nova_raiz
+                    raiz.trava.liberar_escrita()
+                    raiz = nova_raiz
+                self.trava_raiz.liberar_escrita()
+                return self._inserir_nao_cheio(raiz, chave, valor, substituir)
+
+    def _inserir_nao_cheio(self, no, chave, valor, substituir=False):
+        """
+        Desce a partir de um nó já travado para escrita, travando cada filho antes de soltar o pai.
+        Como os filhos cheios são divididos na descida, o pai nunca mais é alterado depois disso.
+        """
+        while not no.e_folha:
+            i = bisect_right(no.chaves, chave)
+            filho = no.filhos[i]
+            filho.trava.adquirir_escrita()
+            if len(filho.chaves) == self.grau - 1:
+                self._dividir_filho(no, i)
+                if chave >= no.chaves[i]:
+                    filho.trava.liberar_escrita()
+                    filho = no.filhos[i + 1]
+                    filho.trava.adquirir_escrita()
+            no.trava.liberar_escrita()
+            no = filho
+        try:
+            return super()._inserir_nao_cheio(no, chave, valor, substituir)
+        finally:
+            no.trava.liberar_escrita()
+
+    def _dividir_filho(self, pai, indice):
+        # Ao dividir uma folha, a vizinha da direita tem o ponteiro 'anterior' alterado
+        no = pai.filhos[indice]
+        vizinho = no.proximo if no.e_folha else None
+        if vizinho is not None:
+            vizinho.trava.adquirir_escrita()
+        try:
+            super()._dividir_filho(pai, indice)
+        finally:
+            if vizinho is not None:
+                vizinho.trava.liberar_escrita()
+
+    def _remover(self, chave):
+        valor = self._remover_travando(chave)
+        if valor is not _AUSENTE:
+            self._somar_entradas(-1)
+        return valor
+
+    def _remover_travando(self, chave):
+        """
+        Tenta remover apenas com a folha travada; se a folha puder ficar abaixo do mínimo,
+        refaz a remoção pelo caminho pessimista, que redistribui ou funde nós.
+        """
+        minimo = (self.grau - 1) // 2
+        with self.trava_global.leitura():
+            folha = self._descer_leitura(chave, escrita_na_folha=True)
+            try:
+                i = bisect_left(folha.chaves, chave)
+                if i == len(folha.chaves) or folha.chaves[i] != chave:
+                    return _AUSENTE
+                # A raiz não tem mínimo, e enquanto travada ela não deixa de ser raiz
+                if folha is self.raiz or len(folha.chaves) > minimo:
+                    folha.chaves.pop(i)
+                    return folha.filhos.pop(i)
+            finally:
+                folha.trava.liberar_escrita()
+
+            with self.trava_estrutura:
+                return self._remover_pessimista(chave, minimo)
+
+    def _remover_pessimista(self, chave, minimo):
+        """
+        Trava para escrita o caminho até a folha, soltando os ancestrais (e o ponteiro da raiz)
+        sempre que encontra um filho com folga, que não pode ficar abaixo do mínimo.
+        """
+        self.trava_raiz.adquirir_escrita()
+        raiz_travada = True
+        no = self.raiz
+        no.trava.adquirir_escrita()
+        travados = [no]
+        try:
+            while not no.e_folha:
+                filho = no.filhos[bisect_right(no.chaves, chave)]
+                filho.trava.adquirir_escrita()
+                if len(filho.chaves) > minimo:
+                    # Filho seguro: os ancestrais não serão alterados
+                    for ancestral in travados:
+                        ancestral.trava.liberar_escrita()
+                    travados = []
+                    if raiz_travada:
+                        self.trava_raiz.liberar_escrita()
+                        raiz_travada = False
+                travados.append(filho)
+                no = filho
+            valor = self._deletar(travados[0], chave)
+            # Só a raiz travada pode encolher a árvore
+            if raiz_travada and not self.raiz.e_folha and len(self.raiz.filhos) == 1:
+                self.raiz = self.raiz.filhos[0]
+            return valor
+        finally:
+            for no in travados:
+                no.trava.liberar_escrita()
+            if raiz_travada:
+                self.trava_raiz.liberar_escrita()
+
+    def _deletar(self, no, chave):
+        # Trava os irmãos do filho que será percorrido, pois podem ceder chaves ou ser fundidos
+        if no.e_folha:
+            return super()._deletar(no, chave)
+        i = bisect_right(no.chaves, chave)
+        irmaos = [no.filhos[j] for j in (i - 1, i + 1) if 0 <= j < len(no.filhos)]
+        for irmao in irmaos:
+            irmao.trava.adquirir_escrita()
+        try:
+            return super()._deletar(no, chave)
+        finally:
+            for irmao in irmaos:
+                irmao.trava.liberar_escrita()
+
+    def _fundir(self, pai, indice):
+        # Ao fundir folhas, a vizinha à direita do nó removido tem o ponteiro 'anterior' alterado
+        direito = pai.filhos[indice + 1]
+        vizinho = direito.proximo if direito.e_folha else None
+        if vizinho is not None:
+            vizinho.trava.adquirir_escrita()
+        try:
+            super()._fundir(pai, indice)
+        finally:
+            if vizinho is not None:
+                vizinho.trava.liberar_escrita()
+
+    def instantaneo(self):
+        # As escritas otimistas alteram as folhas no lugar, sem o copy-on-write da ArvoreBPlus
+        raise NotImplementedError("ArvoreBPlusConcorrente não suporta instantâneos")
+
+    def _sem_contagens(self, *argumentos):
+        # Manter as contagens obrigaria cada escrita a travar para escrita todo o caminho desde a raiz
+        raise NotImplementedError("ArvoreBPlusConcorrente não mantém as contagens das subárvores")
+
+    posicao = k_esima = contar_intervalo = _sem_contagens
+
+    def buscar_muitos(self, chaves):
+        with self.trava_global.escrita():
+            return super().buscar_muitos(chaves)
+
+    def inserir_muitos(self, itens):
+        with self.trava_global.escrita():
+            super().inserir_muitos(itens)
+            self._recontar()
+
+    def deletar_muitos(self, chaves):
+        with self.trava_global.escrita():
+            super().deletar_muitos(chaves)
+            self._recontar()
+
+    def deletar_intervalo(self, inicio=None, fim=None):
+        with self.trava_global.escrita():
+            super().deletar_intervalo(inicio, fim)
+            self._recontar()
+
+    def limpar(self):
+        with self.trava_global.escrita():
+            super().limpar()
+            self._entradas = 0
+
+    def altura(self):
+        with self.trava_global.escrita():
+            return super().altura()
+
+    def perfil(self):
+        with self.trava_global.escrita():
+            return super().perfil()
+
+    def verificar(self):
+        with self.trava_global.escrita():
+            super().verificar()
+            total = sum(len(folha.chaves) for folha in self._folhas())
+            if self._entradas != total:
+                raise AssertionError(f"len() igual a {self._entradas}, mas a árvore tem {total} chaves")
+            return True
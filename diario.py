@@ -0,0 +1,264 @@
+import os
+import struct
+import threading
+import zlib
+
+# Cabeçalho do diário e do checkpoint: assinatura e geração
+FORMATO_CABECALHO = "<8sq"
+ASSINATURA_DIARIO = b"BPLUSWAL"
+ASSINATURA_CHECKPOINT = b"BPLUSCKP"
+# Cada registro começa com o tamanho e o CRC32 do conteúdo serializado
+FORMATO_REGISTRO = "<II"
+# O conteúdo é a operação e os nomes do caminho em UTF-8, separados por este caractere, que não
+# pode aparecer em nomes (ver Shell._separar). Um formato só de texto, e não pickle, garante que
+# um diário alterado por terceiros não executa código ao ser lido
+SEPARADOR = "\0"
+# Tamanho do buffer em memória a partir do qual os registros são escritos sem esperar o intervalo
+LIMITE_PENDENTE = 1 << 20
+
+
+def codificar(operacao, caminho):
+    """
+    Serializa um registro (operação, caminho como tupla de nomes a partir da raiz).
+    """
+    texto = SEPARADOR.join((operacao, *caminho))
+    if texto.count(SEPARADOR) != len(caminho):
+        raise ValueError(f"Nome com o caractere {SEPARADOR!r} não pode ser gravado no diário.")
+    dados = texto.encode()
+    return struct.pack(FORMATO_REGISTRO, len(dados), zlib.crc32(dados)) + dados
+
+
+def decodificar(conteudo):
+    """
+    Inverso de 'codificar': retorna (operação, caminho) do conteúdo de um registro.
+    """
+    operacao, *caminho = str(conteudo, "utf-8").split(SEPARADOR)
+    if not caminho:
+        raise ValueError("Registro do diário sem caminho.")
+    return operacao, tuple(caminho)
+
+
+def ler_registros(arquivo):
+    """
+    Gera os registros (operação, caminho) de um arquivo aberto, a partir da posição atual.
+    O restante do arquivo é lido de uma vez e decodificado sem cópias (memoryview).
+    Para no primeiro registro incompleto ou corrompido (uma escrita interrompida por uma queda);
+    ao terminar, a posição do arquivo fica no fim do último registro válido. Um registro com o CRC
+    certo mas conteúdo inválido não vem de uma queda e gera ValueError.
+    """
+    inicio = arquivo.tell()
+    dados = memoryview(arquivo.read())
+    tamanho_cabecalho = struct.calcsize(FORMATO_REGISTRO)
+    posicao = 0
+    try:
+        while posicao + tamanho_cabecalho <= len(dados):
+            tamanho, crc = struct.unpack_from(FORMATO_REGISTRO, dados, posicao)
+            fim = posicao + tamanho_cabecalho + tamanho
+            conteudo = dados[posicao + tamanho_cabecalho:fim]
+            if fim > len(dados) or zlib.crc32(conteudo) != crc:
+                break
+            yield decodificar(conteudo)
+            posicao = fim
+    finally:
+        arquivo.seek(inicio + posicao)
+
+
+def reproduzir(registros):
+    """
+    Aplica uma sequência de registros a um sistema de arquivos vazio, representado por dicionários
+    aninhados (nome -> dicionário do subdiretório, ou None para arquivos), e o retorna.
+    Os registros descrevem apenas alterações que deram certo, então nada é validado de novo; um
+    registro cujo diretório pai não existe é ignorado.
+    """
+    raiz = {}
+    for operacao, caminho in registros:
+        pai = raiz
+        for nome in caminho[:-1]:
+            pai = pai.get(nome)
+            if pai is None:
+                break
+        else:
+            if operacao == "mkdir":
+                pai.setdefault(caminho[-1], {})
+            elif operacao == "touch":
+                pai.setdefault(caminho[-1], None)
+            elif operacao == "rm":
+                pai.pop(caminho[-1], None)
+    return raiz
+
+
+class Diario:
+    """
+    Write-ahead log das alterações do sistema de arquivos, só de acréscimos, com commit em grupo.
+
+    - 'registrar' apenas acumula o registro em memória; uma thread de fundo escreve os registros
+      acumulados e chama fsync uma vez a cada 'intervalo' segundos, de modo que muitos comandos
+      compartilham a mesma sincronização. Uma queda perde no máximo o último intervalo;
+      com intervalo 0 cada registro é sincronizado antes de 'registrar' retornar.
+    - 'checkpoint' grava o estado completo (como registros de criação) em um arquivo separado,
+      trocado de forma atômica, e recomeça o diário vazio com a geração seguinte. Um diário com
+      geração menor ou igual à do checkpoint já está incorporado a ele e é ignorado na recuperação.
+    - 'recuperar' gera os registros do checkpoint seguidos dos do diário.
+    """
+    def __init__(self, caminho, intervalo=0.05):
+        self.caminho = caminho
+        self.caminho_checkpoint = caminho + ".checkpoint"
+        self.intervalo = intervalo
+        # Registros desde o último checkpoint e número de sincronizações com o disco
+        self.registros = 0
+        self.sincronizacoes = 0
+        # Registros já serializados que ainda não foram escritos no arquivo
+        self._pendente = bytearray()
+        # Indica se há dados escritos no arquivo ainda não sincronizados com o disco
+        self._sujo = False
+        # '_trava' protege o buffer; '_trava_arquivo' serializa escrita, fsync e truncamento
+        self._trava = threading.Lock()
+        self._trava_arquivo = threading.Lock()
+
+        self._geracao_checkpoint = 0
+        if os.path.exists(self.caminho_checkpoint):
+            with open(self.caminho_checkpoint, "rb") as arquivo:
+                self._geracao_checkpoint = self._ler_cabecalho(arquivo, ASSINATURA_CHECKPOINT)
+
+        # Lê os registros válidos do diário e descarta uma eventual cauda corrompida
+        self._recuperados = []
+        if os.path.exists(caminho):
+            self.arquivo = open(caminho, "r+b")
+            self.geracao = self._ler_cabecalho(self.arquivo, ASSINATURA_DIARIO)
+            if self.geracao > self._geracao_checkpoint:
+                self._recuperados = list(ler_registros(self.arquivo))
+                self.arquivo.truncate(self.arquivo.tell())
+                self.registros = len(self._recuperados)
+            else:
+                self._reiniciar(self._geracao_checkpoint + 1)
+        else:
+            self.arquivo = open(caminho, "w+b")
+            self._reiniciar(self._geracao_checkpoint + 1)
+        self.arquivo.seek(0, os.SEEK_END)
+
+        # Thread do commit em grupo
+        self._parar = threading.Event()
+        self._thread = None
+        if intervalo > 0:
+            self._thread = threading.Thread(target=self._ciclo, name="diario", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _ler_cabecalho(arquivo, assinatura):
+        """
+        Lê o cabeçalho e retorna a geração; um arquivo menor que o cabeçalho (criação interrompida)
+        conta como geração 0.
+        """
+        tamanho = struct.calcsize(FORMATO_CABECALHO)
+        cabecalho = arquivo.read(tamanho)
+        if len(cabecalho) < tamanho:
+            return 0
+        lida, geracao = struct.unpack(FORMATO_CABECALHO, cabecalho)
+        if lida != assinatura:
+            raise ValueError(f"{arquivo.name} não é um arquivo de diário da B+ Tree.")
+        return geracao
+
+    def _reiniciar(self, geracao):
+        """
+        Esvazia o arquivo do diário e grava o cabeçalho da nova geração.
+        """
+        self.geracao = geracao
+        self.arquivo.seek(0)
+        self.arquivo.truncate()
+        self.arquivo.write(struct.pack(FORMATO_CABECALHO, ASSINATURA_DIARIO, geracao))
+        self.arquivo.flush()
+        os.fsync(self.arquivo.fileno())
+
+    def recuperar(self):
+        """
+        Gera os registros do último checkpoint e, em seguida, os do diário ainda não incorporados a ele.
+        """
+        if os.path.exists(self.caminho_checkpoint):
+            with open(self.caminho_checkpoint, "rb") as arquivo:
+                self._ler_cabecalho(arquivo, ASSINATURA_CHECKPOINT)
+                yield from ler_registros(arquivo)
+                if arquivo.read(1):
+                    raise ValueError(f"Checkpoint {self.caminho_checkpoint} corrompido.")
+        yield from self._recuperados
+        self._recuperados = []
+
+    def registrar(self, operacao, caminho):
+        """
+        Acrescenta uma alteração ao diário. Ela estará no disco após a próxima sincronização.
+        """
+        registro = codificar(operacao, caminho)
+        with self._trava:
+            self._pendente += registro
+            self.registros += 1
+            cheio = len(self._pendente) >= LIMITE_PENDENTE
+        if not self.intervalo:
+            self.sincronizar()
+        elif cheio:
+            self._escrever(sincronizar=False)
+
+    def _escrever(self, sincronizar):
+        """
+        Escreve no arquivo os registros pendentes (com uma única chamada) e, se pedido, chama fsync.
+        Novos registros podem ser acumulados enquanto a escrita acontece.
+        """
+        with self._trava_arquivo:
+            with self._trava:
+                dados = self._pendente
+                self._pendente = bytearray()
+            if dados:
+                self.arquivo.write(dados)
+                self.arquivo.flush()
+            if sincronizar and (dados or self._sujo):
+                os.fsync(self.arquivo.fileno())
+                self.sincronizacoes += 1
+                self._sujo = False
+            elif dados:
+                self._sujo = True
+
+    def sincronizar(self):
+        """
+        Escreve os registros pendentes e os força para o disco.
+        """
+        self._escrever(sincronizar=True)
+
+    def _ciclo(self):
+        while not self._parar.wait(self.intervalo):
+            self.sincronizar()
+
+    def checkpoint(self, registros):
+        """
+        Grava um checkpoint com os registros que reconstroem o estado atual (normalmente criações
+        em pré-ordem) e recomeça o diário vazio. Os registros pendentes são descartados, pois o
+        estado gravado já inclui as alterações que eles descrevem.
+        """
+        temporario = self.caminho_checkpoint + ".tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(struct.pack(FORMATO_CABECALHO, ASSINATURA_CHECKPOINT, self.geracao))
+            for operacao, caminho in registros:
+                arquivo.write(codificar(operacao, caminho))
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        # A troca atômica garante que uma queda deixa o checkpoint antigo ou o novo, nunca metade
+        os.replace(temporario, self.caminho_checkpoint)
+        diretorio = os.open(os.path.dirname(os.path.abspath(self.caminho_checkpoint)), os.O_RDONLY)
+        try:
+            os.fsync(diretorio)
+        finally:
+            os.close(diretorio)
+        with self._trava_arquivo:
+            with self._trava:
+                self._pendente = bytearray()
+                self.registros = 0
+            self._geracao_checkpoint = self.geracao
+            self._reiniciar(self.geracao + 1)
+            self._sujo = False
+
+    def fechar(self):
+        """
+        Para a thread de sincronização, grava o que estiver pendente e fecha o arquivo.
+        """
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sincronizar()
+        self.arquivo.close()
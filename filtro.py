@@ -0,0 +1,216 @@
+from math import ceil, log
+
+from bplustree import _AUSENTE, ArvoreBPlus
+from prefixos import ArvoreBPlusPrefixada
+
+# Constantes do espalhamento das chaves: o hash do Python é multiplicado por uma constante ímpar
+# de 64 bits (hash de Fibonacci), pois o hash de inteiros é o próprio número e chaves vizinhas
+# cairiam em contadores vizinhos
+MULTIPLICADOR = 0x9E3779B97F4A7C15
+MASCARA = (1 << 64) - 1
+# Valor em que um contador satura: a partir dele não é mais decrementado (nunca gera falso negativo)
+SATURACAO = 255
+
+
+def _espalhar(chave):
+    """
+    Retorna (posição inicial, passo) das k posições de uma chave no filtro (ver FiltroBloomContagem).
+    O passo é ímpar, para não ficar preso num divisor de m.
+    """
+    espalhado = hash(chave) * MULTIPLICADOR & MASCARA
+    return espalhado & 0xFFFFFFFF, espalhado >> 32 | 1
+
+
+class FiltroBloomContagem:
+    """
+    Filtro de Bloom com contadores de 8 bits em vez de bits, para aceitar remoções.
+    'contem' nunca erra para uma chave adicionada (e não removida); para as demais responde True
+    com probabilidade próxima de 'taxa' enquanto o filtro tiver até 'capacidade' entradas.
+    As k posições de uma chave vêm de duas metades do seu hash (h1 + i * h2, double hashing).
+    """
+    __slots__ = ("capacidade", "taxa", "k", "m", "contadores")
+
+    def __init__(self, capacidade, taxa):
+        self.capacidade = capacidade
+        self.taxa = taxa
+        # Tamanho e número de posições ótimos para a taxa de falsos positivos pedida
+        self.m = max(8, ceil(-capacidade * log(taxa) / log(2) ** 2))
+        self.k = max(1, round(self.m / capacidade * log(2)))
+        self.contadores = bytearray(self.m)
+
+    def adicionar(self, chave):
+        posicao, passo = _espalhar(chave)
+        contadores = self.contadores
+        m = self.m
+        for _ in range(self.k):
+            i = posicao % m
+            if contadores[i] < SATURACAO:
+                contadores[i] += 1
+            posicao += passo
+
+    def remover(self, chave):
+        """
+        Desfaz um 'adicionar' da chave. Só deve ser chamado para chaves que foram adicionadas.
+        """
+        posicao, passo = _espalhar(chave)
+        contadores = self.contadores
+        m = self.m
+        for _ in range(self.k):
+            i = posicao % m
+            if contadores[i] < SATURACAO:
+                contadores[i] -= 1
+            posicao += passo
+
+    def contem(self, chave):
+        """
+        False se a chave certamente não foi adicionada; True se talvez tenha sido.
+        Numa chave ausente a verificação costuma parar no primeiro ou segundo contador zerado.
+        """
+        posicao, passo = _espalhar(chave)
+        contadores = self.contadores
+        m = self.m
+        for _ in range(self.k):
+            if not contadores[posicao % m]:
+                return False
+            posicao += passo
+        return True
+
+    def copiar(self):
+        copia = FiltroBloomContagem.__new__(FiltroBloomContagem)
+        copia.capacidade = self.capacidade
+        copia.taxa = self.taxa
+        copia.k = self.k
+        copia.m = self.m
+        copia.contadores = self.contadores[:]
+        return copia
+
+
+class ArvoreBPlusFiltrada(ArvoreBPlus):
+    """
+    B+ Tree com um filtro de Bloom com contadores (FiltroBloomContagem) na frente: buscas e remoções
+    de chaves ausentes, o caso comum de nomes digitados errado em 'cd' e 'rm', são respondidas
+    pelo filtro sem descer pela árvore (e, no modo copy-on-write, sem copiar a raiz).
+
+    - Inserções e remoções individuais atualizam o filtro. As operações em lote não descobrem
+      quais chaves existiam, então 'inserir_muitos' adiciona todas as chaves do lote e
+      'deletar_muitos'/'deletar_intervalo' não removem nada do filtro; as entradas a mais só
+      aumentam os falsos positivos, nunca causam falsos negativos.
+    - Quando o número de entradas do filtro passa da capacidade, ele é reconstruído a partir das
+      chaves da árvore com o dobro do tamanho dela, o que também descarta as entradas a mais.
+    - O filtro é compartilhado com os instantâneos e copiado na primeira alteração.
+
+    A inserção desce até a folha de qualquer forma e ainda atualiza o filtro, então fica mais lenta
+    (de 2 a 4 vezes, em 'benchmark.py --filtro'). No shell, o custo de resolver o caminho domina e
+    o filtro não deixa 'cd' para nomes inexistentes mais rápido.
+    """
+    # Taxa de falsos positivos padrão e capacidade do filtro de uma árvore nova
+    TAXA_FALSOS_POSITIVOS = 0.01
+    CAPACIDADE_INICIAL = 16
+
+    def __init__(self, grau, tipo_chave=None, tipo_valor=None, taxa=None):
+        super().__init__(grau, tipo_chave, tipo_valor)
+        self.taxa = self.TAXA_FALSOS_POSITIVOS if taxa is None else taxa
+        self.filtro = FiltroBloomContagem(self.CAPACIDADE_INICIAL, self.taxa)
+        # Entradas no filtro, incluindo as de chaves que já saíram da árvore por remoções em lote
+        self.entradas_filtro = 0
+        # Indica se o filtro pode estar em uso por um instantâneo (e deve ser copiado antes de mudar)
+        self._filtro_compartilhado = False
+
+    @classmethod
+    def carregar_ordenado(cls, itens, grau, fator_preenchimento=1.0, tipo_chave=None, tipo_valor=None):
+        arvore = super().carregar_ordenado(itens, grau, fator_preenchimento, tipo_chave, tipo_valor)
+        arvore.reconstruir_filtro()
+        return arvore
+
+    def reconstruir_filtro(self):
+        """
+        Refaz o filtro a partir das chaves da árvore, com capacidade para o dobro delas.
+        """
+        self.filtro = FiltroBloomContagem(max(self.CAPACIDADE_INICIAL, 2 * len(self)), self.taxa)
+        self._filtro_compartilhado = False
+        for chave in self.listar_chaves():
+            self.filtro.adicionar(chave)
+        self.entradas_filtro = len(self)
+
+    def _filtro_proprio(self):
+        """
+        Retorna o filtro pronto para ser alterado, copiando-o se for compartilhado com um instantâneo.
+        """
+        if self._filtro_compartilhado:
+            self.filtro = self.filtro.copiar()
+            self._filtro_compartilhado = False
+        return self.filtro
+
+    def _adicionar_ao_filtro(self, chaves):
+        filtro = self._filtro_proprio()
+        for chave in chaves:
+            filtro.adicionar(chave)
+            self.entradas_filtro += 1
+        if self.entradas_filtro > filtro.capacidade:
+            self.reconstruir_filtro()
+
+    def instantaneo(self):
+        copia = super().instantaneo()
+        copia.taxa = self.taxa
+        copia.filtro = self.filtro
+        copia.entradas_filtro = self.entradas_filtro
+        copia._filtro_compartilhado = self._filtro_compartilhado = True
+        return copia
+
+    def buscar(self, chave):
+        if not self.filtro.contem(chave):
+            return None
+        return super().buscar(chave)
+
+    def buscar_muitos(self, chaves):
+        # Só as chaves que passam pelo filtro são procuradas na árvore
+        resultado = [None] * len(chaves)
+        candidatas = [posicao for posicao, chave in enumerate(chaves) if self.filtro.contem(chave)]
+        for posicao, valor in zip(candidatas, super().buscar_muitos([chaves[posicao] for posicao in candidatas])):
+            resultado[posicao] = valor
+        return resultado
+
+    def _inserir(self, chave, valor, substituir):
+        existia = super()._inserir(chave, valor, substituir)
+        if not existia:
+            self._filtro_proprio().adicionar(chave)
+            self.entradas_filtro += 1
+            if self.entradas_filtro > self.filtro.capacidade:
+                self.reconstruir_filtro()
+        return existia
+
+    def _remover(self, chave):
+        if not self.filtro.contem(chave):
+            return _AUSENTE
+        valor = super()._remover(chave)
+        if valor is not _AUSENTE:
+            self._filtro_proprio().remover(chave)
+            self.entradas_filtro -= 1
+        return valor
+
+    def inserir_muitos(self, itens):
+        itens = list(itens)
+        super().inserir_muitos(itens)
+        self._adicionar_ao_filtro({chave for chave, _ in itens})
+
+    def limpar(self):
+        super().limpar()
+        self.filtro = FiltroBloomContagem(self.CAPACIDADE_INICIAL, self.taxa)
+        self.entradas_filtro = 0
+        self._filtro_compartilhado = False
+
+    def verificar(self):
+        """
+        Além das invariantes da ArvoreBPlus, confere que o filtro contém todas as chaves da árvore.
+        """
+        super().verificar()
+        for chave in self.listar_chaves():
+            if not self.filtro.contem(chave):
+                raise AssertionError(f"Filtro sem a chave {chave!r}")
+        return True
+
+
+class ArvoreBPlusPrefixadaFiltrada(ArvoreBPlusFiltrada, ArvoreBPlusPrefixada):
+    """
+    ArvoreBPlusPrefixada com o filtro da ArvoreBPlusFiltrada na frente.
+    """
@@ -0,0 +1,417 @@
+import mmap
+import os
+import pickle
+import struct
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from bplustree import ArvoreBPlus
+
+# Cabeçalho do arquivo (página 0): assinatura, tamanho da página, grau, página raiz e total de páginas
+FORMATO_CABECALHO = "<8sIIqq"
+ASSINATURA = b"BPLUSPG1"
+# Cada página começa com o tamanho (em bytes) do nó serializado que ela contém
+FORMATO_TAMANHO = "<I"
+SEM_PAGINA = -1
+
+
+class NoPagina:
+    """
+    Representa um nó da B+ Tree armazenado em uma página do arquivo.
+    Igual ao NoArvoreBPlus, mas os filhos de nós internos e os ponteiros 'proximo'/'anterior'
+    são números de página em vez de referências para objetos.
+    """
+    __slots__ = ("pagina", "e_folha", "chaves", "filhos", "proximo", "anterior")
+
+    def __init__(self, pagina, e_folha=False):
+        # Número da página onde o nó é gravado
+        self.pagina = pagina
+        # Indica se este nó é uma folha ou um nó interno
+        self.e_folha = e_folha
+        # Lista para armazenar as chaves
+        self.chaves = []
+        # Valores (nas folhas) ou números de página dos filhos (nos nós internos)
+        self.filhos = []
+        # Páginas das folhas vizinhas na lista ligada
+        self.proximo = SEM_PAGINA
+        self.anterior = SEM_PAGINA
+
+
+class ArquivoPaginas:
+    """
+    Arquivo dividido em páginas de tamanho fixo.
+    A leitura é feita por um mapeamento em memória (mmap), de modo que só as páginas
+    efetivamente lidas são trazidas do disco; a escrita é feita diretamente no arquivo.
+    Com 'tamanho_pagina' e 'grau' o arquivo é criado vazio (um arquivo existente é truncado);
+    sem eles, um arquivo existente é aberto com o cabeçalho gravado nele.
+    """
+    def __init__(self, caminho, tamanho_pagina=None, grau=None):
+        if tamanho_pagina is not None and grau is not None:
+            # Cria (ou trunca) o arquivo com um cabeçalho novo: páginas de outra árvore gravada
+            # no mesmo caminho não podem ser aproveitadas
+            self.arquivo = open(caminho, "w+b")
+            self.arquivo.write(bytes(tamanho_pagina))
+            self.arquivo.flush()
+            self.tamanho_pagina = tamanho_pagina
+            self.grau = grau
+            self.raiz = SEM_PAGINA
+            self.total_paginas = 1
+            self.escrever_cabecalho()
+        else:
+            if not os.path.exists(caminho):
+                raise FileNotFoundError(caminho)
+            self.arquivo = open(caminho, "r+b")
+            tamanho = struct.calcsize(FORMATO_CABECALHO)
+            assinatura, self.tamanho_pagina, self.grau, self.raiz, self.total_paginas = struct.unpack(
+                FORMATO_CABECALHO, self.arquivo.read(tamanho)
+            )
+            if assinatura != ASSINATURA:
+                raise ValueError(f"{caminho} não é um arquivo de páginas da B+ Tree.")
+        self.mapa = mmap.mmap(self.arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def escrever_cabecalho(self):
+        """
+        Grava o cabeçalho na página 0.
+        """
+        cabecalho = struct.pack(
+            FORMATO_CABECALHO, ASSINATURA, self.tamanho_pagina, self.grau, self.raiz, self.total_paginas
+        )
+        os.pwrite(self.arquivo.fileno(), cabecalho, 0)
+
+    def alocar(self):
+        """
+        Reserva uma nova página no final do arquivo e retorna o seu número.
+        """
+        pagina = self.total_paginas
+        self.total_paginas += 1
+        return pagina
+
+    def ler(self, pagina):
+        """
+        Decodifica o nó gravado na página, lendo pelo mapeamento em memória.
+        """
+        inicio = pagina * self.tamanho_pagina
+        # O arquivo pode ter crescido depois do último mapeamento
+        if inicio + self.tamanho_pagina > len(self.mapa):
+            self.mapa.close()
+            self.mapa = mmap.mmap(self.arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        (tamanho,) = struct.unpack_from(FORMATO_TAMANHO, self.mapa, inicio)
+        deslocamento = inicio + struct.calcsize(FORMATO_TAMANHO)
+        e_folha, chaves, filhos, proximo, anterior = pickle.loads(self.mapa[deslocamento:deslocamento + tamanho])
+        no = NoPagina(pagina, e_folha)
+        no.chaves = chaves
+        no.filhos = filhos
+        no.proximo = proximo
+        no.anterior = anterior
+        return no
+
+    def escrever(self, no):
+        """
+        Serializa o nó e grava a página correspondente, completando-a com zeros.
+        """
+        dados = pickle.dumps((no.e_folha, no.chaves, no.filhos, no.proximo, no.anterior), pickle.HIGHEST_PROTOCOL)
+        dados = struct.pack(FORMATO_TAMANHO, len(dados)) + dados
+        if len(dados) > self.tamanho_pagina:
+            raise ValueError(
+                f"Nó com {len(dados)} bytes não cabe em uma página de {self.tamanho_pagina} bytes; "
+                "use um grau menor ou páginas maiores."
+            )
+        os.pwrite(self.arquivo.fileno(), dados.ljust(self.tamanho_pagina, b"\0"), no.pagina * self.tamanho_pagina)
+
+    def sincronizar(self):
+        """
+        Grava o cabeçalho e força os dados para o disco.
+        """
+        self.escrever_cabecalho()
+        os.fsync(self.arquivo.fileno())
+
+    def fechar(self):
+        """
+        Desfaz o mapeamento e fecha o arquivo.
+        """
+        self.mapa.close()
+        self.arquivo.close()
+
+
+class BufferPaginas:
+    """
+    Buffer de páginas com política LRU.
+    Mantém em memória no máximo 'capacidade' nós decodificados; ao expulsar um nó modificado
+    (sujo), grava-o de volta no arquivo antes de descartá-lo.
+    """
+    # Quantidade mínima de nós que uma operação mantém em uso ao mesmo tempo (pai, filho, irmão, vizinho...)
+    CAPACIDADE_MINIMA = 8
+
+    def __init__(self, arquivo, capacidade=1024):
+        self.arquivo = arquivo
+        self.capacidade = max(capacidade, self.CAPACIDADE_MINIMA)
+        # Nós em memória, do menos para o mais recentemente usado
+        self.nos = OrderedDict()
+        # Páginas modificadas que ainda não foram gravadas
+        self.sujos = set()
+
+    def obter(self, pagina):
+        """
+        Retorna o nó da página, lendo-o do arquivo apenas se não estiver no buffer.
+        """
+        no = self.nos.get(pagina)
+        if no is None:
+            no = self.arquivo.ler(pagina)
+            self.nos[pagina] = no
+            self._expulsar()
+        else:
+            self.nos.move_to_end(pagina)
+        return no
+
+    def novo(self, e_folha=False):
+        """
+        Cria um nó em uma página recém-alocada, já marcado como sujo.
+        """
+        no = NoPagina(self.arquivo.alocar(), e_folha)
+        self.marcar_sujo(no)
+        return no
+
+    def marcar_sujo(self, no):
+        """
+        Registra que o nó foi modificado e precisa ser gravado antes de sair do buffer.
+        """
+        self.nos[no.pagina] = no
+        self.nos.move_to_end(no.pagina)
+        self.sujos.add(no.pagina)
+        self._expulsar()
+
+    def _expulsar(self):
+        # Remove os nós menos usados recentemente, gravando os sujos
+        while len(self.nos) > self.capacidade:
+            pagina, no = self.nos.popitem(last=False)
+            if pagina in self.sujos:
+                self.arquivo.escrever(no)
+                self.sujos.discard(pagina)
+
+    def descarregar(self):
+        """
+        Grava todas as páginas sujas e o cabeçalho, e sincroniza o arquivo com o disco.
+        """
+        for pagina in sorted(self.sujos):
+            self.arquivo.escrever(self.nos[pagina])
+        self.sujos.clear()
+        self.arquivo.sincronizar()
+
+
+class ArvoreBPlusEmDisco:
+    """
+    B+ Tree armazenada em um arquivo de páginas, com um nó por página.
+    Abrir a árvore lê apenas o cabeçalho; cada busca traz do disco somente as páginas do caminho
+    da raiz até a folha, e o buffer LRU mantém em memória as mais usadas.
+    """
+    def __init__(self, arquivo, capacidade_buffer=1024):
+        self.arquivo = arquivo
+        self.buffer = BufferPaginas(arquivo, capacidade_buffer)
+        self.grau = arquivo.grau
+        # Uma árvore nova começa com uma folha vazia como raiz
+        if arquivo.raiz == SEM_PAGINA:
+            arquivo.raiz = self.buffer.novo(e_folha=True).pagina
+
+    @classmethod
+    def criar(cls, caminho, grau, tamanho_pagina=4096, capacidade_buffer=1024):
+        """
+        Cria um arquivo de páginas vazio para uma árvore do grau informado, substituindo
+        o arquivo se ele já existir.
+        """
+        return cls(ArquivoPaginas(caminho, tamanho_pagina, grau), capacidade_buffer)
+
+    @classmethod
+    def abrir(cls, caminho, capacidade_buffer=1024):
+        """
+        Abre uma árvore já gravada. Apenas o cabeçalho é lido neste momento.
+        """
+        return cls(ArquivoPaginas(caminho), capacidade_buffer)
+
+    @classmethod
+    def salvar(cls, arvore, caminho, tamanho_pagina=4096):
+        """
+        Grava uma ArvoreBPlus em memória em um novo arquivo de páginas, nível a nível,
+        substituindo o arquivo se ele já existir.
+        """
+        arquivo = ArquivoPaginas(caminho, tamanho_pagina, arvore.grau)
+        # Primeira passada: numera as páginas em largura, para que os filhos já tenham número
+        # quando o pai for gravado
+        paginas = {}
+        nivel = [arvore.raiz]
+        ordem = []
+        while nivel:
+            proximo_nivel = []
+            for no in nivel:
+                paginas[id(no)] = arquivo.alocar()
+                ordem.append(no)
+                if not no.e_folha:
+                    proximo_nivel.extend(no.filhos)
+            nivel = proximo_nivel
+
+        # Segunda passada: grava cada nó traduzindo referências em números de página.
+        # O último nível da ordem em largura são as folhas, da esquerda para a direita; a lista ligada
+        # é refeita a partir dele, pois a árvore em memória pode estar no modo copy-on-write, sem ela
+        folhas = [paginas[id(no)] for no in ordem if no.e_folha]
+        vizinhas = {}
+        for i, pagina in enumerate(folhas):
+            vizinhas[pagina] = (
+                folhas[i - 1] if i > 0 else SEM_PAGINA,
+                folhas[i + 1] if i + 1 < len(folhas) else SEM_PAGINA,
+            )
+        for no in ordem:
+            no_pagina = NoPagina(paginas[id(no)], no.e_folha)
+            no_pagina.chaves = arvore._chaves_completas(no)
+            if no.e_folha:
+                no_pagina.filhos = no.filhos
+                no_pagina.anterior, no_pagina.proximo = vizinhas[no_pagina.pagina]
+            else:
+                no_pagina.filhos = [paginas[id(filho)] for filho in no.filhos]
+            arquivo.escrever(no_pagina)
+
+        arquivo.raiz = paginas[id(arvore.raiz)]
+        arquivo.sincronizar()
+        arquivo.fechar()
+
+    def carregar(self):
+        """
+        Lê a árvore inteira para uma ArvoreBPlus em memória, usando a carga em lote.
+        """
+        return ArvoreBPlus.carregar_ordenado(self.iterar_itens(), self.grau)
+
+    def _encontrar_folha(self, chave):
+        """
+        Desce da raiz até a folha onde a chave deveria estar.
+        """
+        no = self.buffer.obter(self.arquivo.raiz)
+        while not no.e_folha:
+            no = self.buffer.obter(no.filhos[bisect_right(no.chaves, chave)])
+        return no
+
+    def buscar(self, chave):
+        """
+        Busca um valor associado a uma chave na árvore.
+        Retorna o valor se encontrado, caso contrário, retorna None.
+        """
+        no = self._encontrar_folha(chave)
+        i = bisect_left(no.chaves, chave)
+        if i < len(no.chaves) and no.chaves[i] == chave:
+            return no.filhos[i]
+        return None
+
+    def iterar_itens(self, inicio=None, fim=None):
+        """
+        Gera os pares (chave, valor) com inicio <= chave < fim seguindo a lista ligada das folhas.
+        """
+        if inicio is None:
+            no = self.buffer.obter(self.arquivo.raiz)
+            while not no.e_folha:
+                no = self.buffer.obter(no.filhos[0])
+            i = 0
+        else:
+            no = self._encontrar_folha(inicio)
+            i = bisect_left(no.chaves, inicio)
+        while True:
+            while i < len(no.chaves):
+                if fim is not None and no.chaves[i] >= fim:
+                    return
+                yield no.chaves[i], no.filhos[i]
+                i += 1
+            if no.proximo == SEM_PAGINA:
+                return
+            no = self.buffer.obter(no.proximo)
+            i = 0
+
+    def inserir(self, chave, valor):
+        """
+        Insere uma nova chave-valor na árvore, dividindo preventivamente os nós cheios
+        no caminho de descida (mesmo algoritmo da ArvoreBPlus).
+        Chaves já existentes são ignoradas.
+        """
+        raiz = self.buffer.obter(self.arquivo.raiz)
+        if len(raiz.chaves) == (self.grau - 1):
+            nova_raiz = self.buffer.novo()
+            nova_raiz.filhos.append(raiz.pagina)
+            self._dividir_filho(nova_raiz, 0)
+            self.arquivo.raiz = nova_raiz.pagina
+            raiz = nova_raiz
+
+        no = raiz
+        while not no.e_folha:
+            i = bisect_right(no.chaves, chave)
+            filho = self.buffer.obter(no.filhos[i])
+            if len(filho.chaves) == (self.grau - 1):
+                self._dividir_filho(no, i)
+                if chave >= no.chaves[i]:
+                    i += 1
+                filho = self.buffer.obter(no.filhos[i])
+            no = filho
+
+        i = bisect_left(no.chaves, chave)
+        if i < len(no.chaves) and no.chaves[i] == chave:
+            return
+        no.chaves.insert(i, chave)
+        no.filhos.insert(i, valor)
+        self.buffer.marcar_sujo(no)
+
+    def _dividir_filho(self, pai, indice):
+        """
+        Divide um filho cheio do nó pai em dois, promovendo uma chave para o pai.
+        """
+        no = self.buffer.obter(pai.filhos[indice])
+        novo_no = self.buffer.novo(e_folha=no.e_folha)
+        meio = len(no.chaves) // 2
+
+        if no.e_folha:
+            novo_no.chaves = no.chaves[meio:]
+            novo_no.filhos = no.filhos[meio:]
+            no.chaves = no.chaves[:meio]
+            no.filhos = no.filhos[:meio]
+
+            # Ajusta a lista ligada das folhas, agora por números de página
+            novo_no.proximo = no.proximo
+            novo_no.anterior = no.pagina
+            if no.proximo != SEM_PAGINA:
+                vizinho = self.buffer.obter(no.proximo)
+                vizinho.anterior = novo_no.pagina
+                self.buffer.marcar_sujo(vizinho)
+            no.proximo = novo_no.pagina
+
+            pai.chaves.insert(indice, novo_no.chaves[0])
+        else:
+            novo_no.chaves = no.chaves[meio+1:]
+            novo_no.filhos = no.filhos[meio+1:]
+            pai.chaves.insert(indice, no.chaves[meio])
+            no.chaves = no.chaves[:meio]
+            no.filhos = no.filhos[:meio+1]
+
+        pai.filhos.insert(indice + 1, novo_no.pagina)
+        self.buffer.marcar_sujo(no)
+        self.buffer.marcar_sujo(novo_no)
+        self.buffer.marcar_sujo(pai)
+
+    def deletar(self, chave):
+        """
+        Deleta uma chave e seu valor associado da árvore.
+        A remoção é preguiçosa: a folha pode ficar abaixo do mínimo (ou vazia) sem fusões,
+        evitando reescrever páginas vizinhas; buscas e varreduras continuam corretas.
+        Para recompactar, use 'carregar' seguido de 'salvar'.
+        """
+        no = self._encontrar_folha(chave)
+        i = bisect_left(no.chaves, chave)
+        if i < len(no.chaves) and no.chaves[i] == chave:
+            no.chaves.pop(i)
+            no.filhos.pop(i)
+            self.buffer.marcar_sujo(no)
+
+    def descarregar(self):
+        """
+        Grava no arquivo todas as páginas modificadas.
+        """
+        self.buffer.descarregar()
+
+    def fechar(self):
+        """
+        Grava as páginas pendentes e fecha o arquivo.
+        """
+        self.descarregar()
+        self.arquivo.fechar()
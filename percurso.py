@@ -0,0 +1,195 @@
+import multiprocessing
+import os
+import threading
+from fnmatch import fnmatchcase
+
+# Subárvores por processo ao repartir um percurso paralelo: mais tarefas que processos equilibram
+# a carga quando as subárvores têm tamanhos diferentes
+TAREFAS_POR_PROCESSO = 4
+
+# Tarefas (caminho, diretório) do percurso paralelo em andamento. Os processos do pool são criados
+# com fork e herdam esta lista, então o sistema de arquivos nunca é serializado: cada tarefa é
+# enviada como um índice e só os resultados voltam
+_tarefas = None
+
+
+def caminhar(no, caminho=(), profundidade_maxima=None):
+    """
+    Gera, de forma preguiçosa e em pré-ordem (cada diretório antes do seu conteúdo, irmãos em ordem
+    alfabética), os pares (caminho, nó) de tudo que está abaixo do diretório 'no'. Os caminhos são
+    tuplas de nomes, prefixadas por 'caminho'. Com 'profundidade_maxima', não desce além desse nível
+    (1: só o conteúdo direto de 'no').
+    Usa uma pilha com um iterador de folhas por nível em vez de recursão, então não há limite de
+    profundidade e a memória usada não depende do tamanho dos diretórios. O sistema de arquivos
+    não deve ser alterado enquanto o gerador estiver em uso.
+    """
+    if not no.e_diretorio or no.vazio():
+        return
+    pilha = [(caminho, no.arvore.iterar_itens())]
+    while pilha:
+        base, itens = pilha[-1]
+        for nome, filho in itens:
+            caminho_filho = base + (nome,)
+            yield caminho_filho, filho
+            if filho.e_diretorio and not filho.vazio() and (
+                profundidade_maxima is None or len(pilha) < profundidade_maxima
+            ):
+                # Desce no subdiretório; o iterador deste nível continua de onde parou depois
+                pilha.append((caminho_filho, filho.arvore.iterar_itens()))
+                break
+        else:
+            pilha.pop()
+
+
+def _casa(nome, no, padrao, tipo):
+    """
+    Indica se um item passa pelos filtros de 'encontrar'.
+    """
+    if tipo is not None and no.e_diretorio != (tipo == "d"):
+        return False
+    return padrao is None or fnmatchcase(nome, padrao)
+
+
+def encontrar(no, padrao=None, tipo=None, caminho=(), profundidade_maxima=None):
+    """
+    Gera os caminhos (tuplas de nomes) abaixo do diretório 'no' cujo nome casa com o padrão glob
+    'padrao' e, com 'tipo' igual a 'd' ou 'f', que são diretórios ou arquivos. A ordem é a de
+    'caminhar'; como o percurso é preguiçoso, parar de consumir o gerador (ex: na primeira
+    ocorrência) interrompe o percurso.
+    """
+    for caminho_item, item in caminhar(no, caminho, profundidade_maxima):
+        if _casa(caminho_item[-1], item, padrao, tipo):
+            yield caminho_item
+
+
+def resumir(no):
+    """
+    Retorna (diretórios, arquivos) abaixo do diretório 'no'.
+    """
+    diretorios = arquivos = 0
+    for _, item in caminhar(no):
+        if item.e_diretorio:
+            diretorios += 1
+        else:
+            arquivos += 1
+    return diretorios, arquivos
+
+
+def _repartir_trabalho(no, caminho, tarefas, profundidade_maxima):
+    """
+    Expande o diretório nível a nível até a fronteira ter pelo menos 'tarefas' subdiretórios
+    (ou não haver mais o que expandir). Retorna (rasos, fronteira, nivel): os itens visitados na
+    expansão, os diretórios da fronteira, cujo conteúdo ainda falta percorrer, e a profundidade deles.
+    """
+    rasos = []
+    fronteira = [(caminho, no)] if no.e_diretorio and not no.vazio() else []
+    nivel = 0
+    while fronteira and len(fronteira) < tarefas and (profundidade_maxima is None or nivel < profundidade_maxima):
+        proxima = []
+        for base, diretorio in fronteira:
+            for nome, filho in diretorio.arvore.iterar_itens():
+                caminho_filho = base + (nome,)
+                rasos.append((caminho_filho, filho))
+                if filho.e_diretorio and not filho.vazio():
+                    proxima.append((caminho_filho, filho))
+        fronteira = proxima
+        nivel += 1
+    if profundidade_maxima is not None and nivel >= profundidade_maxima:
+        fronteira = []
+    return rasos, fronteira, nivel
+
+
+def _pode_bifurcar():
+    """
+    Indica se o percurso pode ser repartido entre processos criados com fork.
+    """
+    return "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+
+def _paralelo(no, caminho, processos, profundidade_maxima, trabalho, argumentos):
+    """
+    Núcleo dos percursos paralelos. Reparte o diretório em subárvores e gera (rasos, resultados):
+    primeiro os itens visitados ao repartir, uma única vez com resultados None, e depois, com rasos
+    vazio, o resultado de 'trabalho(índice da tarefa, profundidade restante, *argumentos)' de cada
+    subárvore, na ordem das tarefas, à medida que os processos terminam.
+    Sem fork (ex: Windows), com um único processo ou com outras threads vivas, percorre tudo no
+    processo atual: o filho de um fork tem só a thread que o criou, e uma trava que outra thread
+    segurava no momento do fork (ex: a do commit em grupo do diário, com --diario e --intervalo > 0)
+    nunca seria liberada nele.
+    Fechar o gerador antes do fim encerra os processos e descarta as tarefas pendentes.
+    """
+    global _tarefas
+    if processos is None:
+        processos = os.cpu_count() or 1
+    if processos > 1 and not _pode_bifurcar():
+        processos = 1
+    if processos <= 1:
+        rasos, fronteira, nivel = [], [(caminho, no)], 0
+    else:
+        rasos, fronteira, nivel = _repartir_trabalho(
+            no, caminho, processos * TAREFAS_POR_PROCESSO, profundidade_maxima
+        )
+    yield rasos, None
+    restante = None if profundidade_maxima is None else profundidade_maxima - nivel
+    if len(fronteira) <= 1 or processos <= 1:
+        # Nada a repartir: o trabalho é feito aqui mesmo, sem pagar a criação do pool
+        _tarefas = fronteira
+        try:
+            for indice in range(len(fronteira)):
+                yield [], trabalho((indice, restante, *argumentos))
+        finally:
+            _tarefas = None
+        return
+    _tarefas = fronteira
+    try:
+        with multiprocessing.get_context("fork").Pool(min(processos, len(fronteira))) as pool:
+            tarefas = [(indice, restante, *argumentos) for indice in range(len(fronteira))]
+            for resultado in pool.imap(trabalho, tarefas):
+                yield [], resultado
+    finally:
+        _tarefas = None
+
+
+def _trabalho_encontrar(argumentos):
+    indice, profundidade_maxima, padrao, tipo = argumentos
+    caminho, no = _tarefas[indice]
+    return list(encontrar(no, padrao, tipo, caminho, profundidade_maxima))
+
+
+def _trabalho_resumir(argumentos):
+    indice = argumentos[0]
+    return resumir(_tarefas[indice][1])
+
+
+def encontrar_paralelo(no, padrao=None, tipo=None, caminho=(), profundidade_maxima=None, processos=None):
+    """
+    Como 'encontrar', mas repartindo as subárvores entre 'processos' processos (padrão: um por CPU),
+    para acelerar o casamento de nomes em hierarquias grandes. Os caminhos de cada subárvore chegam
+    juntos, quando o processo que a percorreu termina, então a ordem não é a de 'caminhar'.
+    Parar de consumir o gerador encerra os processos.
+    """
+    for rasos, resultados in _paralelo(
+        no, caminho, processos, profundidade_maxima, _trabalho_encontrar, (padrao, tipo)
+    ):
+        for caminho_item, item in rasos:
+            if _casa(caminho_item[-1], item, padrao, tipo):
+                yield caminho_item
+        if resultados:
+            yield from resultados
+
+
+def resumir_paralelo(no, processos=None):
+    """
+    Como 'resumir', repartindo as subárvores entre 'processos' processos.
+    """
+    diretorios = arquivos = 0
+    for rasos, resultado in _paralelo(no, (), processos, None, _trabalho_resumir, ()):
+        for _, item in rasos:
+            if item.e_diretorio:
+                diretorios += 1
+            else:
+                arquivos += 1
+        if resultado is not None:
+            diretorios += resultado[0]
+            arquivos += resultado[1]
+    return diretorios, arquivos
@@ -0,0 +1,277 @@
+from bisect import bisect_left, bisect_right
+from os.path import commonprefix
+
+from bplustree import _AUSENTE, ArvoreBPlus, NoArvoreBPlus
+
+
+def separador_curto(esquerda, direita):
+    """
+    Menor prefixo de 'direita' que ainda é maior que 'esquerda' (com esquerda < direita).
+    Serve de separador entre dois nós: esquerda < separador <= direita.
+    """
+    return direita[:len(commonprefix((esquerda, direita))) + 1]
+
+
+class NoPrefixado(NoArvoreBPlus):
+    """
+    Nó da ArvoreBPlusPrefixada. Nas folhas, as chaves são guardadas sem o prefixo comum a todas elas,
+    que fica uma única vez em 'prefixo' (vazio nos nós internos).
+    """
+    __slots__ = ("prefixo",)
+
+    def __init__(self, e_folha=False, dono=None):
+        super().__init__(e_folha, dono)
+        self.prefixo = ""
+
+
+class ArvoreBPlusPrefixada(ArvoreBPlus):
+    """
+    B+ Tree com chaves do tipo str comprimidas, para diretórios com muitos nomes parecidos
+    ('log_2026_10_17_0001.txt', 'log_2026_10_17_0002.txt', ...).
+
+    - Cada folha guarda o maior prefixo comum das suas chaves uma única vez e, em 'chaves', apenas
+      os sufixos. A busca na folha corta o prefixo da chave procurada uma vez e compara só os
+      sufixos, que são mais curtos.
+    - Ao dividir folhas, o separador promovido para o pai é o menor prefixo da primeira chave da
+      direita que ainda a distingue da última da esquerda (suffix truncation), o que encurta as
+      chaves dos nós internos comparadas em cada descida.
+
+    A interface é a mesma da ArvoreBPlus; as chaves entregues (iterar_itens, listar_chaves) são
+    sempre as completas. Os separadores de uma carga em lote (carregar_ordenado) não são encurtados.
+    """
+    CLASSE_NO = NoPrefixado
+    # Grau a partir do qual a compressão economiza memória ('benchmark.py --nomes'): com folhas
+    # pequenas o prefixo e o nó maior custam mais que os caracteres poupados, e as buscas e
+    # inserções são sempre mais lentas que na ArvoreBPlus
+    GRAU_MINIMO = 16
+
+    @classmethod
+    def carregar_ordenado(cls, itens, grau, fator_preenchimento=1.0, tipo_chave=None, tipo_valor=None):
+        arvore = super().carregar_ordenado(itens, grau, fator_preenchimento, tipo_chave, tipo_valor)
+        for folha in arvore._folhas():
+            arvore._comprimir(folha)
+        return arvore
+
+    @staticmethod
+    def _comprimir(folha):
+        """
+        Move para o prefixo da folha o que ainda for comum a todos os seus sufixos.
+        Como as chaves estão ordenadas, o prefixo comum de todas é o da primeira com a última.
+        """
+        chaves = folha.chaves
+        if not chaves:
+            return
+        extra = len(commonprefix((chaves[0], chaves[-1])))
+        if extra:
+            folha.prefixo += chaves[0][:extra]
+            folha.chaves = [chave[extra:] for chave in chaves]
+
+    @staticmethod
+    def _descomprimir(folha):
+        """
+        Devolve às chaves da folha o prefixo, deixando-a no formato da ArvoreBPlus.
+        """
+        prefixo = folha.prefixo
+        if prefixo:
+            folha.chaves = [prefixo + chave for chave in folha.chaves]
+            folha.prefixo = ""
+
+    @staticmethod
+    def _posicao(folha, chave):
+        """
+        Retorna (posição, sufixo): a posição de 'chave' na folha, como bisect_left nas chaves
+        completas, e a chave sem o prefixo da folha (None se ela não começar por ele; nesse caso
+        a chave é menor ou maior que todas as da folha).
+        """
+        prefixo = folha.prefixo
+        if chave.startswith(prefixo):
+            sufixo = chave[len(prefixo):]
+            return bisect_left(folha.chaves, sufixo), sufixo
+        return (0 if chave < prefixo else len(folha.chaves)), None
+
+    def _chaves_completas(self, no):
+        if no.e_folha and no.prefixo:
+            return [no.prefixo + chave for chave in no.chaves]
+        return no.chaves
+
+    def _copiar_no(self, no):
+        copia = super()._copiar_no(no)
+        copia.prefixo = no.prefixo
+        return copia
+
+    def buscar(self, chave):
+        """
+        Busca um valor associado a uma chave na árvore.
+        Retorna o valor se encontrado, caso contrário, retorna None.
+        """
+        folha = self._encontrar_folha(chave)
+        i, sufixo = self._posicao(folha, chave)
+        if sufixo is not None and i < len(folha.chaves) and folha.chaves[i] == sufixo:
+            return folha.filhos[i]
+        return None
+
+    def buscar_muitos(self, chaves):
+        return [self.buscar(chave) for chave in chaves]
+
+    def posicao(self, chave):
+        folha, anteriores = self._descer_contando(chave)
+        return anteriores + self._posicao(folha, chave)[0]
+
+    def _inserir_nao_cheio(self, no, chave, valor, substituir=False):
+        # Desce pelos nós internos dividindo os cheios, como na ArvoreBPlus, mas num laço
+        caminho = []
+        while not no.e_folha:
+            i = bisect_right(no.chaves, chave)
+            if len(self._filho_proprio(no, i).chaves) == self.grau - 1:
+                self._dividir_filho(no, i)
+                if chave >= no.chaves[i]:
+                    i += 1
+            caminho.append(no)
+            no = no.filhos[i]
+        i, sufixo = self._posicao(no, chave)
+        if sufixo is not None and i < len(no.chaves) and no.chaves[i] == sufixo:
+            # A chave já existe: substitui o valor apenas se pedido
+            if substituir:
+                no.filhos[i] = valor
+            return True
+        # A chave é nova: todas as subárvores do caminho crescem
+        for ancestral in caminho:
+            ancestral.total += 1
+        if sufixo is None:
+            # A chave não tem o prefixo da folha: o prefixo encolhe até o que for comum com ela
+            comum = commonprefix((no.prefixo, chave))
+            devolvido = no.prefixo[len(comum):]
+            no.chaves = [devolvido + resto for resto in no.chaves]
+            no.prefixo = comum
+            sufixo = chave[len(comum):]
+        no.chaves.insert(i, sufixo)
+        no.filhos.insert(i, valor)
+        return False
+
+    def _dividir_filho(self, pai, indice):
+        super()._dividir_filho(pai, indice)
+        esquerdo = pai.filhos[indice]
+        if esquerdo.e_folha:
+            # As duas metades herdam o prefixo; o separador é o mais curto entre elas
+            direito = pai.filhos[indice + 1]
+            direito.prefixo = esquerdo.prefixo
+            pai.chaves[indice] = esquerdo.prefixo + separador_curto(esquerdo.chaves[-1], direito.chaves[0])
+            self._comprimir(esquerdo)
+            self._comprimir(direito)
+
+    def _repartir(self, no):
+        if not no.e_folha:
+            return super()._repartir(no)
+        prefixo = no.prefixo
+        extras = super()._repartir(no)
+        # Os pedaços herdam o prefixo; cada separador é o mais curto entre o pedaço e o anterior
+        anterior = no
+        for posicao, (_, novo_no) in enumerate(extras):
+            novo_no.prefixo = prefixo
+            extras[posicao] = (prefixo + separador_curto(anterior.chaves[-1], novo_no.chaves[0]), novo_no)
+            anterior = novo_no
+        self._comprimir(no)
+        for _, novo_no in extras:
+            self._comprimir(novo_no)
+        return extras
+
+    def _inserir_lote(self, no, chaves, valores, inicio, fim):
+        # A intercalação com o lote é feita sobre as chaves completas; '_repartir' comprime de novo
+        if no.e_folha:
+            self._descomprimir(no)
+        return super()._inserir_lote(no, chaves, valores, inicio, fim)
+
+    def _deletar_lote(self, no, chaves, inicio, fim):
+        if not no.e_folha:
+            return super()._deletar_lote(no, chaves, inicio, fim)
+        self._descomprimir(no)
+        super()._deletar_lote(no, chaves, inicio, fim)
+        self._comprimir(no)
+
+    def _deletar(self, no, chave):
+        if not no.e_folha:
+            return super()._deletar(no, chave)
+        i, sufixo = self._posicao(no, chave)
+        if sufixo is not None and i < len(no.chaves) and no.chaves[i] == sufixo:
+            no.chaves.pop(i)
+            return no.filhos.pop(i)
+        return _AUSENTE
+
+    def _cortar_folha(self, folha, inicio, fim):
+        i = 0 if inicio is None else self._posicao(folha, inicio)[0]
+        j = len(folha.chaves) if fim is None else self._posicao(folha, fim)[0]
+        del folha.chaves[i:j]
+        del folha.filhos[i:j]
+        # As chaves que sobraram podem ter um prefixo comum maior
+        self._comprimir(folha)
+
+    def _redistribuir(self, pai, i, da_esquerda):
+        filho = self._filho_proprio(pai, i)
+        if not filho.e_folha:
+            return super()._redistribuir(pai, i, da_esquerda)
+        # Folhas vizinhas podem ter prefixos diferentes: a troca é feita com as chaves completas
+        irmao = self._filho_proprio(pai, i - 1 if da_esquerda else i + 1)
+        self._descomprimir(filho)
+        self._descomprimir(irmao)
+        super()._redistribuir(pai, i, da_esquerda)
+        if da_esquerda:
+            pai.chaves[i - 1] = separador_curto(irmao.chaves[-1], filho.chaves[0])
+        else:
+            pai.chaves[i] = separador_curto(filho.chaves[-1], irmao.chaves[0])
+        self._comprimir(filho)
+        self._comprimir(irmao)
+
+    def _fundir(self, pai, indice):
+        esquerdo = self._filho_proprio(pai, indice)
+        if not esquerdo.e_folha:
+            return super()._fundir(pai, indice)
+        direito = self._filho_proprio(pai, indice + 1)
+        self._descomprimir(esquerdo)
+        self._descomprimir(direito)
+        super()._fundir(pai, indice)
+        self._comprimir(esquerdo)
+
+    def listar_chaves(self):
+        """
+        Percorre todas as chaves da árvore em ordem, começando pela folha mais à esquerda.
+        """
+        resultado = []
+        for no in self._folhas():
+            prefixo = no.prefixo
+            resultado.extend([prefixo + chave for chave in no.chaves] if prefixo else no.chaves)
+        return resultado
+
+    def iterar_itens(self, inicio=None, fim=None, reverso=False):
+        """
+        Gera os pares (chave, valor) com inicio <= chave < fim, de forma preguiçosa, como na
+        ArvoreBPlus, reconstruindo cada chave a partir do prefixo da sua folha.
+        """
+        if reverso:
+            folhas = self._folhas(fim, reverso=True)
+            no = next(folhas)
+            i = len(no.chaves) - 1 if fim is None else self._posicao(no, fim)[0] - 1
+            while no:
+                prefixo = no.prefixo
+                while i >= 0:
+                    chave = prefixo + no.chaves[i]
+                    if inicio is not None and chave < inicio:
+                        return
+                    yield chave, no.filhos[i]
+                    i -= 1
+                no = next(folhas, None)
+                if no:
+                    i = len(no.chaves) - 1
+        else:
+            folhas = self._folhas(inicio)
+            no = next(folhas)
+            i = 0 if inicio is None else self._posicao(no, inicio)[0]
+            while no:
+                prefixo = no.prefixo
+                while i < len(no.chaves):
+                    chave = prefixo + no.chaves[i]
+                    if fim is not None and chave >= fim:
+                        return
+                    yield chave, no.filhos[i]
+                    i += 1
+                no = next(folhas, None)
+                i = 0
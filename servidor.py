@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import io
+import sys
+from contextlib import redirect_stdout
+
+from Comandos_e_Fusao import adicionar_opcoes, criar_shell
+
+# Comandos seguidos de uma mesma conexão antes de ceder a vez às outras: um cliente com muitos
+# comandos enfileirados (pipelining) não monopoliza o laço de eventos
+COMANDOS_POR_VEZ = 32
+# Comandos que encerram a sessão
+SAIR = ("exit", "quit", "sair")
+
+
+class Sessao:
+    """
+    Estado de um cliente conectado. Só o diretório atual é da sessão; o sistema de arquivos, o cache,
+    os snapshots e o diário são os do Shell compartilhado pelo servidor.
+    """
+    __slots__ = ("componentes", "comandos")
+
+    def __init__(self):
+        # Diretório atual, como tupla de nomes a partir da raiz
+        self.componentes = ()
+        self.comandos = 0
+
+
+class Servidor:
+    """
+    Servidor asyncio que expõe um único Shell a vários clientes, por TCP ou socket Unix.
+
+    O protocolo é o do shell interativo, linha a linha: cada linha recebida é um comando e a resposta
+    é a saída dele seguida de uma linha com o prompt da sessão (ex: 'fakerational:~/a$ '), que marca o
+    fim da resposta (nomes não têm espaços, então nenhuma linha de saída termina em '$ '). Ao conectar,
+    o cliente recebe o prompt inicial. O cliente pode enviar vários comandos sem esperar as respostas
+    (pipelining); elas chegam na mesma ordem.
+
+    Os comandos rodam um de cada vez no laço de eventos, então cada um vê o sistema de arquivos
+    inteiro sem interferência dos outros, como no shell local. Antes de cada comando o Shell é posto
+    no diretório atual da sessão (Shell._entrar); se outra sessão tiver removido esse diretório,
+    o comando não é executado, o cliente é avisado e a sessão volta para a raiz.
+    """
+    def __init__(self, shell):
+        self.shell = shell
+        # Sessão cujo diretório atual está no Shell; as outras são restauradas antes de cada comando
+        self._ativa = None
+        self._saida = io.StringIO()
+        # Método e número de argumentos de cada comando já visto (ver Shell._despachar)
+        self._despacho = {}
+        self.sessoes = 0
+        self.comandos = 0
+
+    def executar(self, sessao, linha):
+        """
+        Executa uma linha de comando na sessão e retorna a resposta (saída e prompt).
+        """
+        shell = self.shell
+        saida = self._saida
+        saida.seek(0)
+        saida.truncate()
+        removido = False
+        if self._ativa is not sessao:
+            # Se outra sessão removeu o diretório atual desta, o comando não é executado: na raiz,
+            # um caminho relativo (ex: 'rm -r x') atingiria outro item com o mesmo nome
+            removido = not shell._entrar(sessao.componentes)
+            self._ativa = sessao
+        comando_completo = linha.split()
+        if removido:
+            saida.write(f"O diretório atual ~/{'/'.join(sessao.componentes)} foi removido; voltando para ~.\n")
+            sessao.componentes = ()
+        elif comando_completo and not comando_completo[0].startswith("#"):
+            comando, *argumentos = comando_completo
+            with redirect_stdout(saida):
+                # Argumentos que não servem para o comando (ex: 'mkdir' sem caminho) são recusados
+                # antes da chamada e um erro dentro do comando é informado ao cliente, como no modo
+                # em lote; em ambos os casos a sessão continua
+                try:
+                    if not shell._despachar(comando, argumentos, self._despacho):
+                        print(f"Argumentos inválidos para '{comando}'.")
+                except Exception as erro:
+                    print(f"Erro em '{comando}': {type(erro).__name__}: {erro}")
+            sessao.componentes = tuple(shell.caminho[1:])
+            sessao.comandos += 1
+            self.comandos += 1
+        saida.write(shell.prompt())
+        saida.write("\n")
+        return saida.getvalue()
+
+    async def atender(self, leitor, escritor):
+        """
+        Atende uma conexão até o cliente fechá-la ou enviar 'exit'.
+        """
+        sessao = Sessao()
+        self.sessoes += 1
+        try:
+            # Prompt inicial: toda sessão começa na raiz
+            escritor.write(b"fakerational:~$ \n")
+            seguidos = 0
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except ValueError:
+                    # Linha maior que o limite do leitor: a sessão é encerrada
+                    break
+                if not linha:
+                    break
+                linha = linha.decode("utf-8", "replace")
+                if linha.strip() in SAIR:
+                    break
+                escritor.write(self.executar(sessao, linha).encode())
+                # Espera o cliente consumir as respostas se o buffer de envio estiver cheio
+                await escritor.drain()
+                seguidos += 1
+                if seguidos == COMANDOS_POR_VEZ:
+                    seguidos = 0
+                    await asyncio.sleep(0)
+        except ConnectionError:
+            # Conexão perdida: a sessão é encerrada
+            pass
+        finally:
+            if self._ativa is sessao:
+                self._ativa = None
+            self.sessoes -= 1
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def servir(self, host="127.0.0.1", porta=8023, unix=None, pronto=None):
+        """
+        Aceita conexões no socket Unix 'unix' ou, sem ele, em host:porta (porta 0: qualquer uma livre)
+        até o processo ser interrompido. 'pronto', se informado, é chamado com o endereço assim que o
+        servidor começar a aceitar conexões.
+        """
+        if unix is not None:
+            servidor = await asyncio.start_unix_server(self.atender, unix)
+            endereco = unix
+        else:
+            servidor = await asyncio.start_server(self.atender, host, porta)
+            endereco = "%s:%d" % servidor.sockets[0].getsockname()[:2]
+        if pronto is not None:
+            pronto(endereco)
+        async with servidor:
+            await servidor.serve_forever()
+
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Servidor do shell do fakerational: um sistema de arquivos, várias sessões.")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço TCP (padrão: %(default)s)")
+    parser.add_argument("--porta", type=int, default=8023, help="porta TCP; 0 escolhe uma livre (padrão: %(default)s)")
+    parser.add_argument("--unix", help="caminho de um socket Unix, usado no lugar do TCP")
+    adicionar_opcoes(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    argumentos = ler_argumentos()
+    shell = criar_shell(argumentos)
+    servidor = Servidor(shell)
+    try:
+        asyncio.run(servidor.servir(
+            argumentos.host, argumentos.porta, argumentos.unix,
+            pronto=lambda endereco: print(f"Servindo em {endereco}", file=sys.stderr, flush=True),
+        ))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shell.fechar()
@@ -0,0 +1,136 @@
+import random
+
+import pytest
+
+from bplustree import ArvoreBPlus
+from concorrente import ArvoreBPlusConcorrente
+from filtro import ArvoreBPlusFiltrada, ArvoreBPlusPrefixadaFiltrada
+from prefixos import ArvoreBPlusPrefixada
+
+# Variantes da árvore conferidas contra um dicionário
+CLASSES = [ArvoreBPlus, ArvoreBPlusPrefixada, ArvoreBPlusFiltrada, ArvoreBPlusPrefixadaFiltrada, ArvoreBPlusConcorrente]
+# As que aceitam instantâneos (copy-on-write)
+CLASSES_INSTANTANEO = [ArvoreBPlus, ArvoreBPlusPrefixada, ArvoreBPlusFiltrada, ArvoreBPlusPrefixadaFiltrada]
+
+
+def chave_aleatoria(aleatorio):
+    # Poucas chaves possíveis, com prefixos em comum, para haver colisões e remoções de chaves existentes
+    return "arq%03d" % aleatorio.randrange(400)
+
+
+def conferir(arvore, modelo):
+    arvore.verificar()
+    assert len(arvore) == len(modelo)
+    assert list(arvore.iterar_itens()) == sorted(modelo.items())
+
+
+def operar(arvore, modelo, aleatorio):
+    """
+    Aplica uma operação aleatória à árvore e ao dicionário de referência.
+    'inserir' e 'inserir_muitos' mantêm o valor de uma chave já existente, como o 'setdefault'.
+    """
+    operacao = aleatorio.randrange(8)
+    if operacao == 0:
+        chave, valor = chave_aleatoria(aleatorio), aleatorio.random()
+        arvore.inserir(chave, valor)
+        modelo.setdefault(chave, valor)
+    elif operacao == 1:
+        chave, valor = chave_aleatoria(aleatorio), aleatorio.random()
+        arvore.upsert(chave, valor)
+        modelo[chave] = valor
+    elif operacao == 2:
+        chave = chave_aleatoria(aleatorio)
+        assert arvore.pop(chave) == modelo.pop(chave, None)
+    elif operacao == 3:
+        chave = chave_aleatoria(aleatorio)
+        arvore.deletar(chave)
+        modelo.pop(chave, None)
+    elif operacao == 4:
+        itens = [(chave_aleatoria(aleatorio), aleatorio.random()) for _ in range(aleatorio.randrange(1, 40))]
+        arvore.inserir_muitos(itens)
+        for chave, valor in itens:
+            modelo.setdefault(chave, valor)
+    elif operacao == 5:
+        chaves = [chave_aleatoria(aleatorio) for _ in range(aleatorio.randrange(1, 40))]
+        arvore.deletar_muitos(chaves)
+        for chave in chaves:
+            modelo.pop(chave, None)
+    elif operacao == 6:
+        inicio, fim = sorted((chave_aleatoria(aleatorio), chave_aleatoria(aleatorio)))
+        arvore.deletar_intervalo(inicio, fim)
+        for chave in [chave for chave in modelo if inicio <= chave < fim]:
+            del modelo[chave]
+    else:
+        chaves = [chave_aleatoria(aleatorio) for _ in range(aleatorio.randrange(1, 20))]
+        assert arvore.buscar_muitos(chaves) == [modelo.get(chave) for chave in chaves]
+        assert arvore.buscar(chaves[0]) == modelo.get(chaves[0])
+
+
+@pytest.mark.parametrize("classe", CLASSES)
+@pytest.mark.parametrize("grau", [3, 4, 8])
+def test_operacoes_aleatorias(classe, grau):
+    aleatorio = random.Random(grau)
+    arvore = classe(grau)
+    modelo = {}
+    for passo in range(3000):
+        operar(arvore, modelo, aleatorio)
+        if passo % 50 == 0:
+            conferir(arvore, modelo)
+    conferir(arvore, modelo)
+
+
+@pytest.mark.parametrize("classe", CLASSES)
+def test_carregar_ordenado(classe):
+    itens = [("arq%04d" % i, i) for i in range(1000)]
+    arvore = classe.carregar_ordenado(itens, 5, 0.7)
+    conferir(arvore, dict(itens))
+    arvore.deletar_intervalo("arq0100", "arq0900")
+    conferir(arvore, dict(itens[:100] + itens[900:]))
+
+
+@pytest.mark.parametrize("classe", CLASSES_INSTANTANEO)
+def test_instantaneos_nao_mudam(classe):
+    """
+    Cada instantâneo continua com o conteúdo da época em que foi tirado, enquanto a árvore original
+    e os outros instantâneos são alterados.
+    """
+    aleatorio = random.Random(7)
+    arvore = classe(4)
+    modelo = {}
+    instantaneos = []
+    for passo in range(2000):
+        operar(arvore, modelo, aleatorio)
+        if passo % 200 == 0:
+            instantaneos.append((arvore.instantaneo(), dict(modelo)))
+        # Alterações também nos instantâneos, que não podem vazar para a original nem entre eles
+        if passo % 300 == 0 and instantaneos:
+            instantaneo, conteudo = instantaneos[aleatorio.randrange(len(instantaneos))]
+            chave = chave_aleatoria(aleatorio)
+            instantaneo.upsert(chave, -1.0)
+            conteudo[chave] = -1.0
+    conferir(arvore, modelo)
+    for instantaneo, conteudo in instantaneos:
+        conferir(instantaneo, conteudo)
+
+
+@pytest.mark.parametrize("classe", CLASSES_INSTANTANEO)
+def test_assumir_nos(classe):
+    """
+    'assumir_nos' tira a árvore do modo copy-on-write (com a lista ligada das folhas refeita) sem
+    alterar os instantâneos que ainda existam.
+    """
+    aleatorio = random.Random(11)
+    arvore = classe(4)
+    modelo = {}
+    for _ in range(500):
+        operar(arvore, modelo, aleatorio)
+    instantaneo, conteudo = arvore.instantaneo(), dict(modelo)
+    for _ in range(500):
+        operar(arvore, modelo, aleatorio)
+    arvore.assumir_nos()
+    assert arvore.dono is None
+    conferir(arvore, modelo)
+    for _ in range(1000):
+        operar(arvore, modelo, aleatorio)
+    conferir(arvore, modelo)
+    conferir(instantaneo, conteudo)
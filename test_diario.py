@@ -0,0 +1,147 @@
+import os
+import pickle
+import struct
+import zlib
+
+import pytest
+
+from Comandos_e_Fusao import Shell
+from diario import FORMATO_CABECALHO, FORMATO_REGISTRO, Diario, codificar
+from percurso import caminhar
+
+# Registros gravados nos testes do diário
+REGISTROS = [("mkdir", ("a",)), ("touch", ("a", "x")), ("mkdir", ("b",)), ("rm", ("a", "x")), ("touch", ("b", "y"))]
+
+
+def gravar(caminho, registros):
+    diario = Diario(caminho, intervalo=0)
+    for operacao, componentes in registros:
+        diario.registrar(operacao, componentes)
+    diario.fechar()
+
+
+def recuperar(caminho):
+    diario = Diario(caminho, intervalo=0)
+    registros = list(diario.recuperar())
+    return diario, registros
+
+
+def test_diario_completo(tmp_path):
+    caminho = str(tmp_path / "fs.wal")
+    gravar(caminho, REGISTROS)
+    diario, registros = recuperar(caminho)
+    diario.fechar()
+    assert registros == REGISTROS
+
+
+def test_nomes_unicode(tmp_path):
+    caminho = str(tmp_path / "fs.wal")
+    registros = [("mkdir", ("ação",)), ("touch", ("ação", "日本語 .txt"))]
+    gravar(caminho, registros)
+    diario, recuperados = recuperar(caminho)
+    diario.fechar()
+    assert recuperados == registros
+    with pytest.raises(ValueError):
+        codificar("touch", ("a\0b",))
+
+
+class Explosivo:
+    def __reduce__(self):
+        return (os.system, ("echo explodiu",))
+
+
+def test_registro_pickle_nao_e_executado(tmp_path, monkeypatch):
+    """
+    Um registro forjado, com o CRC certo, não é desserializado com pickle: a leitura recusa o diário.
+    """
+    caminho = str(tmp_path / "fs.wal")
+    gravar(caminho, REGISTROS[:1])
+    dados = pickle.dumps(Explosivo())
+    with open(caminho, "ab") as arquivo:
+        arquivo.write(struct.pack(FORMATO_REGISTRO, len(dados), zlib.crc32(dados)) + dados)
+    chamadas = []
+    monkeypatch.setattr(os, "system", chamadas.append)
+    with pytest.raises(ValueError):
+        Diario(caminho, intervalo=0)
+    assert chamadas == []
+
+
+def test_cauda_truncada(tmp_path):
+    """
+    Uma escrita interrompida no meio do último registro: ele é descartado, os anteriores são
+    recuperados e o arquivo é cortado no fim do último registro válido.
+    """
+    caminho = str(tmp_path / "fs.wal")
+    gravar(caminho, REGISTROS)
+    tamanho_valido = os.path.getsize(caminho) - len(codificar(*REGISTROS[-1]))
+    for cortados in (1, 5, len(codificar(*REGISTROS[-1])) - 1):
+        os.remove(caminho)
+        gravar(caminho, REGISTROS)
+        os.truncate(caminho, os.path.getsize(caminho) - cortados)
+        diario, registros = recuperar(caminho)
+        diario.fechar()
+        assert registros == REGISTROS[:-1]
+        assert os.path.getsize(caminho) == tamanho_valido
+
+
+def test_cauda_corrompida(tmp_path):
+    """
+    Um byte trocado no último registro (CRC inválido): a recuperação para antes dele, e registros
+    novos são acrescentados depois do último válido.
+    """
+    caminho = str(tmp_path / "fs.wal")
+    gravar(caminho, REGISTROS)
+    with open(caminho, "r+b") as arquivo:
+        arquivo.seek(-3, os.SEEK_END)
+        byte = arquivo.read(1)
+        arquivo.seek(-3, os.SEEK_END)
+        arquivo.write(bytes([byte[0] ^ 0xFF]))
+    diario, registros = recuperar(caminho)
+    assert registros == REGISTROS[:-1]
+    diario.registrar("touch", ("b", "z"))
+    diario.fechar()
+    diario, registros = recuperar(caminho)
+    diario.fechar()
+    assert registros == REGISTROS[:-1] + [("touch", ("b", "z"))]
+
+
+def test_cabecalho_incompleto(tmp_path):
+    """
+    Uma queda durante a criação do diário deixa um arquivo menor que o cabeçalho: ele conta como vazio.
+    """
+    caminho = str(tmp_path / "fs.wal")
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(b"BPLUS")
+    diario, registros = recuperar(caminho)
+    diario.fechar()
+    assert registros == []
+    assert os.path.getsize(caminho) == struct.calcsize(FORMATO_CABECALHO)
+
+
+def conteudo(shell):
+    return [(caminho, no.e_diretorio) for caminho, no in caminhar(shell.raiz)]
+
+
+def test_shell_recupera_cauda_truncada(tmp_path):
+    """
+    O Shell reconstrói o sistema de arquivos do checkpoint mais o diário, sem a alteração cuja
+    gravação foi interrompida.
+    """
+    caminho = str(tmp_path / "fs.wal")
+    shell = Shell(caminho, 0)
+    shell.do_mkdir("docs")
+    shell.do_touch("docs/a")
+    shell.do_checkpoint()
+    shell.do_mkdir("docs/sub")
+    shell.do_touch("docs/sub/b")
+    shell.fechar()
+    os.truncate(caminho, os.path.getsize(caminho) - 2)
+
+    shell = Shell(caminho, 0)
+    assert conteudo(shell) == [(("docs",), True), (("docs", "a"), False), (("docs", "sub"), True)]
+    # A alteração perdida pode ser refeita, e o diário continua válido depois do corte
+    shell.do_touch("docs/sub/b")
+    shell.fechar()
+    shell = Shell(caminho, 0)
+    assert conteudo(shell)[-1] == (("docs", "sub", "b"), False)
+    shell.fechar()
@@ -0,0 +1,91 @@
+import os
+import random
+
+import pytest
+
+from bplustree import ArvoreBPlus
+from paginas import ArvoreBPlusEmDisco
+
+
+def test_inserir_deletar_e_reabrir(tmp_path):
+    """
+    Com um buffer pequeno as páginas são expulsas e relidas do disco durante as operações.
+    """
+    caminho = str(tmp_path / "arvore.pag")
+    aleatorio = random.Random(5)
+    arvore = ArvoreBPlusEmDisco.criar(caminho, grau=5, tamanho_pagina=512, capacidade_buffer=4)
+    modelo = {}
+    for _ in range(3000):
+        chave = aleatorio.randrange(2000)
+        if aleatorio.random() < 0.7:
+            arvore.inserir(chave, -chave)
+            modelo.setdefault(chave, -chave)
+        else:
+            arvore.deletar(chave)
+            modelo.pop(chave, None)
+    assert list(arvore.iterar_itens()) == sorted(modelo.items())
+    arvore.fechar()
+
+    arvore = ArvoreBPlusEmDisco.abrir(caminho, capacidade_buffer=4)
+    assert list(arvore.iterar_itens()) == sorted(modelo.items())
+    assert list(arvore.iterar_itens(500, 600)) == sorted((c, v) for c, v in modelo.items() if 500 <= c < 600)
+    for chave in range(0, 2000, 7):
+        assert arvore.buscar(chave) == modelo.get(chave)
+    carregada = arvore.carregar()
+    carregada.verificar()
+    assert list(carregada.iterar_itens()) == sorted(modelo.items())
+    arvore.fechar()
+
+
+def test_salvar_arvore_em_memoria(tmp_path):
+    """
+    'salvar' grava também uma árvore no modo copy-on-write, cuja lista ligada das folhas não é mantida.
+    """
+    caminho = str(tmp_path / "arvore.pag")
+    memoria = ArvoreBPlus.carregar_ordenado([(i, str(i)) for i in range(1000)], 6)
+    instantaneo = memoria.instantaneo()
+    memoria.deletar_intervalo(100, 900)
+    ArvoreBPlusEmDisco.salvar(memoria, caminho, tamanho_pagina=1024)
+    arvore = ArvoreBPlusEmDisco.abrir(caminho)
+    assert list(arvore.iterar_itens()) == list(memoria.iterar_itens())
+    arvore.fechar()
+    ArvoreBPlusEmDisco.salvar(instantaneo, caminho, tamanho_pagina=1024)
+    arvore = ArvoreBPlusEmDisco.abrir(caminho)
+    assert list(arvore.iterar_itens()) == [(i, str(i)) for i in range(1000)]
+    arvore.fechar()
+
+
+def test_salvar_substitui_arquivo_existente(tmp_path):
+    """
+    Gravar sobre um arquivo maior não reaproveita o cabeçalho nem as páginas da árvore antiga.
+    """
+    caminho = str(tmp_path / "arvore.pag")
+    ArvoreBPlusEmDisco.salvar(ArvoreBPlus.carregar_ordenado([(i, i) for i in range(5000)], 8), caminho, 512)
+    grande = os.path.getsize(caminho)
+    ArvoreBPlusEmDisco.salvar(ArvoreBPlus.carregar_ordenado([(i, i) for i in range(10)], 4), caminho, 256)
+    assert os.path.getsize(caminho) < grande
+    arvore = ArvoreBPlusEmDisco.abrir(caminho)
+    assert arvore.grau == 4
+    assert list(arvore.iterar_itens()) == [(i, i) for i in range(10)]
+    arvore.fechar()
+
+    arvore = ArvoreBPlusEmDisco.criar(caminho, grau=4, tamanho_pagina=256)
+    assert list(arvore.iterar_itens()) == []
+    arvore.fechar()
+    arvore = ArvoreBPlusEmDisco.abrir(caminho)
+    assert list(arvore.iterar_itens()) == []
+    arvore.fechar()
+
+
+def test_erros(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ArvoreBPlusEmDisco.abrir(str(tmp_path / "nao_existe.pag"))
+    outro = tmp_path / "outro.pag"
+    outro.write_bytes(b"x" * 4096)
+    with pytest.raises(ValueError):
+        ArvoreBPlusEmDisco.abrir(str(outro))
+    arvore = ArvoreBPlusEmDisco.criar(str(tmp_path / "pequena.pag"), grau=4, tamanho_pagina=64)
+    arvore.inserir("chave", "x" * 200)
+    with pytest.raises(ValueError):
+        arvore.descarregar()
+    arvore.arquivo.fechar()
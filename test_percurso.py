@@ -0,0 +1,66 @@
+import multiprocessing
+import threading
+
+import pytest
+
+import percurso
+from Comandos_e_Fusao import Shell
+from test_shell import rodar
+
+
+@pytest.fixture
+def shell():
+    """
+    Hierarquia com 20 diretórios de 3 níveis, para o percurso paralelo ter o que repartir.
+    """
+    shell = Shell()
+    linhas = ["touch raiz.txt"]
+    for i in range(20):
+        linhas += [f"mkdir d{i:02}", f"touch d{i:02}/a.txt", f"mkdir d{i:02}/s", f"touch d{i:02}/s/b.py"]
+    rodar(shell, *linhas)
+    return shell
+
+
+def test_find(shell):
+    saida = rodar(shell, "find d00").splitlines()
+    assert saida == ["d00/a.txt", "d00/s", "d00/s/b.py"]
+    assert rodar(shell, "find -name *.py -type f -maxdepth 2") == ""
+    assert len(rodar(shell, "find / -name *.py").splitlines()) == 20
+    assert rodar(shell, "find -type d -quit") == "./d00\n"
+    assert rodar(shell, "find -type x", "find x") == "-type espera 'd' ou 'f'.\nDiretório não encontrado.\n"
+
+
+def test_du_e_tree(shell):
+    assert rodar(shell, "du") == "81\t. (40 diretórios, 41 arquivos)\n"
+    assert rodar(shell, "du d03/s") == "1\td03/s (0 diretórios, 1 arquivos)\n"
+    assert rodar(shell, "tree d01") == "d01\n    a.txt\n    s/\n        b.py\n1 diretórios, 2 arquivos\n"
+    assert rodar(shell, "tree d01 -L 1") == "d01\n    a.txt\n    s/\n1 diretórios, 1 arquivos\n"
+
+
+def test_paralelo_igual_ao_sequencial(shell):
+    sequencial = rodar(shell, "find -name *.py").splitlines()
+    paralelo = rodar(shell, "find -name *.py -j 3").splitlines()
+    assert sorted(paralelo) == sorted(sequencial)
+    assert rodar(shell, "du -j 3") == rodar(shell, "du")
+
+
+def test_sem_fork_com_outras_threads(shell, monkeypatch):
+    """
+    Com outra thread viva (ex: a do diário), o '-j' percorre tudo no processo atual, sem fork.
+    """
+    def sem_fork(*argumentos):
+        raise AssertionError("fork com outras threads vivas")
+
+    monkeypatch.setattr(multiprocessing, "get_context", sem_fork)
+    parar = threading.Event()
+    thread = threading.Thread(target=parar.wait)
+    thread.start()
+    try:
+        assert not percurso._pode_bifurcar()
+        assert sorted(rodar(shell, "find -name *.py -j 3").splitlines()) == sorted(
+            rodar(shell, "find -name *.py").splitlines()
+        )
+        assert rodar(shell, "du -j 3") == "81\t. (40 diretórios, 41 arquivos)\n"
+    finally:
+        parar.set()
+        thread.join()
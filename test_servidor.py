@@ -0,0 +1,84 @@
+import asyncio
+
+from Comandos_e_Fusao import Shell
+from servidor import Servidor, Sessao
+
+
+def executar(servidor, sessao, *linhas):
+    return [servidor.executar(sessao, linha) for linha in linhas]
+
+
+def test_diretorio_atual_removido_por_outra_sessao():
+    """
+    Um comando de uma sessão cujo diretório atual foi removido por outra não é executado na raiz
+    (onde 'rm -r x' apagaria o '/x' de outra pessoa): o cliente é avisado e volta para ~.
+    """
+    servidor = Servidor(Shell())
+    a, b = Sessao(), Sessao()
+    executar(servidor, a, "mkdir x", "touch x/importante", "mkdir a", "cd a")
+    assert executar(servidor, b, "rm a") == ["fakerational:~$ \n"]
+    resposta = servidor.executar(a, "rm -r x")
+    assert resposta == "O diretório atual ~/a foi removido; voltando para ~.\nfakerational:~$ \n"
+    assert servidor.executar(a, "ls x") == "importante\nfakerational:~$ \n"
+    assert a.componentes == ()
+
+
+def test_sessoes_com_diretorios_proprios():
+    servidor = Servidor(Shell())
+    a, b = Sessao(), Sessao()
+    executar(servidor, a, "mkdir a", "mkdir b", "cd a")
+    executar(servidor, b, "cd b", "touch f")
+    assert servidor.executar(a, "ls") == "fakerational:~/a$ \n"
+    assert servidor.executar(b, "ls") == "f\nfakerational:~/b$ \n"
+    assert servidor.executar(a, "ls ../b") == "f\nfakerational:~/a$ \n"
+
+
+def falhar(*argumentos):
+    raise ValueError("falhou")
+
+
+def test_erro_em_comando_nao_encerra_sessao():
+    shell = Shell()
+    shell.do_falhar = falhar
+    servidor = Servidor(shell)
+    sessao = Sessao()
+    assert servidor.executar(sessao, "falhar") == "Erro em 'falhar': ValueError: falhou\nfakerational:~$ \n"
+    assert servidor.executar(sessao, "mkdir") == "Argumentos inválidos para 'mkdir'.\nfakerational:~$ \n"
+    assert servidor.executar(sessao, "mkdir a") == "fakerational:~$ \n"
+
+
+async def conversar(linhas):
+    """
+    Sobe o servidor numa porta livre, envia as linhas por uma conexão e retorna tudo o que foi
+    recebido até o servidor fechá-la.
+    """
+    shell = Shell()
+    shell.do_falhar = falhar
+    servidor = Servidor(shell)
+    pronto = asyncio.get_running_loop().create_future()
+    tarefa = asyncio.create_task(servidor.servir(porta=0, pronto=pronto.set_result))
+    try:
+        host, porta = (await pronto).rsplit(":", 1)
+        leitor, escritor = await asyncio.open_connection(host, int(porta))
+        escritor.write("".join(linha + "\n" for linha in linhas).encode())
+        await escritor.drain()
+        recebido = await asyncio.wait_for(leitor.read(), 10)
+        escritor.close()
+        return recebido.decode()
+    finally:
+        tarefa.cancel()
+
+
+def test_conexao_continua_apos_erro():
+    recebido = asyncio.run(conversar(["falhar", "mkdir a", "cd a", "exit"]))
+    assert recebido == (
+        "fakerational:~$ \n"
+        "Erro em 'falhar': ValueError: falhou\nfakerational:~$ \n"
+        "fakerational:~$ \n"
+        "fakerational:~/a$ \n"
+    )
+
+
+def test_linha_grande_demais_encerra_sessao():
+    recebido = asyncio.run(conversar(["mkdir a", "x" * 100000, "mkdir b"]))
+    assert recebido == "fakerational:~$ \nfakerational:~$ \n"
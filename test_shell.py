@@ -0,0 +1,257 @@
+import argparse
+import io
+from contextlib import redirect_stdout
+
+from bplustree import ArvoreBPlus
+from Comandos_e_Fusao import CacheCaminhos, No, Shell, adicionar_opcoes, criar_shell
+from percurso import caminhar
+from prefixos import ArvoreBPlusPrefixada
+
+
+def rodar(shell, *linhas):
+    """
+    Executa os comandos no shell, como no modo interativo, e retorna a saída.
+    """
+    saida = io.StringIO()
+    despacho = {}
+    with redirect_stdout(saida):
+        for linha in linhas:
+            comando, *argumentos = linha.split()
+            assert shell._despachar(comando, argumentos, despacho), linha
+    return saida.getvalue()
+
+
+def conferir_cache(cache):
+    """
+    Confere os contadores de caminhos abaixo de cada prefixo contra as entradas do cache.
+    """
+    esperado = {}
+    for caminho in cache.entradas:
+        for tamanho in range(len(caminho)):
+            esperado[caminho[:tamanho]] = esperado.get(caminho[:tamanho], 0) + 1
+    assert cache.abaixo == esperado
+    assert len(cache.entradas) <= cache.capacidade
+
+
+def test_normalizar():
+    shell = Shell()
+    rodar(shell, "mkdir a", "mkdir a/b", "cd a/b")
+    assert shell._normalizar("x") == ("a", "b", "x")
+    assert shell._normalizar("./x/") == ("a", "b", "x")
+    assert shell._normalizar("../x") == ("a", "x")
+    assert shell._normalizar("../../../..") == ()
+    assert shell._normalizar("/x//y") == ("x", "y")
+    assert shell._normalizar("~/x") == ("x",)
+    assert shell._normalizar("~") == ()
+
+
+def test_caminhos_com_varios_componentes():
+    shell = Shell()
+    assert rodar(shell, "mkdir a", "mkdir a/b", "mkdir /a/b/c", "touch ~/a/b/c/f") == ""
+    assert rodar(shell, "cd a/b/c") == ""
+    assert shell.prompt() == "fakerational:~/a/b/c$ "
+    assert rodar(shell, "ls", "ls ../..", "ls /a/b") == "f\nb/\nc/\n"
+    assert rodar(shell, "cd ..", "cd ../..") == ""
+    assert shell.prompt() == "fakerational:~$ "
+    assert rodar(shell, "cd a/b/c/f", "cd x", "mkdir x/y", "touch a/b/c/f/g") == (
+        "Diretório não encontrado.\n" * 4
+    )
+    assert rodar(shell, "mkdir a/b", "touch a/b/c/f") == "Diretório já existe.\nArquivo já existe.\n"
+
+
+def test_rm_do_diretorio_atual_ou_de_um_pai():
+    """
+    Sem '-r', um diretório atual vazio (ou um pai que só contém o caminho até ele) também não pode
+    ser removido: o shell ficaria num diretório que não existe mais.
+    """
+    shell = Shell()
+    rodar(shell, "mkdir a", "cd a")
+    assert rodar(shell, "rm ../a", "rm /a", "rm -r ~/a") == (
+        "Não é possível remover o diretório atual ou um dos seus pais.\n" * 3
+    )
+    rodar(shell, "mkdir b", "cd b")
+    assert rodar(shell, "rm ../../a", "rm .") == (
+        "Não é possível remover o diretório atual ou um dos seus pais.\nElemento não encontrado.\n"
+    )
+    assert rodar(shell, "mkdir x", "cd ..", "rm b/x", "rm b") == ""
+    assert shell.prompt() == "fakerational:~/a$ "
+    assert rodar(shell, "mkdir x", "cd /a/x", "ls ..") == "x/\n"
+
+
+def test_cache_apos_rm_e_recriacao():
+    """
+    Removido um diretório, o cache não pode mais devolver ele nem nada abaixo dele.
+    """
+    shell = Shell()
+    rodar(shell, "mkdir a", "mkdir a/b", "mkdir a/b/c", "touch a/b/c/f", "ls a/b/c")
+    assert shell.cache.obter(("a", "b", "c")) is not None
+    conferir_cache(shell.cache)
+    rodar(shell, "rm -r a/b")
+    assert all(caminho[:2] != ("a", "b") for caminho in shell.cache.entradas)
+    conferir_cache(shell.cache)
+    assert rodar(shell, "ls a/b/c", "mkdir a/b", "ls a/b") == "Diretório não encontrado.\n"
+    assert rodar(shell, "cd a/b/c") == "Diretório não encontrado.\n"
+
+
+def test_cache_lru():
+    cache = CacheCaminhos(capacidade=3)
+    for nome in "abcd":
+        cache.guardar((nome,), nome)
+    assert list(cache.entradas) == [("b",), ("c",), ("d",)]
+    # Um acesso torna o caminho o mais recente
+    assert cache.obter(("b",)) == "b"
+    cache.guardar(("e",), "e")
+    assert list(cache.entradas) == [("d",), ("b",), ("e",)]
+    conferir_cache(cache)
+
+
+def test_cache_invalidar():
+    cache = CacheCaminhos(capacidade=8)
+    for caminho in [("a",), ("a", "b"), ("a", "b", "c"), ("ab",), ("x", "a")]:
+        cache.guardar(caminho, caminho)
+    cache.invalidar(("a", "b"))
+    assert list(cache.entradas) == [("a",), ("ab",), ("x", "a")]
+    conferir_cache(cache)
+    # Caminhos sem nada abaixo, em cache ou não
+    cache.invalidar(("ab",))
+    cache.invalidar(("z",))
+    assert list(cache.entradas) == [("a",), ("x", "a")]
+    conferir_cache(cache)
+    cache.invalidar(())
+    assert not cache.entradas and not cache.abaixo
+
+
+def test_opcoes_numericas():
+    shell = Shell()
+    rodar(shell, "mkdir a", "touch b", "touch c")
+    assert rodar(shell, "ls --limit ²", "ls --offset -1", "ls --limit") == (
+        "--limit espera um número.\n--offset espera um número.\n--limit espera um número.\n"
+    )
+    assert rodar(shell, "ls --offset 1 --limit ٢") == "b\nc\n"
+
+
+def test_nome_com_caractere_nulo():
+    shell = Shell()
+    assert rodar(shell, "mkdir a\0b", "touch x\0") == "Diretório não encontrado.\n" * 2
+    assert rodar(shell, "ls") == ""
+
+
+def test_comprimir_so_com_grau_grande(monkeypatch, capsys):
+    """
+    Em graus pequenos a compressão gasta mais memória do que economiza e é ignorada.
+    """
+    monkeypatch.setattr(No, "GRAU", No.GRAU)
+    monkeypatch.setattr(No, "CLASSE_ARVORE", No.CLASSE_ARVORE)
+    parser = argparse.ArgumentParser()
+    adicionar_opcoes(parser)
+    criar_shell(parser.parse_args(["--comprimir"]))
+    assert No.CLASSE_ARVORE is ArvoreBPlus
+    assert "--comprimir ignorado" in capsys.readouterr().err
+    shell = criar_shell(parser.parse_args(["--comprimir", "--grau", "32"]))
+    assert No.CLASSE_ARVORE is ArvoreBPlusPrefixada and No.GRAU == 32
+    assert rodar(shell, "mkdir log_0001", "touch log_0002", "ls") == "log_0001/\nlog_0002\n"
+
+
+def test_snapshots():
+    shell = Shell()
+    rodar(shell, "mkdir a", *[f"touch a/f{i:02}" for i in range(30)], "snapshot s1")
+    rodar(shell, "rm a/f00", "mkdir a/novo", "snapshot s2", "rm -r a/novo", "touch b")
+    assert rodar(shell, "snapshot", "snapshot s1") == "s1\ns2\nSnapshot já existe.\n"
+    assert rodar(shell, "ls a --count", "ls") == "29\na/\nb\n"
+    assert rodar(shell, "checkout s1", "ls a --count", "ls") == "30\na/\n"
+    assert rodar(shell, "checkout s2", "ls a/novo", "ls") == "a/\n"
+
+
+def test_remover_snapshots():
+    """
+    Removido o último snapshot, nada mais é compartilhado: as B+ Trees saem do modo copy-on-write
+    e os diretórios voltam a ser alterados no lugar, sem cópias.
+    """
+    shell = Shell()
+    rodar(shell, "mkdir a", *[f"touch a/f{i:02}" for i in range(30)], "snapshot s1", "snapshot s2")
+    rodar(shell, "rm a/f00", "snapshot -d s1")
+    assert rodar(shell, "snapshot", "snapshot -d s1", "snapshot -d") == (
+        "s2\nSnapshot não encontrado.\nUso: snapshot -d nome\n"
+    )
+    diretorio = shell._resolver(("a",))
+    assert diretorio.arvore.dono is not None
+    rodar(shell, "snapshot -d s2")
+    assert rodar(shell, "snapshot") == ""
+    for _, no in caminhar(shell.raiz):
+        assert no.geracao is shell.geracao
+    assert diretorio.arvore.dono is None and shell.raiz.arvore.dono is None
+    diretorio.arvore.verificar()
+    rodar(shell, "touch a/g")
+    # Alterado no lugar: o diretório não foi copiado
+    assert shell._resolver(("a",)) is diretorio
+    assert rodar(shell, "ls a --count") == "30\n"
+
+
+def test_modo_em_lote(capsys):
+    """
+    Linhas vazias e comentários são ignorados; uma linha inválida ou com erro é informada com o seu
+    número e as seguintes continuam sendo executadas.
+    """
+    shell = Shell()
+    shell.do_falhar = lambda: 1 / 0
+    linhas = ["mkdir a\n", "\n", "# comentário\n", "mkdir\n", "falhar\n", "touch a/f\n", "ls a\n"]
+    assert shell.executar(linhas) == 3
+    saida = capsys.readouterr()
+    assert saida.out == (
+        "Linha 4: argumentos inválidos para 'mkdir'.\n"
+        "Linha 5: erro em 'falhar': ZeroDivisionError: division by zero\n"
+        "f\n"
+    )
+    assert saida.err.startswith("3 comandos em ")
+
+
+def test_modo_em_lote_despeja_saida_ao_ser_interrompido(capsys):
+    """
+    A saída acumulada até uma interrupção (ex: Ctrl+C) não se perde.
+    """
+    def linhas():
+        yield "mkdir a"
+        yield "ls"
+        raise KeyboardInterrupt
+
+    shell = Shell()
+    try:
+        shell.executar(linhas())
+    except KeyboardInterrupt:
+        pass
+    assert capsys.readouterr().out == "a/\n"
+
+
+def test_rm_recursivo():
+    shell = Shell()
+    rodar(shell, "mkdir a", "mkdir a/b", "touch a/b/f", "mkdir a/b/c", "touch a/g", "mkdir z")
+    assert rodar(shell, "rm a", "rm a/b", "rm", "rm -r") == (
+        "Diretório não está vazio.\nDiretório não está vazio.\nUso: rm [-r] caminho\nUso: rm [-r] caminho\n"
+    )
+    # A remoção recusada não altera nada
+    assert rodar(shell, "ls a/b") == "c/\nf\n"
+    assert rodar(shell, "rm -r a/b", "ls a", "rm -r a/b") == "g\nElemento não encontrado.\n"
+    assert rodar(shell, "rm a/g", "rm z", "rm a") == ""
+    assert rodar(shell, "ls", "find") == ""
+
+
+def test_rm_recursivo_preserva_snapshot():
+    """
+    As B+ Trees de um diretório removido com 'rm -r' são desfeitas, mas não as que ainda pertencem
+    a um snapshot.
+    """
+    shell = Shell()
+    rodar(shell, "mkdir a", "mkdir a/b", *[f"touch a/b/f{i}" for i in range(20)], "snapshot s")
+    rodar(shell, "mkdir a/novo", "touch a/novo/x", "rm -r a")
+    assert rodar(shell, "ls") == ""
+    assert rodar(shell, "checkout s", "ls a", "ls a/b --count") == "b/\n20\n"
+
+
+def test_rm_recursivo_no_diario(tmp_path):
+    caminho = str(tmp_path / "fs.wal")
+    shell = Shell(caminho, 0)
+    rodar(shell, "mkdir a", "mkdir a/b", "touch a/b/f", "touch c", "rm -r a")
+    shell.fechar()
+    shell = Shell(caminho, 0)
+    assert rodar(shell, "ls") == "c\n"
+    shell.fechar()